@@ -213,7 +213,7 @@ Keep it professional and actionable."""
         try:
             import json
             
-            filename = f"incident_playbook_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            filename = f"incident_playbook_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json"
             filepath = Config.BASE_DIR / "cookbooks" / filename
             
             # Create directory if needed
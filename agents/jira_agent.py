@@ -4,6 +4,7 @@ Creates JIRA tickets for critical issues
 """
 from typing import Dict, Any, Optional
 from .base_agent import BaseAgent
+from .log_dedup import repeat_note
 from config import Config
 import logging
 
@@ -64,7 +65,7 @@ class JiraAgent(BaseAgent):
         try:
             remediations = input_data.get("remediations", [])
             
-            # Filter for CRITICAL and ERROR severity only
+            # Filter for CRITICAL and ERROR severity only (remediations follow issue priority)
             critical_issues = [
                 rem for rem in remediations
                 if rem["issue"]["severity"] in ["CRITICAL", "ERROR"]
@@ -125,7 +126,7 @@ class JiraAgent(BaseAgent):
             description = f"""*Incident Details:*
 * Severity: {issue['severity']}
 * Category: {issue['category']}
-* Timestamp: {issue.get('timestamp', 'Unknown')}
+* Timestamp: {issue.get('timestamp') or 'Unknown'}{repeat_note(issue)}
 * Message: {issue['message']}
 
 *Remediation Plan:*
@@ -0,0 +1,99 @@
+"""
+Log Cache
+Bounded LRU memoization of per-line results keyed by a normalized message
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import re
+
+# A digit plus the hex characters after it when they run to the end of the
+# word (IDs, hashes, addresses), otherwise just a run of digits. Anchoring on
+# a digit keeps the scan cheap; it runs on every line, so it has to cost less
+# than the classification it saves. Hex characters are word characters, so a
+# shorter hex run can never end the word either: backing off is always a miss.
+_VARIABLE = re.compile(r"\d[0-9a-fA-F]*(?!\w)|\d+")
+
+_WORD = re.compile(r"\w+")
+_NON_HEX = re.compile(r"[^0-9a-f]")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Mask digit runs and hex ID tails as "0"
+
+    Masked text stays a word character, so word boundaries (and therefore
+    keyword matches) are the same as in the original message.
+    """
+    return _VARIABLE.sub("0", message)
+
+
+def keyword_survives_normalization(keyword: str) -> bool:
+    """
+    Whether a keyword matches a message exactly when it matches its normalized form
+
+    Every masked span starts with a digit, so a keyword without digits can
+    only lose a match when one of its words consists of hex letters alone
+    (such as "bad" or "dead") and sits in the tail of an ID.
+    """
+    keyword = keyword.lower()
+    return not any(ch.isdigit() for ch in keyword) and all(
+        _NON_HEX.search(word) for word in _WORD.findall(keyword)
+    )
+
+
+class LRUCache:
+    """Bounded mapping with least-recently-used eviction and hit/miss counters"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value (marking it recently used), or None"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        """Store a value, evicting the least recently used one when full"""
+        self._entries[key] = value
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def merge_stats(self, other: "LRUCache") -> None:
+        """Add the counters of another cache (e.g. a shard worker's)"""
+        self.hits += other.hits
+        self.misses += other.misses
+        self.evictions += other.evictions
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the counters travel between processes
+        state = self.__dict__.copy()
+        state["_entries"] = OrderedDict()
+        return state
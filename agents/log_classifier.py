@@ -0,0 +1,783 @@
+"""
+Log Classifier
+Rule-based parsing and classification shared by the Log Reader Agent and its
+worker processes
+"""
+from typing import Dict, Any, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+from collections import deque
+from itertools import islice
+import json
+import re
+from .log_cache import LRUCache, keyword_survives_normalization, normalize_message
+from .log_dedup import DuplicateCollapser
+from .log_entry import LogEntry
+from .log_formats import TEXT, StructuredRecord, make_decoder, sniff_stream
+from .log_histogram import TimeHistogramBuilder
+from .log_model import DEFAULT_BATCH_SIZE, LogModel
+from .log_records import DEFAULT_MAX_RECORD_LINES, assemble_records, has_exception_trace, iter_record_range_lines
+from .log_sketches import FieldSketches
+from .log_sources import iter_range_lines
+from .log_table import LogTableBuilder
+from .log_templates import LogTemplate, TemplateMiner, representative_issues
+from .log_timestamps import TimestampParser
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+DEFAULT_SEVERITY_PATTERNS = {
+    "CRITICAL": r"\b(critical|fatal|panic|emergency)\b",
+    "ERROR": r"\b(error|err|exception|failed|failure)\b",
+    "WARNING": r"\b(warning|warn|deprecated)\b",
+    "INFO": r"\b(info|information|notice)\b",
+    "DEBUG": r"\b(debug|trace|verbose)\b"
+}
+
+DEFAULT_ISSUE_CATEGORIES = {
+    "database": ["connection", "query", "timeout", "deadlock", "schema"],
+    "network": ["timeout", "refused", "unreachable", "latency", "dns"],
+    "memory": ["oom", "memory", "heap", "stack", "allocation"],
+    "disk": ["disk", "storage", "space", "inode", "filesystem"],
+    "cpu": ["cpu", "load", "throttling", "performance"],
+    "security": ["auth", "permission", "unauthorized", "forbidden", "ssl"],
+    "application": ["null", "exception", "crash", "segfault", "assertion"]
+}
+
+ISSUE_SEVERITIES = ("ERROR", "CRITICAL")
+
+# Severities that get full classification in issues-only mode
+CANDIDATE_SEVERITIES = ("CRITICAL", "ERROR", "WARNING")
+
+# Category of lines the issues-only prefilter did not scan for categories
+UNCLASSIFIED = "unclassified"
+
+DIGITS = tuple("0123456789")
+
+
+class FieldSpec(NamedTuple):
+    """Extracted field definition for FieldExtractor"""
+    pattern: str                              # regex; a (?P<value>...) group, if present, is the extracted text
+    triggers: Optional[Tuple[str, ...]]       # lower-case substrings a line must contain; None = always try
+    lead: Optional[str] = None                # regex char-class body for the first char of a match, if known
+
+
+DEFAULT_FIELD_PATTERNS = {
+    "ip_addresses": FieldSpec(r"\b(?:\d{1,3}\.){3}\d{1,3}\b", DIGITS, r"\d"),
+    "http_status": FieldSpec(r"\b[45]\d{2}\b", DIGITS, r"\d"),
+    "error_codes": FieldSpec(r"(?i:error)[_ ](?i:code)[:\s]+(?P<value>\w+)", ("error",), "eE"),
+    "services": FieldSpec(r"(?i:service)[:\s]+(?P<value>\w+)", ("service",), "sS"),
+}
+
+
+class SeverityMatcher:
+    """
+    Finds the highest-priority severity of a message in a single regex scan
+
+    Keyword-list patterns such as ``\\b(error|err|failed)\\b`` are fused into
+    one precompiled alternation over the lower-cased message, with a lookup
+    table from keyword to severity rank. Any other pattern joins the same
+    alternation as a case-insensitive named group. Severities are ranked in
+    table order, so the scan keeps the best rank seen and stops early on the
+    top one, preserving the "first matching pattern wins" semantics.
+    """
+
+    _KEYWORD_LIST = re.compile(r"^\\b\((\w+(?:\|\w+)*)\)\\b$")
+
+    def __init__(self, severity_patterns: Dict[str, str]):
+        self.severities = list(severity_patterns)
+        self._keyword_ranks: Dict[str, int] = {}
+        self._group_ranks: Dict[str, int] = {}
+        custom = []
+
+        for rank, pattern in enumerate(severity_patterns.values()):
+            keyword_list = self._KEYWORD_LIST.match(pattern)
+            if keyword_list:
+                for keyword in keyword_list.group(1).lower().split("|"):
+                    self._keyword_ranks.setdefault(keyword, rank)
+            else:
+                self._group_ranks[f"s{rank}"] = rank
+                custom.append(f"(?P<s{rank}>(?i:{pattern}))")
+
+        branches = custom
+        if self._keyword_ranks:
+            # Longest first so that e.g. "information" wins over "info"
+            keywords = sorted(self._keyword_ranks, key=len, reverse=True)
+            branches = [r"\b(?:" + "|".join(map(re.escape, keywords)) + r")\b"] + custom
+        self._regex = re.compile("|".join(branches)) if branches else None
+
+    @property
+    def keywords_only(self) -> bool:
+        """True when every pattern is a plain keyword list"""
+        return not self._group_ranks
+
+    @property
+    def keywords(self) -> List[str]:
+        return list(self._keyword_ranks)
+
+    def rank(self, message_lower: str) -> int:
+        """Return the best severity rank in a lower-cased message (len(severities) if none)"""
+        best = len(self.severities)
+        if self._regex is None:
+            return best
+        keyword_ranks = self._keyword_ranks
+        for match in self._regex.finditer(message_lower):
+            group = match.lastgroup
+            rank = keyword_ranks[match.group()] if group is None else self._group_ranks[group]
+            if rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return best
+
+    def name(self, rank: int, default: str = "INFO") -> str:
+        """Severity name for a rank returned by ``rank``"""
+        return self.severities[rank] if rank < len(self.severities) else default
+
+    def match(self, message_lower: str, default: str = "INFO") -> str:
+        """Return the highest-priority severity found in a lower-cased message"""
+        return self.name(self.rank(message_lower), default)
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton mapping category keywords to category bitmasks
+
+    The whole keyword table is compiled once; each message is then scanned in
+    a single pass that reports every matching category, so the per-line cost
+    no longer grows with the number of keywords. Categories keep their table
+    order as priority (bit 0 is the first category). Uses pyahocorasick when
+    installed and an equivalent pure-Python automaton otherwise.
+    """
+
+    def __init__(self, keyword_tables: Dict[str, Iterable[str]]):
+        self.categories = list(keyword_tables)
+        keyword_masks: Dict[str, int] = {}
+        for bit, keywords in enumerate(keyword_tables.values()):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword:
+                    keyword_masks[keyword] = keyword_masks.get(keyword, 0) | (1 << bit)
+
+        if AHOCORASICK_AVAILABLE and keyword_masks:
+            self._automaton = ahocorasick.Automaton()
+            for keyword, mask in keyword_masks.items():
+                self._automaton.add_word(keyword, mask)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._build_transitions(keyword_masks)
+
+    def _build_transitions(self, keyword_masks: Dict[str, int]) -> None:
+        """Build a pure-Python automaton with full (failure-resolved) transitions"""
+        goto: List[Dict[str, int]] = [{}]
+        outputs = [0]
+        for keyword, mask in keyword_masks.items():
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    outputs.append(0)
+                    nxt = goto[state][ch] = len(goto) - 1
+                state = nxt
+            outputs[state] |= mask
+
+        # Breadth-first: each state inherits its failure state's transitions
+        # and outputs, so matching never has to follow failure links
+        transitions: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions[state] = {**transitions[fail[state]], **goto[state]}
+            outputs[state] |= outputs[fail[state]]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = transitions[fail[state]].get(ch, 0)
+                queue.append(nxt)
+
+        self._transitions = transitions
+        self._outputs = outputs
+
+    def match_mask(self, message_lower: str) -> int:
+        """Return the bitmask of every category with a keyword in the message"""
+        mask = 0
+        if self._automaton is not None:
+            for _, keyword_mask in self._automaton.iter(message_lower):
+                mask |= keyword_mask
+            return mask
+
+        transitions = self._transitions
+        outputs = self._outputs
+        state = 0
+        for ch in message_lower:
+            state = transitions[state].get(ch, 0)
+            mask |= outputs[state]
+        return mask
+
+    def categories_for(self, mask: int) -> List[str]:
+        """Expand a category bitmask into category names in priority order"""
+        return [cat for bit, cat in enumerate(self.categories) if mask >> bit & 1]
+
+    def primary(self, mask: int, default: str = "general") -> str:
+        """Return the highest-priority category of a bitmask"""
+        if not mask:
+            return default
+        return self.categories[(mask & -mask).bit_length() - 1]
+
+
+class FieldExtractor:
+    """
+    Extracts every registered field type from a message
+
+    A cheap prefilter checks each field's trigger substrings (digits,
+    "error", "service", ...) first: lines that cannot contain any field are
+    skipped, and only the fields that can match are scanned. Each field is
+    scanned with its own precompiled regex, guarded by a first-character
+    lookahead so the regex engine skips other positions quickly. Fields may
+    overlap (an HTTP status inside an error code or an IP address), so they
+    are not fused into one alternation, which would let the first field
+    consume the text of the others. Extra fields such as pod names or trace
+    IDs can be registered at runtime.
+    """
+
+    def __init__(self, field_patterns: Optional[Dict[str, FieldSpec]] = None):
+        self._specs: Dict[str, FieldSpec] = dict(field_patterns or DEFAULT_FIELD_PATTERNS)
+        self._compile()
+
+    def register(
+        self,
+        name: str,
+        pattern: str,
+        triggers: Optional[Iterable[str]] = None,
+        lead: Optional[str] = None
+    ) -> None:
+        """
+        Register an extra field (replacing any field with the same name)
+
+        Args:
+            name: Key under which matches are reported
+            pattern: Regex for the field; if it has a ``(?P<value>...)`` group
+                only that part of the match is extracted
+            triggers: Lower-case substrings at least one of which must occur
+                in a line for the field to match; None always tries the field
+            lead: Regex char-class body of the first character of a match
+                (e.g. ``"tT"``), if known, to speed up the scan
+        """
+        self._specs[name] = FieldSpec(
+            pattern, tuple(t.lower() for t in triggers) if triggers is not None else None, lead
+        )
+        self._compile()
+
+    def _compile(self) -> None:
+        """Group fields by trigger set and compile one regex per field"""
+        self._names: List[str] = list(self._specs)
+        trigger_bits: Dict[Optional[Tuple[str, ...]], int] = {}
+        self._regexes = []
+        for bit, spec in enumerate(self._specs.values()):
+            trigger_bits[spec.triggers] = trigger_bits.get(spec.triggers, 0) | (1 << bit)
+            pattern = f"(?=[{spec.lead}])(?:{spec.pattern})" if spec.lead else spec.pattern
+            regex = re.compile(pattern)
+            # findall is fastest for group-less patterns; others report the value group or the whole match
+            self._regexes.append((regex, "value" in regex.groupindex, regex.groups == 0))
+
+        self._always_mask = trigger_bits.pop(None, 0)
+        self._trigger_checks = [
+            (re.compile("|".join(map(re.escape, sorted(triggers, key=len, reverse=True)))), mask)
+            for triggers, mask in trigger_bits.items()
+        ]
+
+    def extract(self, message: str, message_lower: Optional[str] = None) -> Dict[str, Any]:
+        """Extract useful fields from a log message"""
+        if message_lower is None:
+            message_lower = message.lower()
+
+        # Prefilter: only fields whose triggers occur in the line are scanned
+        mask = self._always_mask
+        for check, field_mask in self._trigger_checks:
+            if check.search(message_lower):
+                mask |= field_mask
+        if not mask:
+            return {}
+
+        fields = {}
+        for bit, (regex, has_value, plain) in enumerate(self._regexes):
+            if not mask >> bit & 1:
+                continue
+            if plain:
+                values = regex.findall(message)
+            elif has_value:
+                values = [match.group("value") for match in regex.finditer(message)]
+            else:
+                values = [match.group() for match in regex.finditer(message)]
+            if values:
+                fields[self._names[bit]] = values
+        return fields
+
+
+def load_keyword_table(path: str) -> Dict[str, List[str]]:
+    """Load a user-supplied {category: [keywords]} table from a JSON file"""
+    with open(path) as f:
+        table = json.load(f)
+    if not isinstance(table, dict):
+        raise ValueError(f"Keyword table {path} must be a JSON object of category -> keywords")
+    return {str(cat): [str(k) for k in keywords] for cat, keywords in table.items()}
+
+
+class LogClassifier:
+    """
+    Parses log lines and assigns severity, category and extracted fields
+
+    With an ``LRUCache`` attached, severity and category (and the
+    message template, when a ``TemplateMiner`` is attached) are memoized per
+    normalized message, with digit runs and hex IDs masked. Repeated lines,
+    such as retry storms and health checks, then cost one normalization and a
+    hash lookup. The cached result is exactly that of the line itself as long
+    as no keyword contains a digit or a hex-only word; otherwise only the
+    template is cached. Extracted fields are the line's own values (IPs,
+    status codes) and are always taken from the line.
+
+    Structured records (see ``log_formats``) bypass the severity, timestamp
+    and field regexes: those come from the record's native keys.
+
+    With ``issues_only`` set, severity acts as a prefilter: lines below
+    ``CANDIDATE_SEVERITIES`` keep their timestamp and severity but skip the
+    category scan, field extraction, template mining and the cache, and are
+    categorized as ``UNCLASSIFIED``.
+
+    With a ``LogModel`` attached, entries streamed through ``refine`` (as
+    ``iter_entries`` does) are relabeled by the model in batches of
+    ``model_batch_size`` wherever it is confident; the keyword rules stay
+    the fallback. A ``categorizer`` (see ``log_embeddings``) then gets
+    each batch to categorize the lines still left as "general".
+    """
+
+    def __init__(
+        self,
+        severity_patterns: Optional[Dict[str, str]] = None,
+        issue_categories: Optional[Dict[str, List[str]]] = None,
+        templates: Optional[TemplateMiner] = None,
+        cache: Optional[LRUCache] = None,
+        max_record_lines: int = DEFAULT_MAX_RECORD_LINES,
+        issues_only: bool = False,
+        model: Optional[LogModel] = None,
+        model_batch_size: int = DEFAULT_BATCH_SIZE,
+        categorizer: Optional[Any] = None
+    ):
+        self.severity_patterns = dict(severity_patterns or DEFAULT_SEVERITY_PATTERNS)
+        self.issue_categories = {
+            cat: list(keywords)
+            for cat, keywords in (issue_categories or DEFAULT_ISSUE_CATEGORIES).items()
+        }
+        self.field_extractor = FieldExtractor()
+        self.timestamp_parser = TimestampParser()
+        self.templates = templates
+        self.cache = cache
+        # Lines per multi-line record (stack traces); 0 classifies every physical line
+        self.max_record_lines = max_record_lines
+        self.issues_only = issues_only
+        self.model = model
+        self.model_batch_size = model_batch_size
+        self.categorizer = categorizer
+        self.compile()
+
+    def compile(self) -> None:
+        """(Re)build the compiled matchers after editing the rule tables"""
+        self.severity_matcher = SeverityMatcher(self.severity_patterns)
+        # Worst severity rank that still gets full classification in issues-only mode
+        self._candidate_rank = max(
+            (rank for rank, name in enumerate(self.severity_matcher.severities) if name in CANDIDATE_SEVERITIES),
+            default=-1
+        )
+        # Least severity of a record carrying an exception trace (-1 without an ERROR level)
+        severities = self.severity_matcher.severities
+        self._trace_rank = severities.index("ERROR") if "ERROR" in severities else -1
+        self.category_automaton = KeywordAutomaton(self.issue_categories)
+        # Category tuples are shared by every entry with the same bitmask
+        self._categories_cache: Dict[int, Tuple[str, ...]] = {}
+
+        # Cached classifications are only exact if normalization cannot hide a keyword
+        keywords = self.severity_matcher.keywords + [
+            keyword for keywords in self.issue_categories.values() for keyword in keywords
+        ]
+        self._cache_classification = self.severity_matcher.keywords_only and all(
+            keyword_survives_normalization(keyword) for keyword in keywords
+        )
+        if self.cache is not None:
+            self.cache.clear()
+
+    def add_keywords(self, keyword_table: Dict[str, Iterable[str]]) -> None:
+        """
+        Merge a user-supplied {category: [keywords]} table into the rules
+
+        Keywords for existing categories are appended; new categories are
+        added after the built-in ones, so they rank below them in priority.
+        """
+        for cat, keywords in keyword_table.items():
+            existing = self.issue_categories.setdefault(cat, [])
+            existing.extend(k for k in keywords if k not in existing)
+        self.compile()
+
+    def iter_entries(
+        self,
+        lines: Iterable[str],
+        timestamps: Optional[TimestampParser] = None,
+        line_format: Optional[str] = None
+    ) -> Iterator[LogEntry]:
+        """
+        Lazily parse and classify log lines, one entry at a time
+
+        Unless given, the timestamp format and the line format ("json",
+        "logfmt", "syslog" or "text") are sniffed once from the head of the
+        stream. Plain text is first assembled into multi-line records, so a
+        stack trace is one entry with its header line. With a model
+        attached, entries are relabeled in batches (see ``refine``).
+        """
+        if timestamps is None or line_format is None:
+            sniffed_format, sniffed_timestamps, lines = sniff_stream(lines)
+            timestamps = timestamps or sniffed_timestamps
+            line_format = line_format or sniffed_format
+        decoder = make_decoder(line_format)
+        if decoder is None and self.max_record_lines > 0:
+            lines = assemble_records(lines, self.max_record_lines)
+        entries = (self.classify(self.parse_line(line, timestamps, decoder)) for line in lines if line.strip())
+        yield from self.refine(entries)
+
+    def refine(self, entries: Iterable[LogEntry]) -> Iterator[LogEntry]:
+        """Relabel classified entries with the attached model and categorizer, one batch at a time"""
+        if self.model is None and self.categorizer is None:
+            yield from entries
+            return
+        entries = iter(entries)
+        while True:
+            batch = list(islice(entries, self.model_batch_size))
+            if not batch:
+                return
+            if self.model is not None:
+                self.model.apply(batch, UNCLASSIFIED if self.issues_only else None)
+            if self.categorizer is not None:
+                self.categorizer.categorize(batch)
+            yield from batch
+
+    def parse_line(
+        self,
+        line: str,
+        timestamps: Optional[TimestampParser] = None,
+        decoder: Optional[Any] = None
+    ) -> LogEntry:
+        """
+        Parse a single log line into a structured entry
+
+        With a decoder (see ``log_formats.make_decoder``), lines it can decode
+        take their message, severity, timestamp and fields from native keys;
+        other lines (e.g. stray plain-text lines) are parsed as text.
+        """
+        timestamps = timestamps or self.timestamp_parser
+        if decoder is not None:
+            record = decoder.decode(line)
+            if record is not None:
+                return self._parse_record(line, record, timestamps, decoder.name)
+        timestamp, epoch_ms = timestamps.parse(line)
+        return LogEntry(line, timestamp, epoch_ms)
+
+    def _parse_record(
+        self,
+        line: str,
+        record: StructuredRecord,
+        timestamps: TimestampParser,
+        line_format: str
+    ) -> LogEntry:
+        """Entry for a decoded structured record"""
+        timestamp, epoch_ms = timestamps.parse_value(record.timestamp)
+        # Records without a level key fall back to the severity keywords
+        severity = record.severity or self.severity_matcher.match(line.lower())
+        return LogEntry(
+            record.message, timestamp, epoch_ms, severity,
+            extracted_fields=record.fields, line_format=line_format, raw=line
+        )
+
+    def extract_timestamp(self, log_line: str) -> Optional[str]:
+        """Extract timestamp from log line (None before the first one)"""
+        return self.timestamp_parser.parse(log_line)[0]
+
+    def classify(self, entry: Mapping[str, Any]) -> LogEntry:
+        """Classify a single log entry (in place for LogEntry objects)"""
+        if not isinstance(entry, LogEntry):
+            entry = LogEntry(entry["message"], entry.get("timestamp"), entry.get("epoch_ms"))
+        if entry.line_format is not None:
+            return self._classify_record(entry)
+        message = entry.message
+        message_lower = message.lower()
+        matcher = self.severity_matcher
+        automaton = self.category_automaton
+
+        # Prefilter: low-severity lines are only counted, not classified
+        if self.issues_only:
+            rank = self._floor_trace_rank(message, matcher.rank(message_lower))
+            if rank > self._candidate_rank:
+                entry.severity = matcher.name(rank)
+                entry.category = UNCLASSIFIED
+                return entry
+
+        # Determine severity rank and category bitmask (and the message template)
+        if self.cache is not None:
+            rank, category_mask = self._classify_cached(entry, message_lower)
+        else:
+            if self.templates is not None:
+                self._assign_template(entry, self._match_template(message))
+            rank = matcher.rank(message_lower)
+            category_mask = automaton.match_mask(message_lower)
+
+        entry.severity = matcher.name(self._floor_trace_rank(message, rank))
+        self._set_categories(entry, category_mask)
+
+        # Extract additional fields (the map is only kept when non-empty)
+        entry.extracted_fields = self.field_extractor.extract(message, message_lower)
+        return entry
+
+    def _floor_trace_rank(self, message: str, rank: int) -> int:
+        # A record whose trace ends in an exception is at least an ERROR,
+        # whatever its header line says
+        if rank > self._trace_rank >= 0 and "\n" in message and has_exception_trace(message):
+            return self._trace_rank
+        return rank
+
+    def _classify_record(self, entry: LogEntry) -> LogEntry:
+        """
+        Classify a decoded structured record
+
+        Severity and fields already come from native keys, so only the
+        category keywords run, over the whole original line (values of
+        other keys included).
+        """
+        if self.issues_only and entry.severity not in CANDIDATE_SEVERITIES:
+            entry.category = UNCLASSIFIED
+            return entry
+        if self.templates is not None:
+            self._assign_template(entry, self._match_template(entry.message))
+        self._set_categories(entry, self.category_automaton.match_mask(entry.raw.lower()))
+        return entry
+
+    def _set_categories(self, entry: LogEntry, category_mask: int) -> None:
+        # Every matching category is kept; the first in table order wins
+        automaton = self.category_automaton
+        entry.category = automaton.primary(category_mask)
+        categories = self._categories_cache.get(category_mask)
+        if categories is None:
+            categories = self._categories_cache[category_mask] = tuple(automaton.categories_for(category_mask))
+        entry.categories = categories
+
+    def _classify_cached(self, entry: LogEntry, message_lower: str) -> Tuple[int, int]:
+        """Severity rank and category mask, memoized by normalized message"""
+        key = entry.normalized = normalize_message(entry.message)
+        cached = self.cache.get(key)
+        if cached is None:
+            template = self._match_template(entry.message) if self.templates is not None else None
+            if self._cache_classification:
+                cached = (template, self.severity_matcher.rank(message_lower),
+                          self.category_automaton.match_mask(message_lower))
+            else:
+                cached = (template, None, None)
+            self.cache.put(key, cached)
+
+        template, rank, category_mask = cached
+        if template is not None:
+            self._assign_template(entry, template)
+        if rank is None:
+            rank = self.severity_matcher.rank(message_lower)
+            category_mask = self.category_automaton.match_mask(message_lower)
+        return rank, category_mask
+
+    def _match_template(self, message: str) -> LogTemplate:
+        # Multi-line records are templated by their header line, not their trace
+        return self.templates.match(message.partition("\n")[0])
+
+    @staticmethod
+    def _assign_template(entry: LogEntry, template: LogTemplate) -> None:
+        entry.template_id = template.template_id
+        template.observe(entry)
+
+    def extract_fields(self, message: str) -> Dict[str, Any]:
+        """Extract useful fields from log message"""
+        return self.field_extractor.extract(message)
+
+    def register_field(
+        self,
+        name: str,
+        pattern: str,
+        triggers: Optional[Iterable[str]] = None,
+        lead: Optional[str] = None
+    ) -> None:
+        """Register an extra extracted field (see FieldExtractor.register)"""
+        self.field_extractor.register(name, pattern, triggers, lead)
+
+
+class LogAccumulator:
+    """
+    Running aggregate of classified entries
+
+    Accumulators built over consecutive shards of a log can be merged in
+    shard order to give exactly the result of a single sequential pass.
+    With ``columnar`` set, every entry is also appended to a LogTable
+    builder, which stays compact even when entries are not kept. ``templates``
+    and ``cache`` are the miner and classification cache the entries were
+    classified with; shard miners are merged into the template miner (with
+    their template IDs renumbered) and shard cache counters are added up.
+    With ``collapse_window_ms`` set, repeats of a kept entry (see
+    ``DuplicateCollapser``) only raise its count instead of being kept again;
+    counters still count every line. With ``sketch_size`` set, the extracted
+    fields of every entry feed fixed-size heavy-hitter and distinct-count
+    sketches (see ``FieldSketches``). With ``histogram_bucket_ms`` set, every
+    line is also counted in a time bucket of that width per category and
+    severity (see ``TimeHistogram``).
+    """
+
+    def __init__(
+        self,
+        keep_entries: bool = True,
+        columnar: bool = False,
+        templates: Optional[TemplateMiner] = None,
+        cache: Optional[LRUCache] = None,
+        collapse_window_ms: Optional[int] = None,
+        sketch_size: Optional[int] = None,
+        histogram_bucket_ms: Optional[int] = None
+    ):
+        self.keep_entries = keep_entries
+        self.table: Optional[LogTableBuilder] = LogTableBuilder() if columnar else None
+        self.templates = templates
+        self.cache = cache
+        self.duplicates = DuplicateCollapser(collapse_window_ms) if collapse_window_ms is not None else None
+        self.sketches = FieldSketches(sketch_size) if sketch_size else None
+        self.histogram = TimeHistogramBuilder(histogram_bucket_ms) if histogram_bucket_ms else None
+        self.total_entries = 0
+        self.classified_logs: List[LogEntry] = []
+        self.issues_found: List[LogEntry] = []
+        self.severity_counts: Dict[str, int] = {}
+        self.category_counts: Dict[str, int] = {}
+
+    def add(self, classified: LogEntry) -> None:
+        """Fold one classified entry into the aggregate"""
+        self.total_entries += 1
+        severity = classified.severity
+        category = classified.category
+        self.severity_counts[severity] = self.severity_counts.get(severity, 0) + 1
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+
+        if self.table is not None:
+            self.table.append(classified)
+        if self.sketches is not None:
+            self.sketches.update(classified.extracted_fields)
+        if self.histogram is not None:
+            self.histogram.add(classified.epoch_ms, category, severity)
+
+        # Track issues (ERROR and above); issues reference the entry, not a copy
+        is_issue = severity in ISSUE_SEVERITIES
+        if (self.keep_entries or is_issue) and self.duplicates is not None and self.duplicates.collapse(classified):
+            return
+        if self.keep_entries:
+            self.classified_logs.append(classified)
+        if is_issue:
+            self.issues_found.append(classified)
+
+    def update(self, entries: Iterable[LogEntry]) -> "LogAccumulator":
+        """Fold every entry of an iterable into the aggregate"""
+        for entry in entries:
+            self.add(entry)
+        return self
+
+    def merge(self, other: "LogAccumulator") -> "LogAccumulator":
+        """Append the aggregate of the shard that follows this one"""
+        if self.templates is not None and other.templates is not None:
+            remap = self.templates.merge(other.templates)
+            # Renumber each entry once, even if it is listed in several places
+            entries = {id(entry): entry for entry in other.classified_logs}
+            entries.update((id(entry), entry) for entry in other.issues_found)
+            entries.update(
+                (id(template.representative), template.representative)
+                for template in other.templates.templates if template.representative is not None
+            )
+            for entry in entries.values():
+                entry.template_id = remap.get(entry.template_id)
+        self.total_entries += other.total_entries
+        classified_logs, issues_found = other.classified_logs, other.issues_found
+        if self.duplicates is not None:
+            # Entries continuing a group from the end of this shard join it
+            kept = classified_logs if other.keep_entries else issues_found
+            absorbed = {id(entry) for entry in kept if self.duplicates.collapse(entry)}
+            if absorbed:
+                classified_logs = [entry for entry in classified_logs if id(entry) not in absorbed]
+                issues_found = [entry for entry in issues_found if id(entry) not in absorbed]
+        self.classified_logs.extend(classified_logs)
+        self.issues_found.extend(issues_found)
+        if self.table is not None and other.table is not None:
+            self.table.extend(other.table)
+        if self.sketches is not None and other.sketches is not None:
+            self.sketches.merge(other.sketches)
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram.merge(other.histogram)
+        if self.cache is not None and other.cache is not None:
+            self.cache.merge_stats(other.cache)
+        for sev, count in other.severity_counts.items():
+            self.severity_counts[sev] = self.severity_counts.get(sev, 0) + count
+        for cat, count in other.category_counts.items():
+            self.category_counts[cat] = self.category_counts.get(cat, 0) + count
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        """Return the aggregate in the LogReaderAgent result format"""
+        result = {
+            "total_entries": self.total_entries,
+            "classified_logs": self.classified_logs,
+            "issues_found": self.issues_found,
+            "severity_counts": self.severity_counts,
+            "category_counts": self.category_counts
+        }
+        if self.table is not None:
+            result["log_table"] = self.table.build()
+        if self.templates is not None:
+            result["templates"] = self.templates.summary()
+            result["issue_representatives"] = representative_issues(self.issues_found)
+        if self.cache is not None:
+            result["classification_cache"] = self.cache.stats()
+        if self.sketches is not None:
+            result["field_sketches"] = self.sketches.summary()
+        if self.histogram is not None:
+            result["histogram"] = self.histogram.build()
+        return result
+
+
+def classify_shard(
+    classifier: LogClassifier,
+    path: str,
+    start: int,
+    end: int,
+    chunk_size: int,
+    timestamp_format: Tuple[Optional[str], bool] = (None, False),
+    columnar: bool = False,
+    line_format: str = "text",
+    collapse_window_ms: Optional[int] = None,
+    sketch_size: Optional[int] = None,
+    histogram_bucket_ms: Optional[int] = None
+) -> LogAccumulator:
+    """
+    Classify one newline-aligned byte range of a file (process pool worker)
+
+    ``timestamp_format`` is the (format name, anchored) pair and
+    ``line_format`` the line format sniffed by the parent, so every shard
+    parses lines the same way.
+    """
+    if line_format == TEXT and classifier.max_record_lines > 0:
+        # Shards start and end on record boundaries, so no trace is split
+        lines = iter_record_range_lines(path, start, end, chunk_size, classifier.max_record_lines)
+    else:
+        lines = iter_range_lines(path, start, end, chunk_size)
+    timestamps = TimestampParser(*timestamp_format)
+    accumulator = LogAccumulator(
+        keep_entries=False, columnar=columnar, templates=classifier.templates, cache=classifier.cache,
+        collapse_window_ms=collapse_window_ms, sketch_size=sketch_size, histogram_bucket_ms=histogram_bucket_ms
+    )
+    return accumulator.update(classifier.iter_entries(lines, timestamps, line_format))
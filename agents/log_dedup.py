@@ -0,0 +1,70 @@
+"""
+Log Dedup
+Collapsing of repeated log lines into one entry with an occurrence count
+"""
+from typing import Any, Dict, Hashable, Mapping, Tuple
+from .log_cache import normalize_message
+from .log_entry import LogEntry
+
+DEFAULT_COLLAPSE_WINDOW_MS = 300_000
+
+
+class DuplicateCollapser:
+    """
+    Folds near-identical entries into the first one seen within a time window
+
+    Entries are near-identical when they share severity, category and
+    normalized message (digit runs and hex IDs masked, see
+    ``normalize_message``), so lines differing only in timestamps, counters
+    or request IDs collapse - like syslog's "last message repeated N times",
+    but also across interleaved lines. A duplicate joins the kept entry if it
+    arrives at most ``window_ms`` after the previous occurrence; the kept
+    entry's ``count`` and ``last_seen`` grow accordingly.
+
+    Only the latest kept entry per key is tracked, and it is never evicted
+    by time: the entries are kept by the caller anyway, and the result does
+    not depend on how far the log has progressed. Collapsing groups of
+    duplicates therefore gives the same result as collapsing their lines one
+    by one, even when timestamps are out of order (e.g. concatenated files),
+    so shard results can be collapsed again when they are merged.
+    """
+
+    def __init__(self, window_ms: int = DEFAULT_COLLAPSE_WINDOW_MS):
+        self.window_ms = window_ms
+        # key -> latest kept entry
+        self._latest: Dict[Hashable, LogEntry] = {}
+
+    @staticmethod
+    def key(entry: LogEntry) -> Tuple[int, int, str]:
+        # Reuse the classification cache's normalization of the line when there was one
+        normalized = entry.normalized
+        if normalized is None:
+            normalized = normalize_message(entry.message)
+        return entry.severity_code, entry.category_code, normalized
+
+    def collapse(self, entry: LogEntry) -> bool:
+        """
+        Fold an entry into an earlier duplicate if there is one
+
+        Returns True if the entry was absorbed (and should not be kept),
+        False if it is kept and now tracked for later duplicates.
+        """
+        key = self.key(entry)
+        kept = self._latest.get(key)
+        if kept is not None and (entry.epoch_ms or 0) - (kept.last_ms or 0) <= self.window_ms:
+            kept.absorb(entry)
+            return True
+        self._latest[key] = entry
+        return False
+
+    def __getstate__(self):
+        # Merging re-collapses shard entries, so shard state need not travel
+        return {"window_ms": self.window_ms, "_latest": {}}
+
+
+def repeat_note(issue: Mapping[str, Any]) -> str:
+    """Suffix describing how often an issue repeated, for prompts and tickets ("" if once)"""
+    count = issue.get("count", 1)
+    if count <= 1:
+        return ""
+    return f" (repeated {count} times, {issue.get('first_seen')} to {issue.get('last_seen')})"
@@ -0,0 +1,130 @@
+"""
+Log Embeddings
+Second-stage categorization of uncategorized issue lines by nearest category centroid
+"""
+from typing import Any, Dict, Hashable, Iterable, Optional, Sequence
+from .log_cache import normalize_message
+from .log_classifier import CANDIDATE_SEVERITIES
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_MIN_SIMILARITY = 0.3                  # cosine similarity to the nearest centroid needed to assign it
+GENERAL = "general"
+MAX_CACHED_SHAPES = 100_000                   # shape -> category memo is reset beyond this
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class CentroidCategorizer:
+    """
+    Assigns "general" lines to the nearest category centroid in embedding space
+
+    ``embeddings`` is any LangChain embeddings model (the Remediation
+    Agent's ``HuggingFaceEmbeddings``). Each category's centroid is the
+    normalized mean of the embeddings of its keywords, phrased as
+    "<category> <keyword>", computed once on first use. Lines are then
+    categorized per batch: the line shapes not seen before are embedded in
+    one ``embed_documents`` call and scored against every centroid with one
+    matrix multiply. A shape is the line's message template or, without
+    template mining, its normalized first line, so every shape is embedded
+    once per run. Only WARNING and above are considered, and a centroid
+    must reach ``min_similarity``; other lines stay "general".
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        categories: Dict[str, Iterable[str]],
+        min_similarity: float = DEFAULT_MIN_SIMILARITY
+    ):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for embedding categorization")
+        self.embeddings = embeddings
+        self.categories = {category: list(keywords) for category, keywords in categories.items()}
+        self.min_similarity = min_similarity
+        self._centroids = None
+        self._labels: Dict[Hashable, Optional[str]] = {}
+
+    def __getstate__(self):
+        # The embedding model stays in the parent process (the Log Reader does not shard with one)
+        return {**self.__dict__, "embeddings": None}
+
+    def reset(self) -> None:
+        """Forget the categorized shapes (template IDs are per run)"""
+        self._labels.clear()
+
+    @property
+    def centroids(self):
+        """(categories x dimensions) matrix of unit-length category centroids"""
+        if self._centroids is None:
+            texts, owners = [], []
+            for row, (category, keywords) in enumerate(self.categories.items()):
+                for keyword in keywords or [category]:
+                    texts.append(f"{category} {keyword}")
+                    owners.append(row)
+            vectors = _normalize_rows(np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32))
+            centroids = np.zeros((len(self.categories), vectors.shape[1]), dtype=np.float32)
+            np.add.at(centroids, np.asarray(owners), vectors)
+            self._centroids = _normalize_rows(centroids)
+        return self._centroids
+
+    @staticmethod
+    def _shape(entry) -> Hashable:
+        if entry.template_id is not None:
+            return entry.template_id
+        return normalize_message(entry.message.partition("\n")[0])
+
+    def categorize(self, entries: Sequence[Any]) -> None:
+        """Relabel the uncategorized WARNING-and-above LogEntry objects of a batch in place"""
+        if self.embeddings is None:
+            return
+        pending = [
+            entry for entry in entries
+            if entry.category == GENERAL and entry.severity in CANDIDATE_SEVERITIES
+        ]
+        if not pending:
+            return
+
+        labels = self._labels
+        new_shapes: Dict[Hashable, str] = {}
+        for entry in pending:
+            shape = self._shape(entry)
+            if shape not in labels and shape not in new_shapes:
+                new_shapes[shape] = entry.message.partition("\n")[0]
+        if new_shapes:
+            if len(labels) + len(new_shapes) > MAX_CACHED_SHAPES:
+                labels.clear()
+            self._embed_shapes(new_shapes)
+
+        for entry in pending:
+            category = labels.get(self._shape(entry))
+            if category is not None:
+                entry.category = category
+                entry.categories = (category,)
+
+    def _embed_shapes(self, shapes: Dict[Hashable, str]) -> None:
+        """Embed one line per new shape and record its nearest centroid (or None)"""
+        try:
+            vectors = _normalize_rows(
+                np.asarray(self.embeddings.embed_documents(list(shapes.values())), dtype=np.float32)
+            )
+            similarities = vectors @ self.centroids.T
+        except Exception as e:
+            # Without embeddings the keyword result stands; shapes are not retried
+            logger.warning(f"Embedding categorization failed: {e}")
+            self._labels.update(dict.fromkeys(shapes))
+            return
+        best = similarities.argmax(axis=1)
+        names = list(self.categories)
+        for shape, index, similarity in zip(shapes, best.tolist(), similarities.max(axis=1).tolist()):
+            self._labels[shape] = names[index] if similarity >= self.min_similarity else None
@@ -0,0 +1,179 @@
+"""
+Log Entry
+Compact, slotted representation of a parsed and classified log line
+"""
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+MAX_CODES = 1 << 16                           # codes are stored as uint16 in log tables
+
+
+class CodeTable:
+    """Interns names (severities, categories) as small integer codes"""
+
+    def __init__(self, names: List[str]):
+        self.names: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for name in names:
+            self.code(name)
+
+    def code(self, name: str) -> int:
+        """Return the code for a name, registering it on first use"""
+        code = self.codes.get(name)
+        if code is None:
+            if len(self.names) >= MAX_CODES:
+                raise ValueError(f"More than {MAX_CODES} distinct names, cannot intern {name!r}")
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def name(self, code: int) -> str:
+        return self.names[code]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+SEVERITIES = CodeTable(["CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"])
+CATEGORIES = CodeTable([
+    "general", "database", "network", "memory", "disk", "cpu", "security", "application"
+])
+
+_NO_CATEGORIES: Tuple[str, ...] = ()
+
+
+class LogEntry(Mapping):
+    """
+    A parsed log line
+
+    Uses ``__slots__`` instead of a per-line dict: the raw line and message
+    share one string, severity and category are interned integer codes, the
+    category list is a tuple shared between entries, and the extracted-field
+    map is only allocated when a field was found. Entries still read like
+    the dicts they replace (``entry["severity"]``, ``entry.get(...)``,
+    ``dict(entry)``), so downstream agents and the UI are unchanged.
+    """
+
+    __slots__ = (
+        "message", "timestamp", "epoch_ms", "severity_code", "category_code", "categories", "_fields",
+        "template_id", "line_format", "_raw", "count", "_last_seen", "_last_ms", "source", "normalized"
+    )
+
+    _KEYS = (
+        "raw", "timestamp", "epoch_ms", "message", "severity", "category", "categories", "extracted_fields",
+        "template_id", "line_format", "count", "first_seen", "last_seen", "source"
+    )
+
+    def __init__(
+        self,
+        message: str,
+        timestamp: Optional[str] = None,
+        epoch_ms: Optional[int] = None,
+        severity: str = "INFO",
+        category: str = "general",
+        categories: Tuple[str, ...] = _NO_CATEGORIES,
+        extracted_fields: Optional[Dict[str, Any]] = None,
+        template_id: Optional[int] = None,
+        line_format: Optional[str] = None,
+        raw: Optional[str] = None,
+        count: int = 1,
+        last_seen: Optional[str] = None,
+        last_ms: Optional[int] = None,
+        source: Optional[str] = None
+    ):
+        self.message = message
+        self.timestamp = timestamp
+        self.epoch_ms = epoch_ms
+        self.severity_code = SEVERITIES.code(severity)
+        self.category_code = CATEGORIES.code(category)
+        self.categories = categories
+        self._fields = extracted_fields or None
+        self.template_id = template_id
+        # Structured records (JSON, logfmt, syslog) keep the decoded message
+        # text and the original line separately; plain text lines share one
+        self.line_format = line_format
+        self._raw = raw if raw != message else None
+        # Number of (near-)identical lines this entry stands for, and when the
+        # last one was seen; the first one is the entry's own timestamp
+        self.count = count
+        self._last_seen = last_seen
+        self._last_ms = last_ms
+        # Tag of the log source the line came from when several are merged
+        self.source = source
+        # Normalized message (see ``normalize_message``) if the classifier computed it
+        self.normalized: Optional[str] = None
+
+    @property
+    def raw(self) -> str:
+        return self._raw if self._raw is not None else self.message
+
+    @property
+    def first_seen(self) -> Optional[str]:
+        return self.timestamp
+
+    @property
+    def last_seen(self) -> Optional[str]:
+        return self._last_seen if self._last_seen is not None else self.timestamp
+
+    @property
+    def last_ms(self) -> Optional[int]:
+        return self._last_ms if self._last_ms is not None else self.epoch_ms
+
+    def absorb(self, other: "LogEntry") -> None:
+        """Count a later duplicate (or group of duplicates) into this entry"""
+        self.count += other.count
+        self._last_seen = other.last_seen
+        self._last_ms = other.last_ms
+
+    @property
+    def severity(self) -> str:
+        return SEVERITIES.names[self.severity_code]
+
+    @severity.setter
+    def severity(self, name: str) -> None:
+        self.severity_code = SEVERITIES.code(name)
+
+    @property
+    def category(self) -> str:
+        return CATEGORIES.names[self.category_code]
+
+    @category.setter
+    def category(self, name: str) -> None:
+        self.category_code = CATEGORIES.code(name)
+
+    @property
+    def extracted_fields(self) -> Dict[str, Any]:
+        return self._fields if self._fields is not None else {}
+
+    @extracted_fields.setter
+    def extracted_fields(self, fields: Optional[Dict[str, Any]]) -> None:
+        self._fields = fields or None
+
+    # Mapping interface, so entries can be used where dicts were expected
+    def __getitem__(self, key: str) -> Any:
+        if key in self._KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a plain dict copy (e.g. for JSON export)"""
+        return {key: self[key] for key in self._KEYS}
+
+    def __repr__(self) -> str:
+        return f"LogEntry({self.severity}, {self.category}, {self.message[:60]!r})"
+
+    def __reduce__(self):
+        # Pickle by name: codes are per-process and may differ between workers
+        return (
+            LogEntry,
+            (self.message, self.timestamp, self.epoch_ms, self.severity,
+             self.category, self.categories, self._fields, self.template_id, self.line_format, self._raw,
+             self.count, self._last_seen, self._last_ms, self.source)
+        )
@@ -0,0 +1,207 @@
+"""
+Log Follow
+Incremental tailing of growing log files with persisted, rotation-aware checkpoints
+"""
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+import json
+import logging
+import os
+import zlib
+from .log_sources import DEFAULT_CHUNK_SIZE, _iter_stream_lines, detect_compression
+
+logger = logging.getLogger(__name__)
+
+
+FINGERPRINT_BYTES = 256
+
+
+class FileCheckpoint(NamedTuple):
+    """Read position of one file, identified by device and inode"""
+    path: str
+    offset: int
+    fingerprint: int = 0                      # CRC-32 of the first bytes read, to detect rewritten files
+
+
+class _ReadPlan(NamedTuple):
+    key: str
+    path: Path
+    handle: object
+    start: int
+    end: int
+    fingerprint: int
+
+
+def _file_key(stat: os.stat_result) -> str:
+    return f"{stat.st_dev}:{stat.st_ino}"
+
+
+def _fingerprint(handle, offset: int) -> int:
+    """CRC-32 of the first bytes of a file (at most ``offset`` of them)"""
+    handle.seek(0)
+    return zlib.crc32(handle.read(min(offset, FINGERPRINT_BYTES)))
+
+
+def _complete_end(handle, start: int, size: int, chunk_size: int) -> int:
+    """Offset just past the last newline in ``[start, size)``, or ``start`` if there is none"""
+    end = size
+    while end > start:
+        begin = max(start, end - chunk_size)
+        handle.seek(begin)
+        pos = handle.read(end - begin).rfind(b"\n")
+        if pos != -1:
+            return begin + pos + 1
+        end = begin
+    return start
+
+
+class LogFollower:
+    """
+    Reads only the lines appended to a log file (or every file in a directory)
+    since the last committed checkpoint
+
+    Checkpoints store the byte offset per file keyed by device and inode, so
+    they survive restarts and follow a file through rename-based rotation:
+    when ``app.log`` is rotated to ``app.log.1``, the remainder of the old
+    file is still read from its checkpoint before the new ``app.log`` is read
+    from the start. A file that shrank below its checkpoint, or whose first
+    bytes changed, was truncated or rewritten in place (copytruncate
+    rotation) and is re-read from the start. A trailing partial line is left
+    for the next poll. Compressed files are skipped, since they are archives
+    of rotated data.
+
+    ``poll`` returns the new lines; ``commit`` persists the positions after
+    they were processed, so a failed cycle re-reads them next time.
+    """
+
+    CHECKPOINT_SUFFIX = ".follow.json"
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        checkpoint_path: Optional[Union[str, Path]] = None,
+        from_end: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        self.path = Path(path)
+        if checkpoint_path is None:
+            checkpoint_path = (
+                self.path / self.CHECKPOINT_SUFFIX if self.path.is_dir()
+                else self.path.with_name(self.path.name + self.CHECKPOINT_SUFFIX)
+            )
+        self.checkpoint_path = Path(checkpoint_path)
+        self.from_end = from_end
+        self.chunk_size = chunk_size
+        self.checkpoints: Dict[str, FileCheckpoint] = self._load()
+        self._pending: Optional[Dict[str, FileCheckpoint]] = None
+        self.pending_bytes = 0
+
+    def _load(self) -> Dict[str, FileCheckpoint]:
+        """Load persisted checkpoints, if any"""
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                files = json.load(f)["files"]
+            return {
+                key: FileCheckpoint(value["path"], int(value["offset"]), int(value.get("fingerprint", 0)))
+                for key, value in files.items()
+            }
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable follow checkpoint {self.checkpoint_path}: {e}")
+            return {}
+
+    def _candidates(self) -> List[Path]:
+        """Files to read this poll, oldest first"""
+        if self.path.is_dir():
+            files = [
+                p for p in self.path.iterdir()
+                if p.is_file() and not p.name.startswith(".") and not p.name.endswith(".idx")
+                and p != self.checkpoint_path
+            ]
+        else:
+            # The followed file plus its siblings (app.log.1, ...); siblings
+            # are only read when they carry a checkpoint, i.e. were rotated
+            files = [
+                p for p in self.path.parent.iterdir()
+                if p.name.startswith(self.path.name) and p.is_file()
+            ] if self.path.parent.is_dir() else []
+        stamped = []
+        for p in files:
+            try:
+                stamped.append((p.stat().st_mtime_ns, p))
+            except OSError:
+                continue
+        return [p for _, p in sorted(stamped)]
+
+    def _plan(self) -> List[_ReadPlan]:
+        """Open every file with unread complete lines and fix the byte range to read"""
+        plans = []
+        following_dir = self.path.is_dir()
+        for path in self._candidates():
+            try:
+                handle = open(path, "rb")
+            except OSError:
+                continue
+            stat = os.fstat(handle.fileno())
+            key = _file_key(stat)
+            checkpoint = self.checkpoints.get(key)
+            if path != self.path and not following_dir and checkpoint is None:
+                # A sibling this follower never read from is not a rotated copy
+                handle.close()
+                continue
+            if checkpoint is None and detect_compression(handle.read(8)):
+                handle.close()
+                continue
+
+            if checkpoint is None:
+                start = stat.st_size if self.from_end and not self.checkpoints else 0
+            elif stat.st_size < checkpoint.offset or _fingerprint(handle, checkpoint.offset) != checkpoint.fingerprint:
+                logger.info(f"{path} was truncated or rewritten; reading it from the start")
+                start = 0
+            else:
+                start = checkpoint.offset
+            end = _complete_end(handle, start, stat.st_size, self.chunk_size)
+            plans.append(_ReadPlan(key, path, handle, start, end, _fingerprint(handle, end)))
+        return plans
+
+    def poll(self) -> Iterator[str]:
+        """
+        Lazily yield the complete lines appended since the last commit
+
+        The byte ranges are fixed when this is called; lines written while
+        they are being read wait for the next poll.
+        """
+        plans = self._plan()
+        self._pending = {
+            plan.key: FileCheckpoint(str(plan.path), plan.end, plan.fingerprint) for plan in plans
+        }
+        self.pending_bytes = sum(plan.end - plan.start for plan in plans)
+        return self._read(plans)
+
+    def _read(self, plans: List[_ReadPlan]) -> Iterator[str]:
+        try:
+            for plan in plans:
+                if plan.end > plan.start:
+                    plan.handle.seek(plan.start)
+                    yield from _iter_stream_lines(plan.handle, self.chunk_size, limit=plan.end - plan.start)
+        finally:
+            for plan in plans:
+                plan.handle.close()
+
+    def commit(self) -> None:
+        """Persist the positions reached by the last poll"""
+        if self._pending is None:
+            return
+        # Files that disappeared (rotated away and deleted) are forgotten
+        self.checkpoints = self._pending
+        self._pending = None
+        self.pending_bytes = 0
+        state = {"files": {key: checkpoint._asdict() for key, checkpoint in self.checkpoints.items()}}
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.checkpoint_path)
+        except OSError as e:
+            logger.warning(f"Could not persist follow checkpoint {self.checkpoint_path}: {e}")
@@ -0,0 +1,219 @@
+"""
+Log Formats
+Detection and decoding of structured log lines (JSON lines, logfmt, RFC 5424 syslog)
+"""
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from itertools import chain, islice
+import json
+import re
+from .log_timestamps import SNIFF_SAMPLE_LINES, TimestampParser
+
+# Fastest available JSON decoder
+try:
+    import orjson
+    json_loads = orjson.loads
+    JSON_DECODER = "orjson"
+except ImportError:
+    try:
+        import ujson
+        json_loads = ujson.loads
+        JSON_DECODER = "ujson"
+    except ImportError:
+        json_loads = json.loads
+        JSON_DECODER = "json"
+
+TEXT = "text"
+
+# Native keys, in order of preference
+MESSAGE_KEYS = ("msg", "message", "event", "log")
+LEVEL_KEYS = ("level", "lvl", "severity", "loglevel", "levelname", "log.level")
+TIME_KEYS = ("ts", "time", "timestamp", "@timestamp", "datetime")
+SERVICE_KEYS = ("service", "service.name", "svc", "app", "component")
+STATUS_KEYS = ("status", "status_code", "http_status", "statusCode")
+
+LEVEL_NAMES = {
+    "fatal": "CRITICAL", "panic": "CRITICAL", "critical": "CRITICAL", "crit": "CRITICAL",
+    "emerg": "CRITICAL", "emergency": "CRITICAL", "alert": "CRITICAL",
+    "error": "ERROR", "err": "ERROR",
+    "warning": "WARNING", "warn": "WARNING",
+    "info": "INFO", "information": "INFO", "notice": "INFO",
+    "debug": "DEBUG", "trace": "DEBUG", "verbose": "DEBUG"
+}
+
+# Syslog severities 0-7 (emergency ... debug)
+SYSLOG_SEVERITIES = ("CRITICAL", "CRITICAL", "CRITICAL", "ERROR", "WARNING", "INFO", "INFO", "DEBUG")
+
+
+class StructuredRecord(NamedTuple):
+    """Entry fields decoded from a structured log line"""
+    message: str
+    severity: Optional[str]                   # normalized severity name, None if the record has no level
+    timestamp: Any                            # native timestamp value (string or epoch number), or None
+    fields: Dict[str, List[str]]              # extracted fields taken from native keys
+
+
+def severity_from_level(level: Any) -> Optional[str]:
+    """
+    Map a native level to a severity name
+
+    Understands level names ("warn", "ERROR", ...), syslog numbers (0-7) and
+    pino/bunyan numbers (10 trace ... 60 fatal); returns None otherwise.
+    """
+    if isinstance(level, str):
+        name = LEVEL_NAMES.get(level.strip().lower())
+        if name is not None or not level.strip().isdigit():
+            return name
+        level = int(level)
+    if isinstance(level, bool) or not isinstance(level, (int, float)):
+        return None
+    if 0 <= level < len(SYSLOG_SEVERITIES):
+        return SYSLOG_SEVERITIES[int(level)]
+    if level >= 60:
+        return "CRITICAL"
+    if level >= 50:
+        return "ERROR"
+    if level >= 40:
+        return "WARNING"
+    if level >= 30:
+        return "INFO"
+    return "DEBUG" if level >= 10 else None
+
+
+def _first(record: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        value = record.get(key)
+        if value is not None and value != "":
+            return value
+    return None
+
+
+def record_from_mapping(record: Dict[str, Any], line: str) -> StructuredRecord:
+    """Map the native keys of a decoded key/value record to entry fields"""
+    message = _first(record, MESSAGE_KEYS)
+    fields = {}
+    service = _first(record, SERVICE_KEYS)
+    if service is not None and not isinstance(service, (dict, list)):
+        fields["services"] = [str(service)]
+    status = _first(record, STATUS_KEYS)
+    if status is not None and not isinstance(status, (dict, list)):
+        fields["http_status"] = [str(status)]
+    return StructuredRecord(
+        message if isinstance(message, str) else line,
+        severity_from_level(_first(record, LEVEL_KEYS)),
+        _first(record, TIME_KEYS),
+        fields
+    )
+
+
+class JsonLinesDecoder:
+    """Decodes one JSON object per line with the fastest available JSON library"""
+
+    name = "json"
+
+    def decode(self, line: str) -> Optional[StructuredRecord]:
+        stripped = line.strip()
+        if not stripped.startswith("{"):
+            return None
+        try:
+            record = json_loads(stripped)
+        except ValueError:
+            return None
+        if not isinstance(record, dict):
+            return None
+        return record_from_mapping(record, line)
+
+
+class LogfmtDecoder:
+    """Splits ``key=value key="quoted value"`` lines with one compiled regex"""
+
+    name = "logfmt"
+
+    _PAIR = re.compile(r'([^\s="]+)=("(?:[^"\\]|\\.)*"|[^\s"]*)')
+    _ESCAPE = re.compile(r"\\(.)")
+
+    def decode(self, line: str) -> Optional[StructuredRecord]:
+        stripped = line.strip()
+        if not self._PAIR.match(stripped):
+            return None
+        record = {}
+        for key, value in self._PAIR.findall(stripped):
+            if value.startswith('"'):
+                value = value[1:-1]
+                if "\\" in value:
+                    value = self._ESCAPE.sub(r"\1", value)
+            record.setdefault(key, value)
+        # A lone "key=value" is too weak a signal for a structured record
+        if len(record) < 2:
+            return None
+        return record_from_mapping(record, line)
+
+
+class SyslogDecoder:
+    """Splits RFC 5424 syslog lines (``<PRI>1 TIMESTAMP HOST APP PROCID MSGID [SD] MSG``)"""
+
+    name = "syslog"
+
+    _LINE = re.compile(
+        r"<(?P<pri>\d{1,3})>\d{1,2} (?P<ts>\S+) \S+ (?P<app>\S+) \S+ \S+ "
+        r"(?:-|(?:\[(?:[^\]\\]|\\.)*\])+)(?: (?P<msg>.*))?",
+        re.S
+    )
+
+    def decode(self, line: str) -> Optional[StructuredRecord]:
+        match = self._LINE.match(line.strip())
+        if not match:
+            return None
+        pri, timestamp, app, message = match.group("pri", "ts", "app", "msg")
+        fields = {"services": [app]} if app != "-" else {}
+        return StructuredRecord(
+            (message or "").lstrip("\ufeff"),
+            SYSLOG_SEVERITIES[int(pri) & 7],
+            timestamp if timestamp != "-" else None,
+            fields
+        )
+
+
+DECODERS = {decoder.name: decoder for decoder in (JsonLinesDecoder, LogfmtDecoder, SyslogDecoder)}
+
+
+def make_decoder(line_format: Optional[str]):
+    """Return a decoder for a line format name, or None for plain text"""
+    if line_format is None or line_format == TEXT:
+        return None
+    try:
+        return DECODERS[line_format]()
+    except KeyError:
+        raise ValueError(f"Unknown log line format: {line_format}") from None
+
+
+def sniff_format(sample: Iterable[str]) -> str:
+    """
+    Detect the line format of a sample of lines
+
+    Returns the structured format that decodes most lines when it covers
+    more than half of the (non-blank) sample, otherwise ``"text"``.
+    """
+    decoders = [decoder() for decoder in DECODERS.values()]
+    hits = dict.fromkeys(DECODERS, 0)
+    total = 0
+    for line in sample:
+        if not line.strip():
+            continue
+        total += 1
+        for decoder in decoders:
+            if decoder.decode(line) is not None:
+                hits[decoder.name] += 1
+                break
+    best = max(hits, key=hits.get)
+    return best if hits[best] * 2 > total else TEXT
+
+
+def sniff_stream(
+    lines: Iterable[str],
+    sample_size: int = SNIFF_SAMPLE_LINES
+) -> Tuple[str, TimestampParser, Iterator[str]]:
+    """Sniff the line and timestamp formats from the head of a lazy stream"""
+    lines = iter(lines)
+    head = list(islice(lines, sample_size))
+    sample = [line for line in head if line.strip()]
+    return sniff_format(sample), TimestampParser.sniff(sample), chain(head, lines)
@@ -0,0 +1,201 @@
+"""
+Log Histogram
+Per-category, per-severity line counts in fixed time buckets, with EWMA burst detection
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import math
+import time
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_BUCKET_MS = 60_000
+MAX_BUCKETS = 100_000                         # wider buckets beyond this, e.g. for stray epoch-0 lines
+
+DEFAULT_BURST_ALPHA = 0.3                     # EWMA smoothing factor per bucket
+DEFAULT_BURST_THRESHOLD = 3.0                 # deviations above the baseline that make a burst
+DEFAULT_MIN_BURST_COUNT = 5                   # lines a bucket needs before it can be a burst
+BURST_LEARNING_RATE = 0.25                    # share of alpha the baseline learns at from bursting buckets
+
+
+def _format_ms(epoch_ms: int) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch_ms / 1000))
+
+
+class TimeHistogramBuilder:
+    """
+    Sparse streaming counts keyed by (bucket, category, severity)
+
+    Only buckets that saw lines take memory while streaming; ``build``
+    lays them out densely. Builders of consecutive shards merge by adding
+    counts.
+    """
+
+    def __init__(self, bucket_ms: int = DEFAULT_BUCKET_MS):
+        self.bucket_ms = bucket_ms
+        self.counts: Dict[Tuple[int, str, str], int] = {}
+        self.undated = 0                      # lines without a timestamp
+
+    def add(self, epoch_ms: Optional[int], category: str, severity: str) -> None:
+        if epoch_ms is None:
+            self.undated += 1
+            return
+        key = (epoch_ms // self.bucket_ms, category, severity)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def merge(self, other: "TimeHistogramBuilder") -> "TimeHistogramBuilder":
+        counts = self.counts
+        for key, count in other.counts.items():
+            counts[key] = counts.get(key, 0) + count
+        self.undated += other.undated
+        return self
+
+    def build(self) -> "TimeHistogram":
+        """Dense (bucket x series) count array covering the first to the last dated line"""
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for time histograms")
+        series = sorted({(category, severity) for _, category, severity in self.counts})
+        if not series:
+            return TimeHistogram(np.zeros((0, 0), dtype=np.int64), 0, self.bucket_ms, [], self.undated)
+
+        buckets = np.fromiter((key[0] for key in self.counts), dtype=np.int64, count=len(self.counts))
+        first = int(buckets.min())
+        factor = max(1, math.ceil((int(buckets.max()) - first + 1) / MAX_BUCKETS))
+        column = {name: i for i, name in enumerate(series)}
+        columns = np.fromiter(
+            (column[key[1:]] for key in self.counts), dtype=np.int64, count=len(self.counts)
+        )
+        values = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+
+        rows = (buckets - first) // factor
+        counts = np.zeros((int(rows.max()) + 1, len(series)), dtype=np.int64)
+        np.add.at(counts, (rows, columns), values)
+        return TimeHistogram(counts, first * self.bucket_ms, self.bucket_ms * factor, series, self.undated)
+
+
+class TimeHistogram:
+    """
+    Line counts per time bucket (rows) and (category, severity) series (columns)
+
+    ``counts[t, s]`` is the number of lines of series ``series[s]`` in
+    ``[start_ms + t * bucket_ms, start_ms + (t + 1) * bucket_ms)``. Totals
+    over categories or severities are column sums, so charts, timelines
+    and scores read this aggregate instead of re-scanning entries.
+    """
+
+    def __init__(self, counts, start_ms: int, bucket_ms: int, series: List[Tuple[str, str]], undated: int = 0):
+        self.counts = counts
+        self.start_ms = start_ms
+        self.bucket_ms = bucket_ms
+        self.series = series
+        self.undated = undated
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @property
+    def bucket_starts(self):
+        """Epoch milliseconds at which every bucket starts"""
+        return self.start_ms + np.arange(len(self), dtype=np.int64) * self.bucket_ms
+
+    def select(self, category: Optional[str] = None, severity: Optional[str] = None):
+        """Per-bucket counts summed over the series matching a category and/or severity"""
+        columns = [
+            i for i, (cat, sev) in enumerate(self.series)
+            if (category is None or cat == category) and (severity is None or sev == severity)
+        ]
+        return self.counts[:, columns].sum(axis=1)
+
+    def window(self, start_ms: int, end_ms: int) -> "TimeHistogram":
+        """The buckets overlapping ``[start_ms, end_ms]``, as a histogram sharing this one's counts"""
+        first = max((start_ms - self.start_ms) // self.bucket_ms, 0)
+        last = min((end_ms - self.start_ms) // self.bucket_ms + 1, len(self))
+        first = min(first, last)
+        return TimeHistogram(
+            self.counts[first:last], self.start_ms + first * self.bucket_ms, self.bucket_ms, self.series
+        )
+
+    def by(self, column: str = "severity") -> Dict[str, Any]:
+        """Per-bucket counts for every severity (or category) name"""
+        position = {"category": 0, "severity": 1}[column]
+        names = sorted({name[position] for name in self.series})
+        return {name: self.select(**{column: name}) for name in names}
+
+
+def detect_bursts(
+    histogram: TimeHistogram,
+    alpha: float = DEFAULT_BURST_ALPHA,
+    threshold: float = DEFAULT_BURST_THRESHOLD,
+    min_count: int = DEFAULT_MIN_BURST_COUNT,
+    severities: Optional[Tuple[str, ...]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Runs of buckets where a series spikes above its EWMA baseline
+
+    Buckets are visited in time order, all series at once. A bucket is
+    bursting when it holds at least ``min_count`` lines and exceeds the
+    exponentially weighted mean of the previous buckets by ``threshold``
+    deviations. The deviation is the EWMA standard deviation, but at least
+    the Poisson spread of the mean, and at least one. Bursting buckets
+    move the mean at ``BURST_LEARNING_RATE`` of the usual rate and leave
+    the variance alone.
+    Consecutive bursting buckets of a series form one burst. Only ``severities`` are examined,
+    if given.
+
+    Returns bursts sorted by start time, each with its category, severity,
+    start and end (epoch ms and formatted), total lines, peak bucket and
+    the baseline it was measured against.
+    """
+    if not NUMPY_AVAILABLE or len(histogram) < 2:
+        return []
+    columns = [
+        i for i, (_, severity) in enumerate(histogram.series)
+        if severities is None or severity in severities
+    ]
+    if not columns:
+        return []
+    counts = histogram.counts[:, columns].astype(np.float64)
+
+    flags = np.zeros(counts.shape, dtype=bool)
+    baselines = np.zeros(counts.shape)
+    mean = counts[0].copy()
+    var = np.zeros(len(columns))
+    for t in range(1, len(counts)):
+        x = counts[t]
+        deviation = x - mean
+        spread = np.maximum(np.maximum(np.sqrt(var), np.sqrt(mean)), 1.0)
+        bursting = flags[t] = (x >= min_count) & (deviation > threshold * spread)
+        baselines[t] = mean
+        # Bursting buckets only nudge the mean and leave the variance: a
+        # sustained spike stays flagged, a lasting level shift is absorbed
+        mean = mean + np.where(bursting, alpha * BURST_LEARNING_RATE, alpha) * deviation
+        var = np.where(bursting, var, (1 - alpha) * (var + alpha * deviation * deviation))
+
+    bursts = []
+    bucket_ms = histogram.bucket_ms
+    for j, column in enumerate(columns):
+        category, severity = histogram.series[column]
+        rows = np.flatnonzero(flags[:, j])
+        if not len(rows):
+            continue
+        # Split the flagged rows into runs of consecutive buckets
+        for run in np.split(rows, np.flatnonzero(np.diff(rows) > 1) + 1):
+            first, last = int(run[0]), int(run[-1])
+            start_ms = histogram.start_ms + first * bucket_ms
+            end_ms = histogram.start_ms + (last + 1) * bucket_ms
+            bursts.append({
+                "category": category,
+                "severity": severity,
+                "start_ms": start_ms,
+                "end_ms": end_ms,
+                "start": _format_ms(start_ms),
+                "end": _format_ms(end_ms),
+                "count": int(counts[first:last + 1, j].sum()),
+                "peak": int(counts[first:last + 1, j].max()),
+                "baseline": round(float(baselines[first, j]), 2)
+            })
+    bursts.sort(key=lambda burst: (burst["start_ms"], -burst["peak"]))
+    return bursts
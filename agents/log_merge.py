@@ -0,0 +1,89 @@
+"""
+Log Merge
+Time-ordered k-way merge of several log sources into one entry stream
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+from operator import itemgetter
+import heapq
+from .log_classifier import LogClassifier
+from .log_entry import LogEntry
+from .log_sources import DEFAULT_CHUNK_SIZE, LogSource, MappedLogFile, iter_lines
+
+LogSources = Union[Mapping[str, LogSource], Sequence[LogSource]]
+
+
+def source_name(source: LogSource, index: int) -> str:
+    """Tag for an unnamed source: its file name, else its position"""
+    if isinstance(source, MappedLogFile):
+        return source.path.name
+    if isinstance(source, (str, Path)):
+        return Path(source).name
+    name = getattr(source, "name", None)
+    return Path(name).name if isinstance(name, str) else f"source-{index + 1}"
+
+
+def source_note(issue: Mapping[str, Any]) -> str:
+    """Line naming the source of an issue, for prompts ("" for single-source logs)"""
+    return f"\n- Source: {issue['source']}" if issue.get("source") else ""
+
+
+def named_sources(sources: LogSources) -> List[Tuple[str, LogSource]]:
+    """(tag, source) pairs for a {tag: source} mapping or a sequence of sources"""
+    if isinstance(sources, Mapping):
+        return [(str(name), source) for name, source in sources.items()]
+    pairs = []
+    seen: Dict[str, int] = {}
+    for i, source in enumerate(sources):
+        name = source_name(source, i)
+        # Same-named files from different directories get distinct tags
+        seen[name] = seen.get(name, 0) + 1
+        pairs.append((name if seen[name] == 1 else f"{name}#{seen[name]}", source))
+    return pairs
+
+
+def _keyed_entries(entries: Iterator[LogEntry], source: str) -> Iterator[Tuple[int, LogEntry]]:
+    """Tag entries with their source and pair each with its merge key"""
+    # Undated entries keep the time of the last dated one, so they stay in place;
+    # those before the first dated entry (e.g. header lines) come out first
+    last_ms = 0
+    for entry in entries:
+        entry.source = source
+        if entry.epoch_ms is not None:
+            last_ms = entry.epoch_ms
+        yield last_ms, entry
+
+
+def merge_entries(streams: Dict[str, Iterator[LogEntry]]) -> Iterator[LogEntry]:
+    """
+    Merge per-source entry streams into one stream ordered by timestamp
+
+    A heap holds the next entry of every stream, so memory is O(number of
+    sources) whatever their length. Each stream is assumed to be in time
+    order already, as log files are. Entries with equal timestamps come
+    out in source order, and the source tag is set on every entry.
+    """
+    keyed = [_keyed_entries(entries, source) for source, entries in streams.items()]
+    for _, entry in heapq.merge(*keyed, key=itemgetter(0)):
+        yield entry
+
+
+def iter_merged_entries(
+    classifier: LogClassifier,
+    sources: LogSources,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    line_format: Optional[str] = None
+) -> Iterator[LogEntry]:
+    """
+    Lazily read, classify and merge several log sources by timestamp
+
+    Every source is streamed with ``iter_lines`` (so it may be compressed)
+    and sniffs its own line and timestamp formats unless ``line_format``
+    is given. All sources share the classifier, and so its template miner
+    and cache.
+    """
+    streams = {
+        name: classifier.iter_entries(iter_lines(source, chunk_size), line_format=line_format)
+        for name, source in named_sources(sources)
+    }
+    return merge_entries(streams)
@@ -0,0 +1,297 @@
+"""
+Log Model
+Hashing-vectorizer linear classifier of log severity and category, trained
+offline and applied in vectorized batches
+
+Train from labeled lines (JSON lines with "message" and "severity" and/or
+"category" keys):
+
+    python -m agents.log_model labeled.jsonl model.npz
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from zlib import crc32
+import json
+import re
+import sys
+from .log_cache import normalize_message
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_N_FEATURES = 1 << 18                  # hashed feature buckets per head
+DEFAULT_MIN_CONFIDENCE = 0.6                  # predicted-class probability needed to override the rules
+DEFAULT_BATCH_SIZE = 4096                     # lines per vectorized inference batch
+MAX_MESSAGE_CHARS = 1000                      # long stack traces are classified by their head
+MAX_CACHED_TOKENS = 1 << 20                   # token -> bucket memo is reset beyond this
+MAX_CACHED_MESSAGES = 1 << 16                 # normalized message -> features memo is reset beyond this
+
+_TOKEN = re.compile(r"[a-z_][a-z0-9_]*|0")
+
+
+class HashingVectorizer:
+    """
+    Maps messages to hashed unigram and bigram feature indices
+
+    Messages are lower-cased with digit runs and hex IDs masked (see
+    ``normalize_message``), so "timeout after 30s" and "timeout after 5s"
+    share features. Tokens are hashed with CRC-32, which is stable across
+    processes and releases, unlike ``hash()``. Bucket ``n_features`` is a
+    bias feature present in every message. Features are memoized per
+    normalized message, so repeated line shapes are tokenized once.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES):
+        self.n_features = n_features
+        self._buckets: Dict[str, int] = {}
+        self._messages: Dict[str, List[int]] = {}
+
+    def features(self, message: str) -> List[int]:
+        """Feature indices of one message, bias first (with repeats)"""
+        text = normalize_message(message[:MAX_MESSAGE_CHARS].lower())
+        indices = self._messages.get(text)
+        if indices is None:
+            if len(self._messages) >= MAX_CACHED_MESSAGES:
+                self._messages.clear()
+            indices = self._messages[text] = self._hash_tokens(text)
+        return indices
+
+    def _hash_tokens(self, text: str) -> List[int]:
+        buckets = self._buckets
+        if len(buckets) > MAX_CACHED_TOKENS:
+            buckets.clear()
+        n = self.n_features
+        indices = [n]
+        previous = None
+        for token in _TOKEN.findall(text):
+            index = buckets.get(token)
+            if index is None:
+                index = buckets[token] = crc32(token.encode()) % n
+            indices.append(index)
+            if previous is not None:
+                bigram = previous + " " + token
+                index = buckets.get(bigram)
+                if index is None:
+                    index = buckets[bigram] = crc32(bigram.encode()) % n
+                indices.append(index)
+            previous = token
+        return indices
+
+    def transform(self, messages: Iterable[str]) -> Tuple[Any, Any]:
+        """Concatenated feature indices of a batch and the offset of every message in them"""
+        indices: List[int] = []
+        offsets: List[int] = []
+        features = self.features
+        for message in messages:
+            offsets.append(len(indices))
+            indices.extend(features(message))
+        return np.array(indices, dtype=np.int64), np.array(offsets, dtype=np.int64)
+
+    def __getstate__(self):
+        # The memos are rebuilt lazily, e.g. in worker processes
+        return {"n_features": self.n_features}
+
+    def __setstate__(self, state):
+        self.__init__(state["n_features"])
+
+
+def _scores(weights, indices, offsets):
+    """Per-message class scores: sums of the weight rows of each message's features"""
+    return np.add.reduceat(weights[indices], offsets, axis=0)
+
+
+def _softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+
+class LinearHead:
+    """Multinomial logistic regression over hashed features (one weight row per feature)"""
+
+    def __init__(self, labels: Sequence[str], weights):
+        self.labels = list(labels)
+        self.weights = weights                # (n_features + 1) x len(labels), float32
+
+    def predict(self, indices, offsets) -> Tuple[Any, Any]:
+        """Label index and probability of the best label of every message"""
+        probabilities = _softmax(_scores(self.weights, indices, offsets))
+        best = probabilities.argmax(axis=1)
+        return best, probabilities[np.arange(len(best)), best]
+
+    @classmethod
+    def train(
+        cls,
+        examples: List[Tuple[List[int], str]],
+        n_features: int,
+        epochs: int = 10,
+        learning_rate: float = 1.0,
+        l2: float = 1e-6,
+        batch_size: int = 32,
+        seed: int = 0
+    ) -> "LinearHead":
+        """Fit with mini-batch SGD on (feature indices, label) pairs"""
+        labels = sorted({label for _, label in examples})
+        label_index = {label: i for i, label in enumerate(labels)}
+        targets = np.array([label_index[label] for _, label in examples], dtype=np.int64)
+        weights = np.zeros((n_features + 1, len(labels)), dtype=np.float32)
+        rng = np.random.default_rng(seed)
+
+        for epoch in range(epochs):
+            rate = learning_rate / (1 + epoch)
+            order = rng.permutation(len(examples))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                rows = [examples[i][0] for i in batch]
+                lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+                indices = np.fromiter((j for row in rows for j in row), dtype=np.int64, count=int(lengths.sum()))
+                offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+                gradient = _softmax(_scores(weights, indices, offsets).astype(np.float64))
+                gradient[np.arange(len(batch)), targets[batch]] -= 1.0
+                # Only the rows of features present in the batch are updated (lazy L2)
+                touched = np.unique(indices)
+                weights[touched] *= np.float32(1 - rate * l2)
+                step = (-rate / len(batch)) * np.repeat(gradient, lengths, axis=0)
+                np.add.at(weights, indices, step.astype(np.float32))
+        return cls(labels, weights)
+
+
+class LogModel:
+    """
+    Learned severity and category classifier for log messages
+
+    Both heads share one ``HashingVectorizer`` pass. ``apply`` relabels a
+    batch of classified entries with one gathered sum of weight rows per
+    head, so the per-line cost is the tokenizing loop plus a few NumPy
+    operations amortized over the batch. Labels are only overridden when
+    the model's probability reaches ``min_confidence``.
+    """
+
+    def __init__(
+        self,
+        vectorizer: HashingVectorizer,
+        severity: Optional[LinearHead] = None,
+        category: Optional[LinearHead] = None,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE
+    ):
+        self.vectorizer = vectorizer
+        self.severity = severity
+        self.category = category
+        self.min_confidence = min_confidence
+
+    def predict(self, messages: Sequence[str]) -> Dict[str, List[Tuple[str, float]]]:
+        """{"severity"/"category": [(label, probability), ...]} for a batch of messages"""
+        indices, offsets = self.vectorizer.transform(messages)
+        predictions = {}
+        for name, head in (("severity", self.severity), ("category", self.category)):
+            if head is not None and len(offsets):
+                best, probability = head.predict(indices, offsets)
+                predictions[name] = [
+                    (head.labels[i], p) for i, p in zip(best.tolist(), probability.tolist())
+                ]
+        return predictions
+
+    def apply(self, entries: Sequence[Any], skip_category: Optional[str] = None) -> None:
+        """
+        Relabel classified LogEntry objects in place
+
+        Severity is only relabeled for plain-text lines; structured records
+        keep the level from their native key. A predicted category moves to
+        the front of ``categories`` ("general" clears them). Entries of
+        category ``skip_category`` (lines the issues-only prefilter did not
+        classify) are left alone.
+        """
+        if skip_category is not None:
+            entries = [entry for entry in entries if entry.category != skip_category]
+        if not entries:
+            return
+        predictions = self.predict([entry.message for entry in entries])
+        threshold = self.min_confidence
+
+        for entry, (severity, probability) in zip(entries, predictions.get("severity", ())):
+            if probability >= threshold and entry.line_format is None:
+                entry.severity = severity
+        for entry, (category, probability) in zip(entries, predictions.get("category", ())):
+            if probability >= threshold and category != entry.category:
+                entry.category = category
+                entry.categories = () if category == "general" else (category,) + tuple(
+                    other for other in entry.categories if other != category
+                )
+
+    @classmethod
+    def train(
+        cls,
+        examples: Iterable[Dict[str, Any]],
+        n_features: int = DEFAULT_N_FEATURES,
+        epochs: int = 10,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE
+    ) -> "LogModel":
+        """Fit both heads on dicts with a "message" and a "severity" and/or "category" label"""
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for the log model")
+        vectorizer = HashingVectorizer(n_features)
+        by_head: Dict[str, List[Tuple[List[int], str]]] = {"severity": [], "category": []}
+        for example in examples:
+            features = vectorizer.features(example["message"])
+            for name, labeled in by_head.items():
+                if example.get(name):
+                    labeled.append((features, str(example[name])))
+        heads = {
+            name: LinearHead.train(labeled, n_features, epochs) if labeled else None
+            for name, labeled in by_head.items()
+        }
+        return cls(vectorizer, heads["severity"], heads["category"], min_confidence)
+
+    def save(self, path: str) -> None:
+        arrays = {"n_features": np.array(self.vectorizer.n_features)}
+        for name, head in (("severity", self.severity), ("category", self.category)):
+            if head is not None:
+                arrays[f"{name}_labels"] = np.array(head.labels)
+                arrays[f"{name}_weights"] = head.weights
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str, min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> "LogModel":
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for the log model")
+        with np.load(path) as arrays:
+            heads = {
+                name: LinearHead(arrays[f"{name}_labels"].tolist(), arrays[f"{name}_weights"].astype(np.float32))
+                if f"{name}_weights" in arrays else None
+                for name in ("severity", "category")
+            }
+            vectorizer = HashingVectorizer(int(arrays["n_features"]))
+        return cls(vectorizer, heads["severity"], heads["category"], min_confidence)
+
+
+def load_examples(path: str) -> Iterable[Dict[str, Any]]:
+    """Labeled examples from a JSON-lines file"""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="Train the log severity/category model")
+    parser.add_argument("examples", help="JSON lines with 'message' and 'severity' and/or 'category'")
+    parser.add_argument("output", help="where to write the model (.npz)")
+    parser.add_argument("--features", type=int, default=DEFAULT_N_FEATURES, help="hashed feature buckets")
+    parser.add_argument("--epochs", type=int, default=10, help="passes over the examples")
+    args = parser.parse_args(argv)
+
+    model = LogModel.train(load_examples(args.examples), args.features, args.epochs)
+    model.save(args.output)
+    for name, head in (("severity", model.severity), ("category", model.category)):
+        if head is not None:
+            print(f"{name}: {len(head.labels)} labels ({', '.join(head.labels)})")
+    print(f"Model written to {args.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,117 @@
+"""
+Log Priority
+Scoring and bounded top-K selection of the issues handed to downstream agents
+"""
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import heapq
+import math
+from .log_entry import LogEntry
+
+DEFAULT_TOP_K = 20
+
+SEVERITY_WEIGHTS = {"CRITICAL": 4.0, "ERROR": 2.0}
+FREQUENCY_WEIGHT = 1.0                        # per tenfold increase in occurrences
+BURST_WEIGHT = 1.0                            # per tenfold increase in occurrences per minute
+CATEGORY_DECAY = 0.7                          # score factor per higher-ranked issue of the same category
+
+# Candidates kept per selected issue, so diversity re-ranking has room to work
+CANDIDATE_FACTOR = 4
+
+
+def issue_score(issue: Mapping[str, Any], frequency: int = 1, surge: float = 0.0) -> float:
+    """
+    Priority of an issue from its severity, frequency and burstiness
+
+    ``frequency`` is the number of lines the issue stands for beyond its own
+    occurrence count, e.g. the size of its message template. Burstiness is
+    the occurrence rate between the first and last collapsed occurrence, so
+    ten timeouts in one minute outrank ten spread over an hour, plus
+    ``surge``: how many times its baseline the issue's category and severity
+    peaked at in a burst the issue took part in (see ``detect_bursts``).
+    """
+    count = issue.get("count", 1)
+    score = SEVERITY_WEIGHTS.get(issue.get("severity"), 1.0)
+    score += FREQUENCY_WEIGHT * math.log10(max(count, frequency, 1))
+
+    first_ms = issue.get("epoch_ms")
+    last_ms = issue.last_ms if isinstance(issue, LogEntry) else issue.get("last_ms")
+    if count > 1 and first_ms is not None and last_ms is not None:
+        minutes = max(last_ms - first_ms, 0) / 60000
+        score += BURST_WEIGHT * math.log10(1 + count / (1 + minutes))
+    if surge:
+        score += BURST_WEIGHT * math.log10(1 + surge)
+    return score
+
+
+def _surge(issue: Mapping[str, Any], bursts: Dict[Tuple[str, str], List[Dict[str, Any]]]) -> float:
+    """Largest peak-to-baseline ratio of the bursts of the issue's series it overlaps"""
+    first_ms = issue.get("epoch_ms")
+    series = bursts.get((issue.get("category"), issue.get("severity")))
+    if first_ms is None or not series:
+        return 0.0
+    last_ms = issue.last_ms if isinstance(issue, LogEntry) else issue.get("last_ms") or first_ms
+    return max(
+        (burst["peak"] / max(burst["baseline"], 1.0) for burst in series
+         if burst["start_ms"] <= last_ms and first_ms < burst["end_ms"]),
+        default=0.0
+    )
+
+
+def prioritize_issues(
+    issues: List[Any],
+    k: int = DEFAULT_TOP_K,
+    templates: Optional[List[Dict[str, Any]]] = None,
+    bursts: Optional[List[Dict[str, Any]]] = None
+) -> List[Any]:
+    """
+    The ``k`` highest-value issues, best first
+
+    Only the best issue of each message template competes, so a storm of
+    one template cannot crowd out the rest. Candidates are then selected
+    with a bounded heap (``heapq.nlargest``), in O(n log k) over the issue
+    list, and re-ranked greedily for category diversity: every issue
+    already picked from a category scales the score of the next one by
+    ``CATEGORY_DECAY``. ``templates`` is the template summary of the
+    analysis, used for template frequencies, and ``bursts`` its detected
+    bursts.
+    """
+    if k <= 0 or not issues:
+        return []
+    template_counts = {t["template_id"]: t["count"] for t in templates or []}
+    bursts_by_series: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for burst in bursts or []:
+        bursts_by_series.setdefault((burst["category"], burst["severity"]), []).append(burst)
+    scored = []
+    best_of_template: Dict[Any, Tuple[float, int, Any]] = {}
+    for position, issue in enumerate(issues):
+        template_id = issue.get("template_id")
+        # Position breaks ties in favour of earlier issues and keeps entries out of comparisons
+        item = (
+            issue_score(
+                issue, template_counts.get(template_id, 1),
+                _surge(issue, bursts_by_series) if bursts_by_series else 0.0
+            ),
+            -position, issue
+        )
+        if template_id is None:
+            scored.append(item)
+        elif template_id not in best_of_template or item[:2] > best_of_template[template_id][:2]:
+            best_of_template[template_id] = item
+    scored.extend(best_of_template.values())
+    candidates = heapq.nlargest(k * CANDIDATE_FACTOR, scored)
+
+    selected = []
+    picked_categories: Dict[str, int] = {}
+    while candidates and len(selected) < k:
+        best = max(
+            range(len(candidates)),
+            key=lambda i: (
+                candidates[i][0] * CATEGORY_DECAY ** picked_categories.get(candidates[i][2].get("category"), 0),
+                candidates[i][1]
+            )
+        )
+        _, _, issue = candidates.pop(best)
+        category = issue.get("category")
+        picked_categories[category] = picked_categories.get(category, 0) + 1
+        selected.append(issue)
+    return selected
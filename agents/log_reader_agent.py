@@ -2,10 +2,28 @@
 Log Reader/Classifier Agent
 Parses, categorizes, and extracts fields from operational logs
 """
-from typing import Dict, Any, List
-import re
-from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import os
 from .base_agent import BaseAgent
+from .log_cache import LRUCache
+from .log_classifier import (
+    CANDIDATE_SEVERITIES, LogAccumulator, LogClassifier, classify_shard, load_keyword_table
+)
+from .log_dedup import repeat_note
+from .log_embeddings import CentroidCategorizer
+from .log_entry import LogEntry
+from .log_formats import make_decoder, sniff_format, sniff_stream
+from .log_histogram import NUMPY_AVAILABLE, detect_bursts
+from .log_merge import iter_merged_entries
+from .log_model import LogModel
+from .log_priority import prioritize_issues
+from .log_records import assemble_records
+from .log_sources import MappedLogFile, is_archive, is_compressed, iter_lines, split_line_ranges
+from .log_templates import TemplateMiner
+from .log_timestamps import SNIFF_SAMPLE_LINES, TimestampParser
+from config import Config
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,32 +32,73 @@ logger = logging.getLogger(__name__)
 class LogReaderAgent(BaseAgent):
     """Agent responsible for reading and classifying log entries"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        keyword_table: Optional[Dict[str, List[str]]] = None,
+        embeddings: Optional[Any] = None
+    ):
         super().__init__(name="Log Reader Agent", api_key=api_key)
-        self.severity_patterns = {
-            "CRITICAL": r"\b(critical|fatal|panic|emergency)\b",
-            "ERROR": r"\b(error|err|exception|failed|failure)\b",
-            "WARNING": r"\b(warning|warn|deprecated)\b",
-            "INFO": r"\b(info|information|notice)\b",
-            "DEBUG": r"\b(debug|trace|verbose)\b"
-        }
+        self.classifier = LogClassifier(max_record_lines=Config.LOG_MULTILINE_MAX_LINES)
         
-        self.issue_categories = {
-            "database": ["connection", "query", "timeout", "deadlock", "schema"],
-            "network": ["timeout", "refused", "unreachable", "latency", "dns"],
-            "memory": ["oom", "memory", "heap", "stack", "allocation"],
-            "disk": ["disk", "storage", "space", "inode", "filesystem"],
-            "cpu": ["cpu", "load", "throttling", "performance"],
-            "security": ["auth", "permission", "unauthorized", "forbidden", "ssl"],
-            "application": ["null", "exception", "crash", "segfault", "assertion"]
-        }
+        # User-supplied category keywords (config file first, then explicit table)
+        if Config.LOG_CATEGORY_KEYWORDS_FILE:
+            try:
+                self.classifier.add_keywords(load_keyword_table(Config.LOG_CATEGORY_KEYWORDS_FILE))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not load category keywords from {Config.LOG_CATEGORY_KEYWORDS_FILE}: {e}")
+        if keyword_table:
+            self.classifier.add_keywords(keyword_table)
+        
+        # Learned severity/category model, trained offline (see agents.log_model)
+        if Config.LOG_CLASSIFIER_MODEL:
+            try:
+                self.classifier.model = LogModel.load(Config.LOG_CLASSIFIER_MODEL, Config.LOG_MODEL_MIN_CONFIDENCE)
+                self.classifier.model_batch_size = Config.LOG_MODEL_BATCH_SIZE
+            except (OSError, KeyError, ValueError, ImportError) as e:
+                logger.warning(f"Could not load log classifier model from {Config.LOG_CLASSIFIER_MODEL}: {e}")
+        
+        # Lines no rule categorizes go to the nearest category centroid of a shared embedding model
+        if embeddings is not None and Config.LOG_EMBEDDING_FALLBACK:
+            try:
+                self.classifier.categorizer = CentroidCategorizer(
+                    embeddings, self.classifier.issue_categories, Config.LOG_EMBEDDING_MIN_SIMILARITY
+                )
+            except ImportError as e:
+                logger.warning(f"Embedding categorization disabled: {e}")
+        
+        self.severity_patterns = self.classifier.severity_patterns
+        self.issue_categories = self.classifier.issue_categories
+        self._reset_run_state()
+    
+    def _reset_run_state(self) -> None:
+        """Start a fresh template miner and classification cache"""
+        self.classifier.templates = TemplateMiner() if Config.LOG_TEMPLATE_MINING else None
+        cache_size = Config.LOG_CLASSIFICATION_CACHE_SIZE
+        self.classifier.cache = LRUCache(cache_size) if cache_size > 0 else None
+        if self.classifier.categorizer is not None:
+            self.classifier.categorizer.reset()
     
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Parse and classify logs
         
         Args:
-            input_data: Dict with 'logs' key containing raw log text
+            input_data: Dict with 'logs' key containing raw log text, or
+                'log_source' key with a file path, binary file object or
+                MappedLogFile to stream from in bounded chunks (files may
+                be gzip/bz2/xz/zstd compressed or tar archives), or
+                'lines' key with an iterable of lines (e.g. from a
+                LogFollower), or 'log_sources' key with several sources
+                ({tag: source} or a list) merged into one time-ordered
+                stream whose entries carry a 'source' tag. Set
+                'columnar' to also return a NumPy-backed 'log_table', and
+                'line_format' ("json", "logfmt", "syslog", "text") to skip
+                format detection. Set 'issues_only' to fully classify only
+                WARNING and above (other lines are just counted). Set
+                'incremental' to keep mined templates
+                and cached classifications from the previous call (follow
+                mode), so template IDs stay stable between cycles
             
         Returns:
             Dict with parsed and classified log entries
@@ -49,38 +108,82 @@ class LogReaderAgent(BaseAgent):
         
         try:
             raw_logs = input_data.get("logs", "")
+            log_source = input_data.get("log_source")
+            lines = input_data.get("lines")
+            log_sources = input_data.get("log_sources")
+            columnar = input_data.get("columnar", Config.LOG_COLUMNAR_TABLE)
+            line_format = input_data.get("line_format", Config.LOG_LINE_FORMAT)
+            line_format = None if line_format == "auto" else line_format
+            self.classifier.issues_only = input_data.get("issues_only", Config.LOG_ISSUES_ONLY)
             
-            if not raw_logs:
+            # Templates and memoized classifications are per run unless incremental
+            if not input_data.get("incremental"):
+                self._reset_run_state()
+            
+            if not raw_logs and log_source is None and lines is None and not log_sources:
                 return {
                     "success": False,
                     "error": "No logs provided",
                     "agent": self.name
                 }
             
-            # Parse log entries
-            log_entries = self._parse_logs(raw_logs)
-            self.log_action(f"Parsed {len(log_entries)} log entries")
+            shard_path = self._shardable_path(log_source)
+            if lines is not None:
+                # Incremental mode: only the given (new) lines are classified
+                accumulator = self._new_accumulator(False, columnar).update(self._iter_entries(lines, line_format))
+                keep_entries = False
+            elif log_sources:
+                # Multi-source mode: per-source streams merged by timestamp
+                self.log_action(f"Merging {len(log_sources)} log sources by timestamp")
+                accumulator = self._new_accumulator(False, columnar).update(
+                    iter_merged_entries(self.classifier, log_sources, Config.LOG_READ_CHUNK_SIZE, line_format)
+                )
+                keep_entries = False
+            elif shard_path is not None:
+                # Parallel mode: newline-aligned shards classified in worker processes
+                mapped = log_source if isinstance(log_source, MappedLogFile) else None
+                accumulator = self._classify_parallel(
+                    shard_path, Config.LOG_READER_WORKERS, columnar, line_format, mapped
+                )
+                keep_entries = False
+            elif log_source is not None:
+                # Streaming mode: entries are classified lazily and only
+                # aggregate counters and issues are kept in memory
+                lines = iter_lines(log_source, Config.LOG_READ_CHUNK_SIZE)
+                self.log_action("Streaming log entries from source")
+                accumulator = self._new_accumulator(False, columnar).update(self._iter_entries(lines, line_format))
+                keep_entries = False
+            else:
+                # Parse log entries
+                log_entries = self._parse_logs(raw_logs, line_format)
+                self.log_action(f"Parsed {len(log_entries)} log entries")
+                
+                # Classify each entry
+                accumulator = self._new_accumulator(True, columnar).update(
+                    self.classifier.refine(self._classify_entry(entry) for entry in log_entries)
+                )
+                keep_entries = True
+            
+            analysis = accumulator.result()
+            issues_found = analysis["issues_found"]
             
-            # Classify each entry
-            classified_logs = []
-            issues_found = []
+            # Spikes of WARNING and above against their EWMA baseline
+            if "histogram" in analysis:
+                analysis["bursts"] = detect_bursts(
+                    analysis["histogram"], Config.LOG_BURST_ALPHA, Config.LOG_BURST_THRESHOLD,
+                    severities=CANDIDATE_SEVERITIES
+                )
             
-            for entry in log_entries:
-                classified = self._classify_entry(entry)
-                classified_logs.append(classified)
-                
-                # Track issues (ERROR and above)
-                if classified["severity"] in ["ERROR", "CRITICAL"]:
-                    issues_found.append({
-                        "severity": classified["severity"],
-                        "category": classified["category"],
-                        "message": classified["message"],
-                        "timestamp": classified["timestamp"],
-                        "extracted_fields": classified["extracted_fields"]
-                    })
+            # Rank issues once so every downstream agent sees the same top K
+            analysis["prioritized_issues"] = prioritize_issues(
+                issues_found, Config.LOG_PRIORITY_TOP_K, analysis.get("templates"), analysis.get("bursts")
+            )
             
             # Generate summary using LLM
-            summary = await self._generate_summary(classified_logs, issues_found)
+            summary = await self._generate_summary(
+                analysis["total_entries"], issues_found, analysis.get("templates"),
+                analysis["prioritized_issues"]
+            )
             
             self.status = "completed"
             self.log_action(f"Found {len(issues_found)} issues")
@@ -88,11 +191,10 @@ class LogReaderAgent(BaseAgent):
             return {
                 "success": True,
                 "agent": self.name,
-                "total_entries": len(log_entries),
-                "classified_logs": classified_logs,
-                "issues_found": issues_found,
-                "critical_count": sum(1 for i in issues_found if i["severity"] == "CRITICAL"),
-                "error_count": sum(1 for i in issues_found if i["severity"] == "ERROR"),
+                **analysis,
+                "streamed": not keep_entries,
+                "critical_count": analysis["severity_counts"].get("CRITICAL", 0),
+                "error_count": analysis["severity_counts"].get("ERROR", 0),
                 "summary": summary,
                 "execution_log": self.execution_log
             }
@@ -107,108 +209,144 @@ class LogReaderAgent(BaseAgent):
                 "agent": self.name
             }
     
-    def _parse_logs(self, raw_logs: str) -> List[Dict[str, Any]]:
+    def _shardable_path(self, log_source: Any) -> Optional[Path]:
+        """Return the file to shard across workers, or None to stay single-process"""
+        if Config.LOG_READER_WORKERS <= 1 or log_source is None:
+            return None
+        if isinstance(log_source, MappedLogFile):
+            path = log_source.path
+        elif isinstance(log_source, (str, Path)):
+            path = Path(log_source)
+        else:
+            return None
+        if os.path.getsize(path) < Config.LOG_PARALLEL_MIN_BYTES:
+            return None
+        # The embedding model stays in this process: categorizing lines after the
+        # workers counted them would leave the table and histogram on "general"
+        if self.classifier.categorizer is not None:
+            self.log_action("Embedding categorization attached, reading in a single process")
+            return None
+        # Compressed streams and tar archives cannot be split at byte offsets
+        if is_compressed(path) or is_archive(path):
+            return None
+        return path
+    
+    @staticmethod
+    def _collapse_window_ms() -> Optional[int]:
+        """Duplicate-collapsing window from the config, or None when disabled"""
+        return int(Config.LOG_COLLAPSE_WINDOW_SECONDS * 1000) if Config.LOG_COLLAPSE_DUPLICATES else None
+    
+    @staticmethod
+    def _histogram_bucket_ms() -> Optional[int]:
+        """Event histogram bucket width from the config, or None when disabled"""
+        if Config.LOG_HISTOGRAM_BUCKET_SECONDS <= 0 or not NUMPY_AVAILABLE:
+            return None
+        return int(Config.LOG_HISTOGRAM_BUCKET_SECONDS * 1000)
+    
+    def _new_accumulator(self, keep_entries: bool, columnar: bool) -> LogAccumulator:
+        """Accumulator tied to the classifier's template miner and cache for this run"""
+        return LogAccumulator(
+            keep_entries, columnar, self.classifier.templates, self.classifier.cache, self._collapse_window_ms(),
+            Config.LOG_FIELD_SKETCH_SIZE, self._histogram_bucket_ms()
+        )
+    
+    def _classify_parallel(
+        self,
+        path: Path,
+        workers: int,
+        columnar: bool = False,
+        line_format: Optional[str] = None,
+        mapped: Optional[MappedLogFile] = None
+    ) -> LogAccumulator:
+        """Classify newline-aligned byte ranges of a file in a process pool"""
+        # A mapped file's line index gives the cuts without reading the file
+        ranges = mapped.split_ranges(workers) if mapped is not None else split_line_ranges(path, workers)
+        self.log_action(f"Classifying {len(ranges)} shards with {workers} workers")
+        
+        # Sniff the line and timestamp formats once from the head of the file for all shards
+        head = iter_lines(path, Config.LOG_READ_CHUNK_SIZE)
+        sniffed_format, timestamps, _ = sniff_stream(head)
+        head.close()
+        timestamp_format = (timestamps.preferred, timestamps.anchored)
+        line_format = line_format or sniffed_format
+        
+        accumulator = self._new_accumulator(False, columnar)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    classify_shard, self.classifier, str(path), start, end,
+                    Config.LOG_READ_CHUNK_SIZE, timestamp_format, columnar, line_format,
+                    self._collapse_window_ms(), Config.LOG_FIELD_SKETCH_SIZE, self._histogram_bucket_ms()
+                )
+                for start, end in ranges
+            ]
+            # Merge in shard order so counts, issues and ordering match a sequential pass
+            for future in futures:
+                accumulator.merge(future.result())
+        
+        return accumulator
+    
+    def _parse_logs(self, raw_logs: str, line_format: Optional[str] = None) -> List[LogEntry]:
         """Parse raw log text into structured entries"""
         entries = []
         lines = raw_logs.strip().split('\n')
+        sample = [line for line in lines[:SNIFF_SAMPLE_LINES] if line.strip()]
+        timestamps = TimestampParser.sniff(sample)
+        decoder = make_decoder(line_format or sniff_format(sample))
+        if decoder is not None:
+            self.log_action(f"Decoding {decoder.name} records")
+        elif self.classifier.max_record_lines > 0:
+            # Fold stack-trace lines into the event they belong to
+            lines = assemble_records(lines, self.classifier.max_record_lines)
         
         for line in lines:
             if not line.strip():
                 continue
-            
-            entry = {
-                "raw": line,
-                "timestamp": self._extract_timestamp(line),
-                "message": line
-            }
-            entries.append(entry)
+            entries.append(self.classifier.parse_line(line, timestamps, decoder))
         
         return entries
     
-    def _extract_timestamp(self, log_line: str) -> str:
+    def _iter_entries(self, lines: Iterable[str], line_format: Optional[str] = None) -> Iterator[LogEntry]:
+        """Lazily parse and classify log lines, one entry at a time"""
+        return self.classifier.iter_entries(lines, line_format=line_format)
+    
+    def _parse_line(self, line: str) -> LogEntry:
+        """Parse a single log line into a structured entry"""
+        return self.classifier.parse_line(line)
+    
+    def _extract_timestamp(self, log_line: str) -> Optional[str]:
         """Extract timestamp from log line"""
-        # Common timestamp patterns
-        patterns = [
-            r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}',  # ISO format
-            r'\d{2}/\w{3}/\d{4}:\d{2}:\d{2}:\d{2}',      # Apache format
-            r'\d{2}-\d{2}-\d{4} \d{2}:\d{2}:\d{2}',      # Custom format
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, log_line)
-            if match:
-                return match.group()
-        
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return self.classifier.extract_timestamp(log_line)
     
-    def _classify_entry(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+    def _classify_entry(self, entry: Dict[str, Any]) -> LogEntry:
         """Classify a single log entry"""
-        message_lower = entry["message"].lower()
-        
-        # Determine severity
-        severity = "INFO"
-        for sev, pattern in self.severity_patterns.items():
-            if re.search(pattern, message_lower, re.IGNORECASE):
-                severity = sev
-                break
-        
-        # Determine category
-        category = "general"
-        for cat, keywords in self.issue_categories.items():
-            if any(keyword in message_lower for keyword in keywords):
-                category = cat
-                break
-        
-        # Extract additional fields
-        extracted_fields = self._extract_fields(entry["message"])
-        
-        return {
-            **entry,
-            "severity": severity,
-            "category": category,
-            "extracted_fields": extracted_fields
-        }
+        return self.classifier.classify(entry)
     
     def _extract_fields(self, message: str) -> Dict[str, Any]:
         """Extract useful fields from log message"""
-        fields = {}
-        
-        # Extract IP addresses
-        ip_pattern = r'\b(?:\d{1,3}\.){3}\d{1,3}\b'
-        ips = re.findall(ip_pattern, message)
-        if ips:
-            fields["ip_addresses"] = ips
-        
-        # Extract HTTP status codes
-        status_pattern = r'\b[45]\d{2}\b'
-        statuses = re.findall(status_pattern, message)
-        if statuses:
-            fields["http_status"] = statuses
-        
-        # Extract error codes
-        error_pattern = r'error[_ ]code[:\s]+(\w+)'
-        errors = re.findall(error_pattern, message, re.IGNORECASE)
-        if errors:
-            fields["error_codes"] = errors
-        
-        # Extract service names
-        service_pattern = r'service[:\s]+(\w+)'
-        services = re.findall(service_pattern, message, re.IGNORECASE)
-        if services:
-            fields["services"] = services
-        
-        return fields
+        return self.classifier.extract_fields(message)
     
-    async def _generate_summary(self, classified_logs: List[Dict], issues: List[Dict]) -> str:
+    async def _generate_summary(
+        self,
+        total_entries: int,
+        issues: List[Dict],
+        templates: Optional[List[Dict[str, Any]]] = None,
+        prioritized: Optional[List[Dict]] = None
+    ) -> str:
         """Generate intelligent summary using LLM"""
         if not self.llm or not issues:
-            return f"Analyzed {len(classified_logs)} log entries. Found {len(issues)} issues."
+            return f"Analyzed {total_entries} log entries. Found {len(issues)} issues."
         
         try:
-            # Prepare context for LLM
+            # Prepare context for LLM: the highest-priority issues, one per
+            # message template, with the number of lines each stands for
+            counts = {t["template_id"]: t["count"] for t in templates or []}
+            if prioritized is None:
+                prioritized = prioritize_issues(issues, 10, templates)
             issue_text = "\n".join([
                 f"- [{i['severity']}] {i['category']}: {i['message'][:100]}"
-                for i in issues[:10]  # Limit to top 10
+                + (f" (x{counts[i['template_id']]})" if counts.get(i.get("template_id"), 1) > 1 else repeat_note(i))
+                for i in prioritized[:10]  # Limit to top 10
             ])
             
             prompt = f"""Analyze these log issues and provide a brief summary:
@@ -225,5 +363,5 @@ Provide a concise 2-3 sentence summary highlighting:
             
         except Exception as e:
             logger.error(f"Summary generation failed: {e}")
-            return f"Analyzed {len(classified_logs)} log entries. Found {len(issues)} issues requiring attention."
+            return f"Analyzed {total_entries} log entries. Found {len(issues)} issues requiring attention."
 
@@ -0,0 +1,147 @@
+"""
+Log Records
+Single-pass assembly of multi-line log events (stack traces) into one record each
+"""
+from typing import Iterable, Iterator, List
+import os
+import re
+from .log_sources import DEFAULT_CHUNK_SIZE, iter_range_lines
+
+DEFAULT_MAX_RECORD_LINES = 500
+
+# Lines that continue the previous event whatever came before: indented
+# lines (Java "\tat ...", Python "  File ...", Go "\t/src/x.go:12"), Java
+# cause chains and elisions, exception class lines and trace headers
+_CONTINUATION = re.compile(
+    r"\s"
+    r"|Caused by:|Suppressed:|\.\.\. \d+ (?:more|common frames omitted)"
+    r"|at [\w$.<>/]+\("
+    r"|(?:[A-Za-z_$][\w$]*\.)+[A-Z][\w$]*(?:Exception|Error|Throwable)\b"
+    r"|Traceback \(most recent call last\):"
+    r"|During handling of the above exception|The above exception was the direct cause"
+    r"|goroutine \d+ \["
+)
+
+# Only continuations inside a Python traceback: the final "ValueError: ..." line
+_PYTHON_EXCEPTION = re.compile(r"[A-Za-z_][\w.]*(?::|$)")
+
+# Continuation lines that carry an exception: a Python traceback header, a
+# Java exception class line or a cause chain
+_EXCEPTION_LINE = re.compile(
+    r"^(?:Traceback \(most recent call last\):|Caused by:"
+    r"|(?:[A-Za-z_$][\w$]*\.)+[A-Z][\w$]*(?:Exception|Error|Throwable)\b)",
+    re.MULTILINE
+)
+
+# Only continuations inside a Go goroutine dump: "main.main()", "created by ..."
+_GO_FRAME = re.compile(r"created by \S+(?: in goroutine \d+)?$|[\w./*()\[\]-]+\(.*\)$")
+
+
+def is_record_start(line: str) -> bool:
+    """
+    Whether a non-blank line starts a new record whatever precedes it
+
+    Used to cut shards at record boundaries: such a line is never folded
+    into a preceding trace.
+    """
+    return not (_CONTINUATION.match(line) or _PYTHON_EXCEPTION.match(line) or _GO_FRAME.match(line))
+
+
+def has_exception_trace(record: str) -> bool:
+    """
+    Whether an assembled record carries an exception trace after its first line
+
+    A trace folded under an INFO header (e.g. a bare ``Traceback`` printed
+    after it) still raises the record's severity (see ``LogClassifier``).
+    """
+    _, newline, tail = record.partition("\n")
+    return bool(newline) and _EXCEPTION_LINE.search(tail) is not None
+
+
+def assemble_records(lines: Iterable[str], max_lines: int = DEFAULT_MAX_RECORD_LINES) -> Iterator[str]:
+    """
+    Fold continuation lines into the event they belong to
+
+    Yields one string per event, its physical lines joined by ``"\\n"``.
+    Recognizes indented frames, Java ``Caused by:`` chains and exception
+    lines, Python tracebacks (up to their final exception line) and Go
+    goroutine dumps. Blank lines are dropped without ending an event.
+    Lookahead is one line and an event holds at most ``max_lines`` lines;
+    further continuation lines are counted in a closing
+    ``"... N more lines"`` line instead of being kept.
+    """
+    continues = _CONTINUATION.match
+    head = None                               # first line of the pending record
+    tail: List[str] = []                      # its continuation lines
+    dropped = 0
+    in_python_trace = in_go_dump = False
+
+    for line in lines:
+        if not line or line.isspace():
+            continue
+
+        if head is not None:
+            if continues(line):
+                if line.startswith("Traceback"):
+                    in_python_trace = True
+                elif line.startswith("goroutine"):
+                    in_go_dump = True
+            elif in_python_trace and _PYTHON_EXCEPTION.match(line):
+                in_python_trace = False
+            elif not (in_go_dump and _GO_FRAME.match(line)):
+                yield _join(head, tail, dropped)
+                head = None
+
+        if head is None:
+            head, tail, dropped = line, [], 0
+            in_python_trace = line.startswith("Traceback")
+            in_go_dump = line.startswith("goroutine")
+        elif len(tail) + 1 < max_lines:
+            tail.append(line)
+        else:
+            dropped += 1
+
+    if head is not None:
+        yield _join(head, tail, dropped)
+
+
+def _join(head: str, tail: List[str], dropped: int) -> str:
+    if not tail:
+        return head
+    if dropped:
+        tail.append(f"... {dropped} more lines")
+    return head + "\n" + "\n".join(tail)
+
+
+def iter_record_range_lines(
+    path: str,
+    start: int,
+    end: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_lines: int = DEFAULT_MAX_RECORD_LINES
+) -> Iterator[str]:
+    """
+    Lines of the byte range ``[start, end)`` of a file, moved to record boundaries
+
+    Continuation lines at the start of the range belong to the record the
+    previous range ends with: they are skipped here and read past ``end``
+    by the previous range instead. Both sides stop at the first line that
+    is a record start (see ``is_record_start``), or after ``max_lines``
+    lines, so consecutive ranges still cover every line exactly once.
+    """
+    lines = iter_range_lines(path, start, end, chunk_size)
+    if start > 0:
+        for i, line in enumerate(lines):
+            if i >= max_lines or (line.strip() and is_record_start(line)):
+                yield line
+                break
+    yield from lines
+
+    size = os.path.getsize(path)
+    if end < size:
+        tail = iter_range_lines(path, end, size, chunk_size)
+        for i, line in enumerate(tail):
+            if i >= max_lines or (line.strip() and is_record_start(line)):
+                break
+            yield line
+        tail.close()
@@ -0,0 +1,163 @@
+"""
+Log Segments
+Splitting the issues of a long log range into separate incident windows
+"""
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+from .log_entry import LogEntry
+from .log_histogram import _format_ms
+from .log_priority import DEFAULT_TOP_K, prioritize_issues
+from .log_templates import representative_issues
+
+DEFAULT_SEGMENT_GAP_MS = 15 * 60_000          # quiet period that always ends an incident
+DEFAULT_SHIFT_GAP_MS = 2 * 60_000             # shorter quiet period that ends one on a category shift
+
+
+class IncidentSegment(NamedTuple):
+    """Issues of one incident window, with its first and last timestamp (None if undated)"""
+    start_ms: Optional[int]
+    end_ms: Optional[int]
+    issues: List[Any]
+
+
+def _last_ms(issue: Mapping[str, Any]) -> Optional[int]:
+    return issue.last_ms if isinstance(issue, LogEntry) else issue.get("last_ms") or issue.get("epoch_ms")
+
+
+def segment_issues(
+    issues: List[Any],
+    gap_ms: int = DEFAULT_SEGMENT_GAP_MS,
+    shift_gap_ms: int = DEFAULT_SHIFT_GAP_MS
+) -> List[IncidentSegment]:
+    """
+    Split issues into incident windows at quiet periods and category shifts
+
+    Issues are visited in time order; a collapsed issue spans its first to
+    last occurrence. A new segment starts when no issue was seen for more
+    than ``gap_ms``, or for more than ``shift_gap_ms`` and the next issue
+    is of a category the current segment has not seen. Undated issues are
+    skipped when placing boundaries and stay with the issues before them,
+    as in the log (leading ones join the first segment).
+    """
+    # Undated issues sort with the last dated one, so they stay in place
+    keyed = []
+    last = None
+    for position, issue in enumerate(issues):
+        first_ms = issue.get("epoch_ms")
+        if first_ms is not None:
+            last = first_ms
+        keyed.append((last if last is not None else -1, position, issue))
+    keyed.sort(key=lambda item: (item[0], item[1]))
+
+    segments = []
+    current: List[Any] = []
+    categories = set()
+    start_ms = end_ms = None
+    for _, _, issue in keyed:
+        first_ms = issue.get("epoch_ms")
+        if first_ms is not None and end_ms is not None and current:
+            gap = first_ms - end_ms
+            if gap > gap_ms or (gap > shift_gap_ms and issue.get("category") not in categories):
+                segments.append(IncidentSegment(start_ms, end_ms, current))
+                current, categories = [], set()
+                start_ms = end_ms = None
+        current.append(issue)
+        categories.add(issue.get("category"))
+        if first_ms is not None:
+            if start_ms is None:
+                start_ms = first_ms
+            last_ms = _last_ms(issue) or first_ms
+            end_ms = last_ms if end_ms is None else max(end_ms, last_ms)
+    if current:
+        segments.append(IncidentSegment(start_ms, end_ms, current))
+    return segments
+
+
+def segment_analysis(
+    analysis: Dict[str, Any],
+    segment: IncidentSegment,
+    index: int = 0,
+    total: int = 1,
+    top_k: int = DEFAULT_TOP_K
+) -> Dict[str, Any]:
+    """
+    Log Reader result restricted to one incident segment
+
+    Issues, templates, bursts and the event histogram are narrowed to the
+    segment's window, and the issues re-prioritized within it. Counts come
+    from the histogram window when there is one (all lines), else from the
+    segment's issues. The summary is rule-based, so no LLM call is made per
+    segment.
+    """
+    issues = segment.issues
+    start_ms, end_ms = segment.start_ms, segment.end_ms
+    template_ids = {issue.get("template_id") for issue in issues}
+    templates = [t for t in analysis.get("templates") or [] if t["template_id"] in template_ids]
+    bursts = [
+        burst for burst in analysis.get("bursts") or []
+        if start_ms is not None and burst["start_ms"] <= end_ms and start_ms < burst["end_ms"]
+    ]
+
+    histogram = analysis.get("histogram")
+    if histogram is not None:
+        histogram = histogram.window(start_ms, end_ms) if start_ms is not None else None
+    severity_counts: Dict[str, int] = {}
+    category_counts: Dict[str, int] = {}
+    if histogram is not None and len(histogram):
+        totals = histogram.counts.sum(axis=0)
+        for (category, severity), count in zip(histogram.series, totals.tolist()):
+            if not count:
+                continue
+            severity_counts[severity] = severity_counts.get(severity, 0) + count
+            category_counts[category] = category_counts.get(category, 0) + count
+    else:
+        for issue in issues:
+            count = issue.get("count", 1)
+            severity_counts[issue["severity"]] = severity_counts.get(issue["severity"], 0) + count
+            category_counts[issue["category"]] = category_counts.get(issue["category"], 0) + count
+
+    prioritized = prioritize_issues(issues, top_k, templates, bursts)
+    span = f"{_format_ms(start_ms)} to {_format_ms(end_ms)}" if start_ms is not None else "undated lines"
+    critical_count = severity_counts.get("CRITICAL", 0)
+    error_count = severity_counts.get("ERROR", 0)
+    summary = (
+        f"Incident {index + 1} of {total} ({span}): {len(issues)} issues, "
+        f"{critical_count} critical and {error_count} error lines."
+    )
+    if prioritized:
+        top = prioritized[0]
+        summary += f" Top issue: [{top['severity']}] {top['category']}: {top['message'][:100]}"
+
+    result = {
+        **analysis,
+        "total_entries": sum(severity_counts.values()),
+        "classified_logs": [],
+        "issues_found": issues,
+        "severity_counts": severity_counts,
+        "category_counts": category_counts,
+        "prioritized_issues": prioritized,
+        "critical_count": critical_count,
+        "error_count": error_count,
+        "summary": summary,
+        "segment": {
+            "index": index,
+            "total": total,
+            "start_ms": start_ms,
+            "end_ms": end_ms,
+            "start": _format_ms(start_ms) if start_ms is not None else None,
+            "end": _format_ms(end_ms) if end_ms is not None else None
+        }
+    }
+    if "templates" in analysis:
+        result["templates"] = templates
+    if "issue_representatives" in analysis:
+        result["issue_representatives"] = representative_issues(issues)
+    if "bursts" in analysis:
+        result["bursts"] = bursts
+    if histogram is not None:
+        result["histogram"] = histogram
+    else:
+        result.pop("histogram", None)
+    # Whole-range tables and sketches do not describe a single segment
+    result.pop("log_table", None)
+    result.pop("field_sketches", None)
+    return result
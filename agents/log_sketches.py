@@ -0,0 +1,189 @@
+"""
+Log Sketches
+Fixed-memory, mergeable heavy-hitter and cardinality sketches of extracted fields
+"""
+from hashlib import blake2b
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import math
+
+DEFAULT_SKETCH_SIZE = 100
+DEFAULT_HLL_PRECISION = 12                    # 4096 registers, ~1.6% standard error
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter counter
+
+    Tracks at most ``2 * capacity`` items; when full, it keeps the
+    ``capacity`` most frequent ones. ``floor`` is the largest count
+    dropped so far. An item seen again after being dropped restarts at
+    ``floor + 1`` with error ``floor``. Counts therefore never
+    underestimate, and ``count - error`` never overestimates. Dropping in
+    batches keeps the per-item cost at a dict update.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_SKETCH_SIZE):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}      # only items with a nonzero error
+        self.floor = 0
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.counts
+
+    def add(self, item: str, count: int = 1) -> None:
+        counts = self.counts
+        current = counts.get(item)
+        if current is not None:
+            counts[item] = current + count
+            return
+        counts[item] = self.floor + count
+        if self.floor:
+            self.errors[item] = self.floor
+        if len(counts) > 2 * self.capacity:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Keep the ``capacity`` largest counts, raising the floor to the largest dropped one"""
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        for item, count in ranked[self.capacity:]:
+            del self.counts[item]
+            self.errors.pop(item, None)
+            if count > self.floor:
+                self.floor = count
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Fold in a counter built over other lines (e.g. another shard)"""
+        counts, errors = self.counts, self.errors
+        for item in counts.keys() - other.counts.keys():
+            counts[item] += other.floor
+            errors[item] = errors.get(item, 0) + other.floor
+        for item, count in other.counts.items():
+            error = other.errors.get(item, 0)
+            if item in counts:
+                counts[item] += count
+                error += errors.get(item, 0)
+            else:
+                counts[item] = count + self.floor
+                error += self.floor
+            if error:
+                errors[item] = error
+        self.floor += other.floor
+        if len(counts) > 2 * self.capacity:
+            self._prune()
+        return self
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """The ``k`` most frequent items as (item, count, error), most frequent first"""
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return [(item, count, self.errors.get(item, 0)) for item, count in ranked[:k]]
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter over a stable 64-bit hash
+
+    Uses blake2b rather than ``hash()``, which is salted per process, so
+    that sketches from worker processes can be merged (register-wise max).
+    """
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, item: str) -> None:
+        x = int.from_bytes(blake2b(item.encode("utf-8", "replace"), digest_size=8).digest(), "big")
+        bits = 64 - self.precision
+        index = x >> bits
+        rho = bits - (x & ((1 << bits) - 1)).bit_length() + 1
+        if rho > self.registers[index]:
+            self.registers[index] = rho
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def estimate(self) -> int:
+        """Estimated number of distinct items added"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class FieldSketch:
+    """Heavy hitters and distinct count of one extracted field"""
+
+    def __init__(self, capacity: int = DEFAULT_SKETCH_SIZE, precision: int = DEFAULT_HLL_PRECISION):
+        self.heavy = SpaceSaving(capacity)
+        self.distinct = HyperLogLog(precision)
+
+    def add(self, value: str) -> None:
+        # Tracked values were hashed into the HyperLogLog when first seen
+        if value not in self.heavy:
+            self.distinct.add(value)
+        self.heavy.add(value)
+
+    def merge(self, other: "FieldSketch") -> "FieldSketch":
+        self.heavy.merge(other.heavy)
+        self.distinct.merge(other.distinct)
+        return self
+
+    def summary(self, k: int = 10) -> Dict[str, Any]:
+        return {
+            "distinct": self.distinct.estimate(),
+            "top": [
+                {"value": value, "count": count, "error": error}
+                for value, count, error in self.heavy.top(k)
+            ]
+        }
+
+
+class FieldSketches:
+    """
+    Per-field sketches of extracted values (IPs, HTTP statuses, error codes, services, ...)
+
+    Memory is fixed per field whatever the number of lines, and sketches
+    built over shards merge into those of the whole log.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_SKETCH_SIZE, precision: int = DEFAULT_HLL_PRECISION):
+        self.capacity = capacity
+        self.precision = precision
+        self.fields: Dict[str, FieldSketch] = {}
+
+    def update(self, extracted_fields: Dict[str, Iterable[str]]) -> None:
+        """Add the values extracted from one entry"""
+        for name, values in extracted_fields.items():
+            sketch = self.fields.get(name)
+            if sketch is None:
+                sketch = self.fields[name] = FieldSketch(self.capacity, self.precision)
+            counts = sketch.heavy.counts
+            for value in values:
+                # Inlined fast path of FieldSketch.add for values already tracked
+                count = counts.get(value)
+                if count is not None:
+                    counts[value] = count + 1
+                else:
+                    sketch.add(value)
+
+    def merge(self, other: "FieldSketches") -> "FieldSketches":
+        for name, sketch in other.fields.items():
+            if name in self.fields:
+                self.fields[name].merge(sketch)
+            else:
+                self.fields[name] = sketch
+        return self
+
+    def summary(self, k: int = 10) -> Dict[str, Dict[str, Any]]:
+        """{field: {"distinct": n, "top": [{"value", "count", "error"}, ...]}}"""
+        return {name: sketch.summary(k) for name, sketch in self.fields.items()}
@@ -0,0 +1,387 @@
+"""
+Log Sources
+Bounded-memory readers that feed raw log data into the Log Reader Agent
+"""
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+import bz2
+import gzip
+import io
+import logging
+import lzma
+import mmap
+import os
+import struct
+import tarfile
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+class MappedLogFile:
+    """
+    Memory-mapped log file with a line-offset index
+
+    The index holds the start offset of every line (plus one end sentinel) in
+    an ``array('Q')``. It is built in one pass over the mapping and persisted
+    next to the file, so reopening an unchanged file (same size and mtime)
+    skips the scan entirely. Any line is then reachable without reading the
+    ones before it: ``line_bytes`` is a zero-copy view of the mapping, while
+    ``line``, ``iter_lines`` and ``page`` decode into new strings. The Log
+    Reader cuts its shards at indexed line starts (see ``split_ranges``).
+    """
+    
+    INDEX_SUFFIX = ".idx"
+    INDEX_MAGIC = b"LOGIDX1\0"
+    _HEADER = struct.Struct("<8sQQ")  # magic, file size, mtime (ns)
+    
+    def __init__(self, path: Union[str, Path], persist_index: bool = True):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + self.INDEX_SUFFIX)
+        self._file = open(self.path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+        # mmap cannot map an empty file
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else None
+        
+        self.offsets = self._load_index()
+        if self.offsets is None:
+            self.offsets = self._build_index()
+            if persist_index:
+                self._save_index()
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __enter__(self) -> "MappedLogFile":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Release the mapping and the underlying file handle"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+    
+    def _build_index(self) -> array:
+        """Scan the mapping once, recording where every line starts"""
+        offsets = array("Q", [0])
+        if not self._mm:
+            return offsets
+        
+        find = self._mm.find
+        pos = find(b"\n")
+        while pos != -1:
+            offsets.append(pos + 1)
+            pos = find(b"\n", pos + 1)
+        
+        # The sentinel always sits one byte past the last line's end, so a
+        # file without a trailing newline gets a virtual one
+        if offsets[-1] != self._size:
+            offsets.append(self._size + 1)
+        return offsets
+    
+    def _load_index(self) -> Optional[array]:
+        """Load the persisted index if it matches the current file"""
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, size, mtime_ns = self._HEADER.unpack(f.read(self._HEADER.size))
+                if magic != self.INDEX_MAGIC or size != self._size or mtime_ns != self._mtime_ns:
+                    return None
+                offsets = array("Q")
+                offsets.frombytes(f.read())
+                return offsets
+        except (OSError, struct.error, ValueError):
+            return None
+    
+    def _save_index(self) -> None:
+        """Persist the index next to the log file"""
+        try:
+            with open(self.index_path, "wb") as f:
+                f.write(self._HEADER.pack(self.INDEX_MAGIC, self._size, self._mtime_ns))
+                self.offsets.tofile(f)
+        except OSError as e:
+            logger.warning(f"Could not persist line index for {self.path}: {e}")
+    
+    def line_bytes(self, i: int) -> memoryview:
+        """Zero-copy view of line ``i`` without its line terminator"""
+        start = self.offsets[i]
+        end = self.offsets[i + 1] - 1
+        if end > start and self._mm[end - 1] == 0x0D:  # \r
+            end -= 1
+        return memoryview(self._mm)[start:end]
+    
+    def line(self, i: int) -> str:
+        """Decoded text of line ``i``"""
+        return str(self.line_bytes(i), "utf-8", "replace")
+    
+    def iter_lines(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Yield decoded lines in ``[start, stop)``"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for i in range(start, stop):
+            yield self.line(i)
+    
+    def page(self, start: int, count: int) -> List[str]:
+        """Return ``count`` lines starting at ``start``"""
+        return list(self.iter_lines(start, start + count))
+    
+    def split_ranges(self, shards: int) -> List[Tuple[int, int]]:
+        """
+        Split the file into up to ``shards`` contiguous byte ranges of whole lines
+        
+        Same ranges as ``split_line_ranges``, but the cuts are looked up in
+        the index instead of being read from the file.
+        """
+        size = self._size
+        if shards <= 1 or size == 0:
+            return [(0, size)]
+        bounds = [0]
+        for i in range(1, shards):
+            # First line starting at or after the target (the sentinel is never a cut)
+            offset = self.offsets[bisect_left(self.offsets, size * i // shards, 0, len(self))]
+            if bounds[-1] < offset < size:
+                bounds.append(offset)
+        bounds.append(size)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+
+LogSource = Union[str, Path, BinaryIO, MappedLogFile]
+
+
+def _open_source(source: LogSource) -> Tuple[BinaryIO, bool]:
+    """Return a readable stream for the source and whether we own (must close) it"""
+    if isinstance(source, (str, Path)):
+        return open(source, "rb"), True
+    if hasattr(source, "read"):
+        return source, False
+    raise TypeError(f"Unsupported log source: {type(source).__name__}")
+
+
+def _open_zstd(stream: BinaryIO) -> BinaryIO:
+    if not ZSTD_AVAILABLE:
+        raise ImportError("zstandard is required to read .zst logs")
+    return zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True)
+
+
+# Magic bytes of the supported compression formats
+COMPRESSION_MAGIC: Dict[bytes, Tuple[str, Callable[[BinaryIO], BinaryIO]]] = {
+    b"\x1f\x8b": ("gzip", lambda stream: gzip.GzipFile(fileobj=stream)),
+    b"BZh": ("bz2", bz2.BZ2File),
+    b"\xfd7zXZ\x00": ("xz", lzma.LZMAFile),
+    b"\x28\xb5\x2f\xfd": ("zstd", _open_zstd),
+}
+
+_TAR_MAGIC_OFFSET = 257
+_SNIFF_BYTES = 512
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Replays bytes already read from a stream before reading on from it"""
+    
+    def __init__(self, prefix: bytes, stream: BinaryIO):
+        self._prefix = prefix
+        self._stream = stream
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            n = min(len(buffer), len(self._prefix))
+            buffer[:n] = self._prefix[:n]
+            self._prefix = self._prefix[n:]
+            return n
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _peek(stream: BinaryIO, size: int) -> Tuple[bytes, BinaryIO]:
+    """
+    Read the first ``size`` bytes of a stream without consuming them
+
+    Returns the bytes and a stream that still yields them, so sniffing works
+    on pipes, uploads and decompressors that cannot seek.
+    """
+    head = b""
+    while len(head) < size:
+        chunk = stream.read(size - len(head))
+        if not chunk:
+            break
+        head += chunk
+    return head, io.BufferedReader(_PrefixedReader(head, stream))
+
+
+def _compression(head: bytes) -> Optional[Tuple[str, Callable[[BinaryIO], BinaryIO]]]:
+    for magic, codec in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """Name of the compression format a stream starts with, or None"""
+    codec = _compression(head)
+    return codec[0] if codec is not None else None
+
+
+def _read_head(source: Union[str, Path, BinaryIO], size: int) -> bytes:
+    """First ``size`` bytes of a file or seekable stream, leaving the stream position alone"""
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            return f.read(size)
+    position = source.tell()
+    head = source.read(size)
+    source.seek(position)
+    return head
+
+
+def _is_tar(head: bytes) -> bool:
+    return head[_TAR_MAGIC_OFFSET:_TAR_MAGIC_OFFSET + 5] == b"ustar"
+
+
+def is_compressed(source: Union[str, Path, BinaryIO]) -> bool:
+    """Whether a file or seekable stream starts with a known compression magic"""
+    return detect_compression(_read_head(source, 8)) is not None
+
+
+def is_archive(source: Union[str, Path, BinaryIO]) -> bool:
+    """Whether a file or seekable stream is an uncompressed tar archive"""
+    return _is_tar(_read_head(source, _SNIFF_BYTES))
+
+
+def _iter_archive_lines(stream: BinaryIO, chunk_size: int) -> Iterator[str]:
+    """
+    Yield lines of a plain, compressed or tar-archived stream
+
+    Compression is detected by magic bytes and undone incrementally while
+    reading, so memory stays bounded by the chunk size whatever the size of
+    the inflated log. Tar archives (also compressed ones) are read member by
+    member in stream mode; every regular file is treated as a log, and
+    members may themselves be compressed.
+    """
+    head, stream = _peek(stream, _SNIFF_BYTES)
+    codec = _compression(head)
+    if codec is not None:
+        name, open_codec = codec
+        logger.debug(f"Decompressing {name} log stream")
+        head, stream = _peek(open_codec(stream), _SNIFF_BYTES)
+    
+    if _is_tar(head):
+        with tarfile.open(fileobj=stream, mode="r|") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                logger.debug(f"Reading {member.name} from tar archive")
+                yield from _iter_archive_lines(archive.extractfile(member), chunk_size)
+        return
+    
+    yield from _iter_stream_lines(stream, chunk_size)
+
+
+def _decode(line: bytes) -> str:
+    """Decode a raw line, tolerating CRLF endings and invalid UTF-8"""
+    if line.endswith(b"\r"):
+        line = line[:-1]
+    return line.decode("utf-8", errors="replace")
+
+
+def _iter_stream_lines(stream: BinaryIO, chunk_size: int, limit: Optional[int] = None) -> Iterator[str]:
+    """Yield decoded lines from a binary stream, reading at most ``limit`` bytes"""
+    pending = b""
+    remaining = limit
+    while remaining is None or remaining > 0:
+        chunk = stream.read(chunk_size if remaining is None else min(chunk_size, remaining))
+        if not chunk:
+            break
+        if remaining is not None:
+            remaining -= len(chunk)
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield _decode(line)
+    
+    if pending:
+        yield _decode(pending)
+
+
+def iter_lines(source: LogSource, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Lazily yield lines from a file path, file object or mapped log file
+
+    The source is read in chunks of at most ``chunk_size`` bytes, so only the
+    current chunk plus one partial line is held in memory at any time.
+    gzip, bz2, xz and zstd compressed sources and tar archives of log files
+    are decompressed on the fly (see ``_iter_archive_lines``).
+    """
+    if isinstance(source, MappedLogFile):
+        yield from source.iter_lines()
+        return
+    
+    stream, owned = _open_source(source)
+    try:
+        if isinstance(stream, io.TextIOBase):
+            for line in stream:
+                yield line.rstrip("\r\n")
+            return
+        
+        yield from _iter_archive_lines(stream, chunk_size)
+    finally:
+        if owned:
+            stream.close()
+
+
+def iter_range_lines(
+    path: Union[str, Path],
+    start: int,
+    end: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[str]:
+    """Lazily yield the lines of the byte range ``[start, end)`` of a file"""
+    with open(path, "rb") as stream:
+        stream.seek(start)
+        yield from _iter_stream_lines(stream, chunk_size, limit=end - start)
+
+
+def split_line_ranges(path: Union[str, Path], shards: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into up to ``shards`` contiguous byte ranges
+
+    Every boundary is moved forward to the start of a line, so each range
+    holds whole lines and the ranges together cover the file exactly once.
+    """
+    size = os.path.getsize(path)
+    if shards <= 1 or size == 0:
+        return [(0, size)]
+    
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, shards):
+            target = size * i // shards
+            if target <= bounds[-1]:
+                continue
+            # Reading from one byte back lands exactly on the next line start,
+            # even when the target already is one
+            f.seek(target - 1)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    bounds.append(size)
+    
+    return list(zip(bounds[:-1], bounds[1:]))
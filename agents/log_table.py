@@ -0,0 +1,218 @@
+"""
+Log Table
+Columnar store of classified log entries with vectorized filters and counts
+"""
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+import time
+from .log_entry import CATEGORIES, SEVERITIES, CodeTable, LogEntry
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+UNDATED_MS = -(1 << 63)                       # epoch_ms of lines without a timestamp (NaT in pandas)
+CODE_TYPECODE = "H"                           # severity/category codes: uint16, room for MAX_CODES names
+
+
+class LogTableBuilder:
+    """
+    Append-only column buffers for classified entries
+
+    Appending uses plain ``array``/``bytearray`` buffers, which are cheap to
+    grow and to pickle back from shard workers; ``build`` converts them to
+    NumPy arrays in one copy per column.
+    """
+
+    def __init__(self):
+        self.severity = array(CODE_TYPECODE)
+        self.category = array(CODE_TYPECODE)
+        self.epoch_ms = array("q")
+        self.offsets = array("q", [0])
+        self.buffer = bytearray()
+        # Codes are per process, so the name lists travel with the buffers
+        self.severity_names = SEVERITIES.names
+        self.category_names = CATEGORIES.names
+
+    def __len__(self) -> int:
+        return len(self.severity)
+
+    def append(self, entry: LogEntry) -> None:
+        """Add one classified entry"""
+        self.severity.append(entry.severity_code)
+        self.category.append(entry.category_code)
+        self.epoch_ms.append(UNDATED_MS if entry.epoch_ms is None else entry.epoch_ms)
+        self.buffer += entry.message.encode("utf-8", "replace")
+        self.offsets.append(len(self.buffer))
+
+    def extend(self, other: "LogTableBuilder") -> "LogTableBuilder":
+        """Append the rows of another builder (e.g. the next shard)"""
+        self.severity.extend(_recode(other.severity, other.severity_names, SEVERITIES))
+        self.category.extend(_recode(other.category, other.category_names, CATEGORIES))
+        self.epoch_ms.extend(other.epoch_ms)
+        base = len(self.buffer)
+        self.offsets.extend(offset + base for offset in other.offsets[1:])
+        self.buffer += other.buffer
+        return self
+
+    def build(self) -> "LogTable":
+        """Return the rows collected so far as a LogTable"""
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for columnar log tables")
+        # Copies, so the builder can keep growing after a table was built
+        offsets = np.frombuffer(self.offsets, dtype=np.int64).copy()
+        return LogTable(
+            severity=np.frombuffer(self.severity, dtype=np.uint16).copy(),
+            category=np.frombuffer(self.category, dtype=np.uint16).copy(),
+            epoch_ms=np.frombuffer(self.epoch_ms, dtype=np.int64).copy(),
+            starts=offsets[:-1],
+            ends=offsets[1:],
+            buffer=bytes(self.buffer)
+        )
+
+
+def _recode(codes: array, names: Sequence[str], table: CodeTable) -> array:
+    """Translate codes recorded against ``names`` into this process's code table"""
+    if list(names) == table.names[:len(names)]:
+        return codes
+    lookup = [table.code(name) for name in names]
+    return array(CODE_TYPECODE, (lookup[code] for code in codes))
+
+
+class LogTable:
+    """
+    Columnar view of classified log entries
+
+    Severity and category are ``uint16`` code arrays (see ``SEVERITIES`` and
+    ``CATEGORIES``), timestamps are ``int64`` epoch milliseconds and messages
+    live in one UTF-8 buffer addressed by start/end offsets. Filtering returns
+    a new table sharing the same message buffer, so aggregates and filtered
+    views never materialize per-row Python objects.
+    """
+
+    def __init__(self, severity, category, epoch_ms, starts, ends, buffer: bytes):
+        self.severity = severity
+        self.category = category
+        self.epoch_ms = epoch_ms
+        self.starts = starts
+        self.ends = ends
+        self.buffer = buffer
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[LogEntry]) -> "LogTable":
+        """Build a table from classified entries"""
+        builder = LogTableBuilder()
+        for entry in entries:
+            builder.append(entry)
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.severity)
+
+    @staticmethod
+    def _codes(table: CodeTable, names: Union[str, Iterable[str]]) -> List[int]:
+        if isinstance(names, str):
+            names = [names]
+        return [table.codes[name] for name in names if name in table.codes]
+
+    def mask(
+        self,
+        severity: Union[str, Iterable[str], None] = None,
+        category: Union[str, Iterable[str], None] = None,
+        since_ms: Optional[int] = None,
+        until_ms: Optional[int] = None
+    ):
+        """Boolean row mask for the given severities, categories and time range"""
+        selected = np.ones(len(self), dtype=bool)
+        if severity is not None:
+            selected &= np.isin(self.severity, self._codes(SEVERITIES, severity))
+        if category is not None:
+            selected &= np.isin(self.category, self._codes(CATEGORIES, category))
+        if since_ms is not None:
+            selected &= self.epoch_ms >= since_ms
+        if until_ms is not None:
+            selected &= (self.epoch_ms < until_ms) & (self.epoch_ms != UNDATED_MS)
+        return selected
+
+    def filter(self, selected=None, **criteria) -> "LogTable":
+        """Return the rows matching a boolean mask and/or ``mask`` criteria"""
+        if selected is None:
+            selected = self.mask(**criteria)
+        elif criteria:
+            selected = selected & self.mask(**criteria)
+        return LogTable(
+            self.severity[selected], self.category[selected], self.epoch_ms[selected],
+            self.starts[selected], self.ends[selected], self.buffer
+        )
+
+    def count(self, **criteria) -> int:
+        """Number of rows matching ``mask`` criteria"""
+        return int(np.count_nonzero(self.mask(**criteria))) if criteria else len(self)
+
+    def counts(self, by: str = "severity") -> Dict[str, int]:
+        """Row counts per severity or category name"""
+        codes, table = self._column(by)
+        totals = np.bincount(codes, minlength=len(table))
+        return {table.names[code]: int(n) for code, n in enumerate(totals) if n}
+
+    def crosstab(self, rows: str = "category", columns: str = "severity") -> Dict[str, Dict[str, int]]:
+        """Nested counts, e.g. {category: {severity: count}}"""
+        row_codes, row_table = self._column(rows)
+        col_codes, col_table = self._column(columns)
+        width = len(col_table)
+        totals = np.bincount(
+            row_codes.astype(np.int64) * width + col_codes, minlength=len(row_table) * width
+        ).reshape(-1, width)
+        return {
+            row_table.names[r]: {col_table.names[c]: int(totals[r, c]) for c in np.flatnonzero(totals[r])}
+            for r in np.flatnonzero(totals.sum(axis=1))
+        }
+
+    def _column(self, name: str):
+        if name == "severity":
+            return self.severity, SEVERITIES
+        if name == "category":
+            return self.category, CATEGORIES
+        raise ValueError(f"Unknown column: {name}")
+
+    def message(self, i: int) -> str:
+        """Decoded message of row ``i``"""
+        return self.buffer[self.starts[i]:self.ends[i]].decode("utf-8", "replace")
+
+    def messages(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self.message(i)
+
+    def entry(self, i: int) -> LogEntry:
+        """Row ``i`` as a LogEntry (timestamp rendered from the epoch value)"""
+        epoch_ms = int(self.epoch_ms[i])
+        if epoch_ms == UNDATED_MS:
+            timestamp, epoch_ms = None, None
+        else:
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch_ms / 1000))
+        return LogEntry(
+            self.message(i),
+            timestamp,
+            epoch_ms,
+            SEVERITIES.names[self.severity[i]],
+            CATEGORIES.names[self.category[i]]
+        )
+
+    def to_frame(self):
+        """Return the table as a pandas DataFrame with categorical columns"""
+        if not PANDAS_AVAILABLE:
+            raise ImportError("pandas is required for LogTable.to_frame")
+        return pd.DataFrame({
+            "timestamp": pd.to_datetime(self.epoch_ms, unit="ms", utc=True),
+            "severity": pd.Categorical.from_codes(self.severity, SEVERITIES.names),
+            "category": pd.Categorical.from_codes(self.category, CATEGORIES.names),
+            "message": list(self.messages())
+        })
@@ -0,0 +1,156 @@
+"""
+Log Templates
+Drain-style online mining of log message templates
+"""
+from operator import eq
+from typing import Any, Dict, List, Optional, Tuple
+import re
+
+WILDCARD = "<*>"
+
+# Whitespace-delimited tokens containing a digit (IDs, IPs, numbers, times)
+_VARIABLE_TOKEN = re.compile(r"(?<!\S)(?=\S*\d)\S+")
+
+
+class LogTemplate:
+    """A mined message template and the statistics of the lines it covers"""
+
+    __slots__ = (
+        "template_id", "tokens", "count", "first_seen", "last_seen", "first_ms", "last_ms", "representative"
+    )
+
+    def __init__(self, template_id: int, tokens: Tuple[str, ...]):
+        self.template_id = template_id
+        self.count = 0
+        self.first_seen: Optional[str] = None
+        self.last_seen: Optional[str] = None
+        self.first_ms: Optional[int] = None
+        self.last_ms: Optional[int] = None
+        self.representative = None           # first entry seen for this template
+        self.tokens = tokens
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def observe(self, entry) -> None:
+        """Count one line (a LogEntry) belonging to this template"""
+        self.count += 1
+        if self.representative is None:
+            self.representative = entry
+            self.first_seen, self.first_ms = entry.timestamp, entry.epoch_ms
+        self.last_seen, self.last_ms = entry.timestamp, entry.epoch_ms
+
+    def absorb(self, other: "LogTemplate") -> None:
+        """Fold in the statistics of the same template mined from a later shard"""
+        if other.count == 0:
+            return
+        if self.representative is None:
+            self.representative = other.representative
+            self.first_seen, self.first_ms = other.first_seen, other.first_ms
+        self.count += other.count
+        self.last_seen, self.last_ms = other.last_seen, other.last_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        representative = self.representative
+        return {
+            "template_id": self.template_id,
+            "template": self.template,
+            "count": self.count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "first_ms": self.first_ms,
+            "last_ms": self.last_ms,
+            "severity": representative["severity"] if representative is not None else None,
+            "category": representative["category"] if representative is not None else None,
+            "representative": representative["message"] if representative is not None else None
+        }
+
+
+class TemplateMiner:
+    """
+    Online log template miner (Drain)
+
+    Tokens containing digits are masked as ``<*>``; the masked line is then
+    routed by token count and its first ``depth - 2`` constant tokens to a
+    small group of candidate templates, and joins the most similar one (share
+    of equal tokens >= ``similarity``), turning positions that differ into
+    wildcards. Otherwise it starts a new template.
+
+    Callers that see the same message shape repeatedly should memoize
+    ``match`` (LogClassifier does so through its classification cache).
+    """
+
+    def __init__(self, depth: int = 4, similarity: float = 0.5):
+        self.prefix_tokens = max(depth - 2, 1)
+        self.similarity = similarity
+        self.templates: List[LogTemplate] = []
+        self._groups: Dict[Tuple, List[LogTemplate]] = {}
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def match(self, message: str) -> LogTemplate:
+        """Template of a message, creating or generalizing one as needed"""
+        template, _ = self.add_tokens(tuple(_VARIABLE_TOKEN.sub(WILDCARD, message).split()))
+        return template
+
+    def add_tokens(self, tokens: Tuple[str, ...]) -> Tuple[LogTemplate, bool]:
+        """Assign a masked token sequence to a template, creating one if needed"""
+        prefix = tuple(token for token in tokens if token != WILDCARD)[:self.prefix_tokens]
+        group = self._groups.setdefault((len(tokens),) + prefix, [])
+
+        best, best_similarity = None, -1.0
+        for candidate in group:
+            if candidate.tokens == tokens:
+                return candidate, False
+            similarity = self._similarity(candidate.tokens, tokens)
+            if similarity > best_similarity:
+                best, best_similarity = candidate, similarity
+
+        if best is not None and best_similarity >= self.similarity:
+            merged = tuple(a if a == b else WILDCARD for a, b in zip(best.tokens, tokens))
+            if merged == best.tokens:
+                return best, False
+            best.tokens = merged
+            return best, True
+
+        template = LogTemplate(len(self.templates), tokens)
+        self.templates.append(template)
+        group.append(template)
+        return template, True
+
+    @staticmethod
+    def _similarity(template: Tuple[str, ...], tokens: Tuple[str, ...]) -> float:
+        """Share of positions where the template and the line agree"""
+        return sum(map(eq, template, tokens)) / len(tokens) if tokens else 1.0
+
+    def merge(self, other: "TemplateMiner") -> Dict[int, int]:
+        """
+        Fold in the templates mined from a later shard
+
+        Returns a mapping from ``other``'s template IDs to IDs in this miner.
+        """
+        remap = {}
+        for theirs in other.templates:
+            ours, _ = self.add_tokens(theirs.tokens)
+            ours.absorb(theirs)
+            remap[theirs.template_id] = ours.template_id
+        return remap
+
+    def summary(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Templates as dicts, most frequent first"""
+        ranked = sorted(self.templates, key=lambda t: t.count, reverse=True)
+        return [template.to_dict() for template in ranked[:limit] if template.count]
+
+
+def representative_issues(issues: List[Any]) -> List[Any]:
+    """The first issue of every template, in order of first occurrence"""
+    seen = set()
+    representatives = []
+    for issue in issues:
+        template_id = issue.get("template_id")
+        if template_id is None or template_id not in seen:
+            seen.add(template_id)
+            representatives.append(issue)
+    return representatives
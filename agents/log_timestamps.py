@@ -0,0 +1,178 @@
+"""
+Log Timestamps
+Per-stream timestamp format sniffing and integer epoch parsing
+"""
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from itertools import chain, islice
+import calendar
+import math
+import re
+import time
+
+MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1
+    )
+}
+
+
+def month_from_name(month: str) -> int:
+    """Convert an abbreviated month name (Jan, feb, ...) to 1-12"""
+    return MONTHS[month.lower()]
+
+
+class TimestampFormat(NamedTuple):
+    """A recognizable timestamp layout"""
+    name: str
+    pattern: str                                        # must define groups Y, m, d, H, M, S
+    month: Callable[[str], int] = int                   # converts the month group to 1-12
+
+
+TIMESTAMP_FORMATS = [
+    TimestampFormat(  # ISO format
+        "iso", r"(?P<Y>\d{4})-(?P<m>\d{2})-(?P<d>\d{2})[T ](?P<H>\d{2}):(?P<M>\d{2}):(?P<S>\d{2})"
+    ),
+    TimestampFormat(  # Apache format
+        "apache", r"(?P<d>\d{2})/(?P<m>\w{3})/(?P<Y>\d{4}):(?P<H>\d{2}):(?P<M>\d{2}):(?P<S>\d{2})",
+        month_from_name
+    ),
+    TimestampFormat(  # Custom format (month first)
+        "custom", r"(?P<m>\d{2})-(?P<d>\d{2})-(?P<Y>\d{4}) (?P<H>\d{2}):(?P<M>\d{2}):(?P<S>\d{2})"
+    ),
+]
+
+SNIFF_SAMPLE_LINES = 50
+
+# Optional fractional seconds right after the timestamp; not part of the string value
+_FRACTION = r"(?:[.,](?P<f>\d{1,6}))?"
+
+
+class TimestampParser:
+    """
+    Extracts timestamps with a format detected once per file or stream
+
+    ``sniff`` looks at a sample of lines, picks the most common format and,
+    when every sampled hit starts the line (optionally after ``[``), applies
+    it as a single anchored match. Lines that miss fall back to searching all
+    formats. Each timestamp is returned both as the original string and as
+    integer epoch milliseconds (naive times are taken as UTC). Lines without
+    any timestamp inherit the previous one, keeping the stream monotonic.
+    Lines before the first timestamp (e.g. ``#`` header lines) have none:
+    they get ``(None, None)`` rather than a made-up time.
+    """
+
+    def __init__(self, preferred: Optional[str] = None, anchored: bool = False):
+        formats = {fmt.name: fmt for fmt in TIMESTAMP_FORMATS}
+        order = [formats[preferred]] if preferred in formats else []
+        order += [fmt for fmt in TIMESTAMP_FORMATS if fmt.name != preferred]
+        self.preferred = preferred if preferred in formats else None
+        self.anchored = anchored and self.preferred is not None
+        self._formats = [(fmt, re.compile(f"(?P<ts>{fmt.pattern}){_FRACTION}")) for fmt in order]
+        if self.preferred:
+            prefix = r"\[?" if self.anchored else ""
+            self._primary = (order[0], re.compile(f"{prefix}(?P<ts>{order[0].pattern}){_FRACTION}"))
+        else:
+            self._primary = None
+        self._day_cache: Dict[Tuple[int, int, int], int] = {}
+        self._last: Tuple[Optional[str], Optional[int]] = (None, None)
+
+    @classmethod
+    def sniff(cls, sample: Iterable[str]) -> "TimestampParser":
+        """Detect the dominant timestamp format of a sample of lines"""
+        hits: Dict[str, int] = {}
+        at_start: Dict[str, bool] = {}
+        compiled = [(fmt, re.compile(fmt.pattern)) for fmt in TIMESTAMP_FORMATS]
+        for line in sample:
+            for fmt, regex in compiled:
+                match = regex.search(line)
+                if match:
+                    hits[fmt.name] = hits.get(fmt.name, 0) + 1
+                    starts = match.start() == 0 or (match.start() == 1 and line[0] == "[")
+                    at_start[fmt.name] = at_start.get(fmt.name, True) and starts
+                    break
+        if not hits:
+            return cls()
+        preferred = max(hits, key=hits.get)
+        return cls(preferred, anchored=at_start[preferred])
+
+    @classmethod
+    def sniff_stream(cls, lines: Iterable[str], sample_size: int = SNIFF_SAMPLE_LINES) -> Tuple["TimestampParser", Iterator[str]]:
+        """Sniff from the head of a lazy line stream, returning the parser and the full stream"""
+        lines = iter(lines)
+        head: List[str] = [line for line in islice(lines, sample_size)]
+        parser = cls.sniff(line for line in head if line.strip())
+        return parser, chain(head, lines)
+
+    def _epoch_ms(self, fmt: TimestampFormat, match) -> Optional[int]:
+        """Convert a timestamp match into epoch milliseconds"""
+        try:
+            day_key = (int(match.group("Y")), fmt.month(match.group("m")), int(match.group("d")))
+        except (KeyError, ValueError):
+            return None
+        if not (1 <= day_key[1] <= 12 and 1 <= day_key[2] <= 31):
+            return None
+        day = self._day_cache.get(day_key)
+        if day is None:
+            try:
+                day = self._day_cache[day_key] = calendar.timegm(day_key + (0, 0, 0))
+            except ValueError:  # e.g. year 0
+                return None
+        seconds = day + int(match.group("H")) * 3600 + int(match.group("M")) * 60 + int(match.group("S"))
+        fraction = match.group("f")
+        millis = int(fraction[:3].ljust(3, "0")) if fraction else 0
+        return seconds * 1000 + millis
+
+    def _timestamp(self, fmt: TimestampFormat, match) -> Optional[Tuple[str, int]]:
+        """Return (timestamp string, epoch ms) for a match, or None if it is not a valid date"""
+        # Consecutive lines often share a timestamp; reuse the previous objects
+        if match.group("f") is None and match.group("ts") == self._last[0]:
+            return self._last
+        epoch_ms = self._epoch_ms(fmt, match)
+        if epoch_ms is None:
+            return None
+        return match.group("ts"), epoch_ms
+
+    def parse(self, line: str) -> Tuple[Optional[str], Optional[int]]:
+        """Return (timestamp string, epoch milliseconds) for a log line, (None, None) before the first one"""
+        if self._primary is not None:
+            fmt, regex = self._primary
+            match = regex.match(line) if self.anchored else regex.search(line)
+            if match:
+                parsed = self._timestamp(fmt, match)
+                if parsed:
+                    self._last = parsed
+                    return parsed
+
+        for fmt, regex in self._formats:
+            match = regex.search(line)
+            if match:
+                parsed = self._timestamp(fmt, match)
+                if parsed:
+                    self._last = parsed
+                    return parsed
+
+        return self._last
+
+    def parse_value(self, value) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Return (timestamp string, epoch milliseconds) for a structured timestamp field
+
+        Accepts timestamp strings in any known format and epoch numbers in
+        seconds or milliseconds (also as strings); a missing or unreadable
+        value inherits the previous timestamp.
+        """
+        if isinstance(value, str):
+            try:
+                value = float(value)
+            except ValueError:
+                return self.parse(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+            # Values below 1e11 are seconds (1e11 ms is early 1973)
+            epoch_ms = int(value * 1000) if abs(value) < 1e11 else int(value)
+            try:
+                timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch_ms / 1000))
+            except (OverflowError, OSError, ValueError):
+                return self._last
+            self._last = (timestamp, epoch_ms)
+        return self._last
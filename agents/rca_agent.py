@@ -2,8 +2,9 @@
 Root Cause Analysis (RCA) Agent
 Performs formal root cause analysis with structured methodology
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .base_agent import BaseAgent
+from .log_dedup import repeat_note
 from config import Config
 import logging
 from datetime import datetime
@@ -78,10 +79,16 @@ class RCAAgent(BaseAgent):
         critical_issues = [i for i in issues if i["severity"] == "CRITICAL"]
         error_issues = [i for i in issues if i["severity"] == "ERROR"]
         
+        # Incidents segmented from one log range are analyzed at the same time
+        incident_id = f"INC-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        segment = log_analysis.get("segment")
+        if segment and segment["total"] > 1:
+            incident_id += f"-{segment['index'] + 1}"
+        
         # Basic RCA structure
         rca = {
             "metadata": {
-                "incident_id": f"INC-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
+                "incident_id": incident_id,
                 "analysis_date": datetime.now().isoformat(),
                 "analyzer": "Multi-Agent DevOps Incident Suite",
                 "total_issues": len(issues),
@@ -123,10 +130,12 @@ class RCAAgent(BaseAgent):
     ) -> Dict[str, Any]:
         """Use LLM to generate comprehensive RCA"""
         
-        # Prepare context
+        # Prepare context from the highest-priority issues
+        ranked = log_analysis.get("prioritized_issues") or issues
         issues_text = "\n".join([
-            f"- [{i['severity']}] {i['category']}: {i['message']}"
-            for i in issues[:15]
+            f"- [{i['severity']}] {i['category']}: {i['message']}{repeat_note(i)}"
+            + (f" (source: {i['source']})" if i.get('source') else "")
+            for i in ranked[:15]
         ])
         
         # Executive Summary
@@ -154,8 +163,8 @@ Provide a single, clear problem statement (1-2 sentences) that describes what we
         rca["problem_statement"] = problem_response.content.strip()
         
         # Five Whys Analysis (for primary issue)
-        if issues:
-            primary_issue = issues[0]
+        if ranked:
+            primary_issue = ranked[0]
             whys_prompt = f"""Perform a "5 Whys" root cause analysis for this issue:
 
 Issue: {primary_issue['message']}
@@ -255,7 +264,7 @@ Provide 3-5 specific lessons learned that the team should remember."""
         rca["lessons_learned"] = self._parse_list_items(lessons_response.content)
         
         # Timeline
-        rca["timeline"] = self._extract_timeline(issues)
+        rca["timeline"] = self._extract_timeline(issues, log_analysis.get("bursts"))
         
         return rca
     
@@ -320,7 +329,7 @@ Provide 3-5 specific lessons learned that the team should remember."""
                 "priority": i['severity'],
                 "details": i['message']
             }
-            for i in issues[:5]
+            for i in (log_analysis.get("prioritized_issues") or issues)[:5]
         ]
         
         # Preventive Measures
@@ -343,21 +352,36 @@ Provide 3-5 specific lessons learned that the team should remember."""
         ]
         
         # Timeline
-        rca["timeline"] = self._extract_timeline(issues)
+        rca["timeline"] = self._extract_timeline(issues, log_analysis.get("bursts"))
         
         return rca
     
-    def _extract_timeline(self, issues: List[Dict]) -> List[Dict]:
-        """Extract timeline of events from issues"""
-        timeline = []
-        for issue in sorted(issues, key=lambda x: x.get('timestamp', '')):
-            timeline.append({
-                "timestamp": issue.get('timestamp', 'Unknown'),
+    def _extract_timeline(self, issues: List[Dict], bursts: Optional[List[Dict]] = None) -> List[Dict]:
+        """Extract timeline of events from issues and the Log Reader's detected bursts"""
+        events = []
+        # Integer epoch timestamps from the Log Reader sort without re-parsing
+        for issue in issues:
+            event = {
+                "timestamp": issue.get('timestamp') or 'Unknown',
                 "event": issue['message'][:100],
                 "severity": issue['severity'],
                 "category": issue['category']
-            })
-        return timeline
+            }
+            # Merged multi-source logs tag each issue with the log it came from
+            if issue.get('source'):
+                event["source"] = issue['source']
+            events.append(((issue.get('epoch_ms') or 0, issue.get('timestamp') or ''), event))
+        for burst in bursts or []:
+            events.append(((burst['start_ms'], burst['start']), {
+                "timestamp": burst['start'],
+                "event": (
+                    f"Burst of {burst['count']} {burst['category']} {burst['severity']} lines until "
+                    f"{burst['end']} (peak {burst['peak']} per bucket, baseline {burst['baseline']})"
+                ),
+                "severity": burst['severity'],
+                "category": burst['category']
+            }))
+        return [event for _, event in sorted(events, key=lambda e: e[0])]
     
     def _parse_root_causes(self, llm_output: str) -> List[Dict]:
         """Parse root causes from LLM output"""
@@ -8,7 +8,10 @@ from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from .base_agent import BaseAgent
+from .log_dedup import repeat_note
+from .log_merge import source_note
 from config import Config
+import numpy as np
 import logging
 import os
 
@@ -189,8 +192,10 @@ Rationale: {doc['rationale']}
             
             # Find remediations for each issue
             remediations = []
-            for issue in issues[:10]:  # Limit to top 10 critical issues
-                remediation = await self._find_remediation(issue)
+            ranked = issues[:10]  # Limit to top 10 issues (ranked by the Log Reader)
+            relevant = self._retrieve_knowledge(ranked)
+            for issue, relevant_docs in zip(ranked, relevant):
+                remediation = await self._find_remediation(issue, relevant_docs)
                 if remediation:
                     remediations.append(remediation)
             
@@ -215,22 +220,58 @@ Rationale: {doc['rationale']}
                 "agent": self.name
             }
     
-    async def _find_remediation(self, issue: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _query(issue: Dict[str, Any]) -> str:
+        """Knowledge base query for an issue"""
+        return f"{issue['category']} {issue['severity']} {issue['message']}"
+    
+    def _retrieve_knowledge(self, issues: List[Dict[str, Any]]) -> List[Optional[List[Any]]]:
+        """
+        Knowledge base documents for every issue, retrieved in one batch
+        
+        All queries are encoded in one embed_documents call and looked up
+        with one multi-query FAISS search, instead of one model pass and
+        one search per issue. Hits are mapped back to documents the way
+        FAISS.similarity_search does. Returns None per issue when the batch
+        fails, so each issue falls back to its own search.
+        """
+        if not self.vector_store or not issues:
+            return [[] for _ in issues]
+        try:
+            store = self.vector_store
+            vectors = np.asarray(
+                self.embeddings.embed_documents([self._query(issue) for issue in issues]),
+                dtype=np.float32
+            )
+            if getattr(store, "_normalize_L2", False):
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            _, indices = store.index.search(vectors, Config.TOP_K_RESULTS)
+            return [
+                [store.docstore.search(store.index_to_docstore_id[i]) for i in row if i != -1]
+                for row in indices.tolist()
+            ]
+        except Exception as e:
+            logger.warning(f"Batched vector search failed: {e}")
+            return [None] * len(issues)
+    
+    async def _find_remediation(
+        self,
+        issue: Dict[str, Any],
+        relevant_docs: Optional[List[Any]] = None
+    ) -> Optional[Dict[str, Any]]:
         """Find remediation for a specific issue using RAG + MCP context"""
         try:
-            # Create query from issue
-            query = f"{issue['category']} {issue['severity']} {issue['message']}"
-            
-            # Retrieve relevant knowledge from RAG
-            relevant_docs = []
-            if self.vector_store:
-                try:
-                    relevant_docs = self.vector_store.similarity_search(
-                        query,
-                        k=Config.TOP_K_RESULTS
-                    )
-                except Exception as e:
-                    logger.warning(f"Vector search failed: {e}")
+            # Retrieve relevant knowledge from RAG (unless retrieved in a batch already)
+            if relevant_docs is None:
+                relevant_docs = []
+                if self.vector_store:
+                    try:
+                        relevant_docs = self.vector_store.similarity_search(
+                            self._query(issue),
+                            k=Config.TOP_K_RESULTS
+                        )
+                    except Exception as e:
+                        logger.warning(f"Vector search failed: {e}")
             
             # Get MCP context (real-time metrics, infrastructure state, etc.)
             mcp_context = ""
@@ -291,7 +332,7 @@ Rationale: {doc['rationale']}
 - Severity: {issue['severity']}
 - Category: {issue['category']}
 - Message: {issue['message']}
-- Timestamp: {issue.get('timestamp', 'Unknown')}
+- Timestamp: {issue.get('timestamp') or 'Unknown'}{repeat_note(issue)}{source_note(issue)}
 
 **Relevant Knowledge (RAG):**
 {context}
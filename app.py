@@ -9,6 +9,7 @@ import time
 from datetime import datetime
 import plotly.graph_objects as go
 from orchestrator import IncidentOrchestrator
+from agents.log_sources import is_compressed
 from config import Config
 import json
 import os
@@ -450,6 +451,15 @@ def render_agent_timeline(timeline):
             st.markdown("---")
 
 
+def get_issue_counts(log_analysis):
+    """Return (critical, error) counts, reduced from the columnar log table when present"""
+    table = log_analysis.get("log_table")
+    if table is not None:
+        counts = table.counts("severity")
+        return counts.get("CRITICAL", 0), counts.get("ERROR", 0)
+    return log_analysis.get("critical_count", 0), log_analysis.get("error_count", 0)
+
+
 def create_metrics_chart(results):
     """Create interactive metrics visualization"""
     if not results or not results.get("success"):
@@ -462,8 +472,7 @@ def create_metrics_chart(results):
     fig = go.Figure()
     
     # Critical issues gauge
-    critical = log_analysis.get("critical_count", 0)
-    errors = log_analysis.get("error_count", 0)
+    critical, errors = get_issue_counts(log_analysis)
     total = log_analysis.get("total_entries", 1)
     
     fig.add_trace(go.Indicator(
@@ -501,6 +510,40 @@ def create_metrics_chart(results):
     return fig
 
 
+def create_event_histogram_chart(log_analysis):
+    """Stacked per-bucket line counts by severity from the Log Reader's histogram, bursts shaded"""
+    histogram = log_analysis.get("histogram")
+    if histogram is None or len(histogram) < 2:
+        return None
+    
+    times = [datetime.utcfromtimestamp(ms / 1000) for ms in histogram.bucket_starts.tolist()]
+    colors = {"CRITICAL": "#ff4b4b", "ERROR": "#ffa421", "WARNING": "#ffe312"}
+    
+    fig = go.Figure()
+    for severity, counts in histogram.by("severity").items():
+        if severity not in colors:
+            continue
+        fig.add_trace(go.Bar(x=times, y=counts.tolist(), name=severity, marker_color=colors[severity]))
+    
+    for burst in log_analysis.get("bursts", []):
+        fig.add_vrect(
+            x0=datetime.utcfromtimestamp(burst["start_ms"] / 1000),
+            x1=datetime.utcfromtimestamp(burst["end_ms"] / 1000),
+            fillcolor="red", opacity=0.15, line_width=0
+        )
+    
+    fig.update_layout(
+        barmode="stack",
+        title={'text': "Issues Over Time", 'font': {'color': 'white'}},
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font={'color': "white", 'family': "Arial"},
+        height=300
+    )
+    
+    return fig
+
+
 def calculate_business_impact(results):
     """Calculate business impact metrics"""
     if not results or not results.get("success"):
@@ -806,7 +849,7 @@ def generate_rca_word_document(rca_report):
         # Data rows
         for event in timeline:
             row_cells = table.add_row().cells
-            row_cells[0].text = event.get('timestamp', 'Unknown')
+            row_cells[0].text = event.get('timestamp') or 'Unknown'
             row_cells[1].text = event.get('severity', '')
             row_cells[2].text = event.get('event', '')
         
@@ -865,7 +908,7 @@ def render_results(results):
         )
     
     with col2:
-        critical = log_analysis.get("critical_count", 0)
+        critical, _ = get_issue_counts(log_analysis)
         st.metric(
             "Critical Issues",
             critical,
@@ -892,6 +935,14 @@ def render_results(results):
     if chart:
         st.plotly_chart(chart, use_container_width=True)
     
+    # Event histogram with detected bursts
+    histogram_chart = create_event_histogram_chart(log_analysis)
+    if histogram_chart:
+        st.plotly_chart(histogram_chart, use_container_width=True)
+        bursts = log_analysis.get("bursts", [])
+        if bursts:
+            st.caption(f"⚡ {len(bursts)} bursts detected above the EWMA baseline")
+    
     # Executive Summary
     if state.get("summary"):
         st.markdown("### 📝 Executive Summary")
@@ -907,7 +958,11 @@ def render_results(results):
             
             with st.expander(f"🔴 Issue #{i}: {issue['category'].upper()} - {issue['severity']}", expanded=False):
                 st.markdown(f"**Message:** `{issue['message']}`")
-                st.markdown(f"**Timestamp:** {issue.get('timestamp', 'Unknown')}")
+                st.markdown(f"**Timestamp:** {issue.get('timestamp') or 'Unknown'}")
+                if issue.get('source'):
+                    st.markdown(f"**Source:** {issue['source']}")
+                if issue.get('count', 1) > 1:
+                    st.markdown(f"**Occurrences:** {issue['count']} (last seen {issue.get('last_seen')})")
                 
                 # Show MCP context if available
                 if rem.get('mcp_context_used') and rem.get('mcp_data'):
@@ -1200,7 +1255,8 @@ def render_results(results):
         if timeline:
             with st.expander("⏱️ Incident Timeline"):
                 for event in timeline:
-                    st.markdown(f"**{event.get('timestamp', 'Unknown')}** - [{event.get('severity', '')}] {event.get('event', '')}")
+                    source = f" ({event['source']})" if event.get('source') else ""
+                    st.markdown(f"**{event.get('timestamp') or 'Unknown'}** - [{event.get('severity', '')}] {event.get('event', '')}{source}")
         
         # Download RCA Report
         st.markdown("---")
@@ -1282,10 +1338,12 @@ def main():
         # Log input
         col1, col2 = st.columns([3, 1])
         with col1:
-            uploaded_file = st.file_uploader(
-                "Upload log file",
-                type=["log", "txt"],
-                help="Upload your operational logs"
+            uploaded_files = st.file_uploader(
+                "Upload log files",
+                type=["log", "txt", "jsonl", "gz", "bz2", "xz", "zst", "tar", "tgz"],
+                accept_multiple_files=True,
+                help="Upload your operational logs (plain, compressed or a tar archive of log files); "
+                     "several files are merged into one timeline by timestamp"
             )
         
         with col2:
@@ -1299,10 +1357,24 @@ def main():
             placeholder="Paste your operational logs here..."
         )
         
-        # Process uploaded file
-        if uploaded_file:
-            logs = uploaded_file.read().decode("utf-8")
-            st.success(f"✅ Loaded {len(logs.split(chr(10)))} lines from {uploaded_file.name}")
+        # Process uploaded file; compressed files and archives are streamed
+        # to the Log Reader and decompressed incrementally instead of inflated here
+        log_source = None
+        log_sources = None
+        uploaded_file = uploaded_files[0] if len(uploaded_files or []) == 1 else None
+        if uploaded_files and len(uploaded_files) > 1:
+            # Several logs (e.g. gateway, database, Kubernetes) are merged by timestamp
+            log_sources = {f.name: f for f in uploaded_files}
+            logs = ""
+            st.success(f"✅ Loaded {len(uploaded_files)} files, merged by timestamp while analyzing")
+        elif uploaded_file:
+            if is_compressed(uploaded_file) or uploaded_file.name.endswith(".tar"):
+                log_source = uploaded_file
+                logs = ""
+                st.success(f"✅ Loaded {uploaded_file.name} ({uploaded_file.size / 1024:.0f} KB, decompressed while analyzing)")
+            else:
+                logs = uploaded_file.read().decode("utf-8")
+                st.success(f"✅ Loaded {len(logs.split(chr(10)))} lines from {uploaded_file.name}")
         
         # Analyze button
         col1, col2, col3 = st.columns([1, 2, 1])
@@ -1310,10 +1382,10 @@ def main():
             analyze_btn = st.button(
                 "🚀 Analyze Incident",
                 use_container_width=True,
-                disabled=st.session_state.processing or not logs
+                disabled=st.session_state.processing or not (logs or log_source or log_sources)
             )
         
-        if analyze_btn and logs:
+        if analyze_btn and (logs or log_source or log_sources):
             st.session_state.processing = True
             st.session_state.analysis_complete = False
             
@@ -1442,7 +1514,7 @@ def main():
             # Run analysis
             try:
                 results = asyncio.run(
-                    st.session_state.orchestrator.process_incident(logs)
+                    st.session_state.orchestrator.process_incident(logs, log_source, log_sources=log_sources)
                 )
                 
                 st.session_state.analysis_results = results
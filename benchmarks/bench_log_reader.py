@@ -0,0 +1,153 @@
+"""
+Log Reader Benchmark
+Measures Log Reader classification throughput on the bundled sample_logs*.txt
+corpora, scaled up, comparing the legacy per-line code with the compiled
+matchers, and the keyword rules with the batched learned model.
+
+Usage:
+    python benchmarks/bench_log_reader.py [--scale 2000]
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agents.log_cache import LRUCache  # noqa: E402
+from agents.log_classifier import (  # noqa: E402
+    DEFAULT_ISSUE_CATEGORIES,
+    DEFAULT_SEVERITY_PATTERNS,
+    LogClassifier,
+)
+from agents.log_entry import LogEntry  # noqa: E402
+from agents.log_model import NUMPY_AVAILABLE, LogModel  # noqa: E402
+from agents.log_templates import TemplateMiner  # noqa: E402
+
+
+# Lines whose fields overlap (a status code inside an error code or an IP
+# address), so every comparison also checks them against the legacy output
+EDGE_CASES = [
+    "2025-11-07 10:00:00 ERROR error code: 503 from 10.0.0.1",
+    "2025-11-07 10:00:01 ERROR service: 500 failed",
+    "2025-11-07 10:00:02 WARNING ip 10.40.450.1 down",
+    "2025-11-07 10:00:03 ERROR upstream returned 503, retry got 503",
+]
+
+
+def load_corpus(scale: int) -> List[str]:
+    """Return the non-blank lines of every bundled sample plus the edge cases, repeated ``scale`` times"""
+    lines = []
+    for path in sorted(ROOT.glob("sample_logs*.txt")):
+        lines.extend(line for line in path.read_text().splitlines() if line.strip())
+    return (lines + EDGE_CASES) * scale
+
+
+def legacy_severity(message: str) -> str:
+    """Severity detection as originally implemented in LogReaderAgent"""
+    message_lower = message.lower()
+    for sev, pattern in DEFAULT_SEVERITY_PATTERNS.items():
+        if re.search(pattern, message_lower, re.IGNORECASE):
+            return sev
+    return "INFO"
+
+
+def legacy_category(message: str) -> str:
+    """Category detection as originally implemented in LogReaderAgent"""
+    message_lower = message.lower()
+    for cat, keywords in DEFAULT_ISSUE_CATEGORIES.items():
+        if any(keyword in message_lower for keyword in keywords):
+            return cat
+    return "general"
+
+
+def legacy_fields(message: str) -> dict:
+    """Field extraction as originally implemented in LogReaderAgent"""
+    fields = {}
+    ips = re.findall(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', message)
+    if ips:
+        fields["ip_addresses"] = ips
+    statuses = re.findall(r'\b[45]\d{2}\b', message)
+    if statuses:
+        fields["http_status"] = statuses
+    errors = re.findall(r'error[_ ]code[:\s]+(\w+)', message, re.IGNORECASE)
+    if errors:
+        fields["error_codes"] = errors
+    services = re.findall(r'service[:\s]+(\w+)', message, re.IGNORECASE)
+    if services:
+        fields["services"] = services
+    return fields
+
+
+def classify_labels(classifier: LogClassifier, line: str) -> tuple:
+    """Severity and categories assigned by a full classify() call"""
+    entry = classifier.classify(LogEntry(line))
+    return entry.severity, entry.categories
+
+
+def run(fn: Callable[[str], object], lines: List[str]):
+    """Apply ``fn`` to every line, returning (lines/sec, results)"""
+    start = time.perf_counter()
+    results = [fn(line) for line in lines]
+    elapsed = time.perf_counter() - start
+    return len(lines) / elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=2000, help="times to repeat the sample corpora")
+    args = parser.parse_args()
+    
+    lines = load_corpus(args.scale)
+    classifier = LogClassifier()
+    automaton = classifier.category_automaton
+    templated = LogClassifier(templates=TemplateMiner())
+    cached = LogClassifier(templates=TemplateMiner(), cache=LRUCache(10000))
+    
+    # (name, legacy implementation, optimized implementation)
+    comparisons = [
+        ("severity", legacy_severity, lambda line: classifier.severity_matcher.match(line.lower())),
+        ("category", legacy_category, lambda line: automaton.primary(automaton.match_mask(line.lower()))),
+        ("fields", legacy_fields, classifier.field_extractor.extract),
+        # Per-line classify() vs. classification memoized by normalized message
+        ("cache", lambda line: classify_labels(templated, line), lambda line: classify_labels(cached, line)),
+    ]
+    
+    print(f"Corpus: {len(lines):,} lines")
+    for name, legacy, optimized in comparisons:
+        legacy_rate, legacy_results = run(legacy, lines)
+        optimized_rate, optimized_results = run(optimized, lines)
+        status = "OK" if legacy_results == optimized_results else "MISMATCH"
+        print(
+            f"{name:<10} legacy {legacy_rate:>12,.0f} lines/s | "
+            f"compiled {optimized_rate:>12,.0f} lines/s | "
+            f"{optimized_rate / legacy_rate:5.2f}x  [{status}]"
+        )
+    
+    # Model trained on the rule labels of the samples, relabeling classify() output in batches
+    if NUMPY_AVAILABLE:
+        samples = lines[:len(lines) // args.scale]
+        model = LogModel.train(
+            {"message": line, "severity": entry.severity, "category": entry.category}
+            for line, entry in zip(samples, (classifier.classify(LogEntry(line)) for line in samples))
+        )
+        modeled = LogClassifier(model=model)
+        rules_rate, rule_entries = run(lambda line: classifier.classify(LogEntry(line)), lines)
+        start = time.perf_counter()
+        model_entries = list(modeled.refine(modeled.classify(LogEntry(line)) for line in lines))
+        model_rate = len(lines) / (time.perf_counter() - start)
+        agreement = sum(
+            (a.severity, a.category) == (b.severity, b.category) for a, b in zip(rule_entries, model_entries)
+        ) / len(lines)
+        print(
+            f"{'model':<10} rules  {rules_rate:>12,.0f} lines/s | "
+            f"batched  {model_rate:>12,.0f} lines/s | "
+            f"{model_rate / rules_rate:5.2f}x  [{agreement:.0%} agree]"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -57,6 +57,36 @@ class Config:
     MAX_AGENT_ITERATIONS = 5
     AGENT_TIMEOUT = 120  # seconds
     
+    # Log Reader Settings
+    LOG_READ_CHUNK_SIZE = int(os.getenv("LOG_READ_CHUNK_SIZE", str(1024 * 1024)))  # bytes per read when streaming
+    LOG_READER_WORKERS = int(os.getenv("LOG_READER_WORKERS", "1"))  # >1 shards file sources across processes
+    LOG_PARALLEL_MIN_BYTES = int(os.getenv("LOG_PARALLEL_MIN_BYTES", str(16 * 1024 * 1024)))  # smaller files stay single-process
+    LOG_CATEGORY_KEYWORDS_FILE = os.getenv("LOG_CATEGORY_KEYWORDS_FILE", "")  # JSON {category: [keywords]} merged into the defaults
+    LOG_COLUMNAR_TABLE = os.getenv("LOG_COLUMNAR_TABLE", "false").lower() == "true"  # also emit a NumPy LogTable
+    LOG_TEMPLATE_MINING = os.getenv("LOG_TEMPLATE_MINING", "true").lower() == "true"  # group lines into message templates
+    LOG_CLASSIFICATION_CACHE_SIZE = int(os.getenv("LOG_CLASSIFICATION_CACHE_SIZE", "10000"))  # normalized lines memoized; 0 disables
+    LOG_LINE_FORMAT = os.getenv("LOG_LINE_FORMAT", "auto").lower()  # auto, text, json, logfmt or syslog
+    LOG_FOLLOW_INTERVAL = float(os.getenv("LOG_FOLLOW_INTERVAL", "60"))  # seconds between follow-mode cycles
+    LOG_MULTILINE_MAX_LINES = int(os.getenv("LOG_MULTILINE_MAX_LINES", "500"))  # lines per stack-trace record; 0 disables assembly
+    LOG_COLLAPSE_DUPLICATES = os.getenv("LOG_COLLAPSE_DUPLICATES", "true").lower() == "true"  # repeated lines become one counted entry
+    LOG_COLLAPSE_WINDOW_SECONDS = float(os.getenv("LOG_COLLAPSE_WINDOW_SECONDS", "300"))  # max gap between collapsed repeats
+    LOG_ISSUES_ONLY = os.getenv("LOG_ISSUES_ONLY", "false").lower() == "true"  # only WARNING and above get full classification
+    LOG_PRIORITY_TOP_K = int(os.getenv("LOG_PRIORITY_TOP_K", "20"))  # highest-priority issues handed to downstream agents
+    LOG_FIELD_SKETCH_SIZE = int(os.getenv("LOG_FIELD_SKETCH_SIZE", "100"))  # top values tracked per extracted field; 0 disables
+    LOG_HISTOGRAM_BUCKET_SECONDS = float(os.getenv("LOG_HISTOGRAM_BUCKET_SECONDS", "60"))  # time-bucket width of the event histogram; 0 disables
+    LOG_BURST_ALPHA = float(os.getenv("LOG_BURST_ALPHA", "0.3"))  # EWMA smoothing of the burst baseline per bucket
+    LOG_BURST_THRESHOLD = float(os.getenv("LOG_BURST_THRESHOLD", "3.0"))  # deviations above baseline that flag a burst
+    LOG_CLASSIFIER_MODEL = os.getenv("LOG_CLASSIFIER_MODEL", "")  # .npz from agents.log_model; empty keeps keyword rules only
+    LOG_MODEL_MIN_CONFIDENCE = float(os.getenv("LOG_MODEL_MIN_CONFIDENCE", "0.6"))  # model labels below this keep the keyword labels
+    LOG_MODEL_BATCH_SIZE = int(os.getenv("LOG_MODEL_BATCH_SIZE", "4096"))  # lines per vectorized model batch
+    LOG_EMBEDDING_FALLBACK = os.getenv("LOG_EMBEDDING_FALLBACK", "true").lower() == "true"  # embed uncategorized issue lines (orchestrator only; file reads stay single-process)
+    LOG_EMBEDDING_MIN_SIMILARITY = float(os.getenv("LOG_EMBEDDING_MIN_SIMILARITY", "0.3"))  # cosine similarity needed to take a centroid's category
+    
+    # Incident Segmentation Settings
+    INCIDENT_SEGMENT_GAP_SECONDS = float(os.getenv("INCIDENT_SEGMENT_GAP_SECONDS", "900"))  # quiet period that splits incidents
+    INCIDENT_SHIFT_GAP_SECONDS = float(os.getenv("INCIDENT_SHIFT_GAP_SECONDS", "120"))  # shorter quiet period that splits on a category shift
+    INCIDENT_MAX_CONCURRENCY = int(os.getenv("INCIDENT_MAX_CONCURRENCY", "3"))  # incidents run through the agents at once
+    
     # MCP (Model Context Protocol) Settings
     MCP_ENABLED = os.getenv("MCP_ENABLED", "true").lower() == "true"
     
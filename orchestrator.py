@@ -2,7 +2,7 @@
 LangGraph Orchestrator
 Manages workflow between all agents
 """
-from typing import Dict, Any, TypedDict, Annotated
+from typing import Dict, Any, AsyncIterator, Optional, TypedDict, Annotated
 from typing_extensions import TypedDict
 import operator
 from langgraph.graph import StateGraph, END
@@ -14,8 +14,12 @@ from agents import (
     CookbookAgent,
     RCAAgent
 )
+from agents.log_follow import LogFollower
+from agents.log_segments import segment_analysis, segment_issues
+from config import Config
 import logging
 import asyncio
+import copy
 import time
 
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +29,8 @@ logger = logging.getLogger(__name__)
 class IncidentState(TypedDict):
     """State that flows through the agent graph"""
     logs: str
+    log_source: Any
+    log_sources: Any
     log_analysis: Dict[str, Any]
     issues_found: list
     remediations: list
@@ -52,9 +58,9 @@ class IncidentOrchestrator:
         except ImportError:
             self.mcp_client = None
         
-        # Initialize all agents
-        self.log_reader = LogReaderAgent(api_key)
+        # Initialize all agents (the Log Reader shares the Remediation Agent's embedding model)
         self.remediation = RemediationAgent(api_key, mcp_client=self.mcp_client)
+        self.log_reader = LogReaderAgent(api_key, embeddings=self.remediation.embeddings)
         self.notification = NotificationAgent(api_key)
         self.jira = JiraAgent(api_key)
         self.cookbook = CookbookAgent(api_key)
@@ -102,7 +108,12 @@ class IncidentOrchestrator:
             await self.progress_callback("log_reader", "processing", "Parsing and classifying log entries...")
         
         try:
-            result = await self.log_reader.execute({"logs": state["logs"]})
+            # Follow mode hands over the analysis of the new lines it already ran
+            result = state.get("log_analysis") or await self.log_reader.execute({
+                "logs": state["logs"],
+                "log_source": state.get("log_source"),
+                "log_sources": state.get("log_sources")
+            })
             
             # Calculate execution time
             execution_time = time.time() - start_time
@@ -142,8 +153,14 @@ class IncidentOrchestrator:
             await self.progress_callback("remediation", "processing", "Finding solutions using RAG knowledge base...")
         
         try:
+            # Highest-priority issues (one per message template) instead of raw duplicates
+            log_analysis = state.get("log_analysis") or {}
             result = await self.remediation.execute({
-                "issues_found": state["issues_found"]
+                "issues_found": (
+                    log_analysis.get("prioritized_issues")
+                    or log_analysis.get("issue_representatives")
+                    or state["issues_found"]
+                )
             })
             
             execution_time = time.time() - start_time
@@ -324,12 +341,25 @@ class IncidentOrchestrator:
                 "agent_logs": [{"agent": "Cookbook", "status": "failed", "error": str(e)}]
             }
     
-    async def process_incident(self, logs: str) -> Dict[str, Any]:
+    async def process_incident(
+        self,
+        logs: str,
+        log_source: Optional[Any] = None,
+        log_analysis: Optional[Dict[str, Any]] = None,
+        log_sources: Optional[Any] = None
+    ) -> Dict[str, Any]:
         """
         Process incident through all agents
         
         Args:
             logs: Raw log text
+            log_source: Optional file path or binary file object to stream
+                logs from instead of passing them as one string
+            log_analysis: Optional Log Reader result computed beforehand
+                (follow mode); the Log Reader is then not run again
+            log_sources: Optional files or streams ({tag: source} or a
+                list) merged into one time-ordered stream, e.g. API
+                gateway, database and Kubernetes logs of one incident
             
         Returns:
             Complete incident analysis with all agent results
@@ -339,7 +369,9 @@ class IncidentOrchestrator:
         # Initialize state
         initial_state = {
             "logs": logs,
-            "log_analysis": {},
+            "log_source": log_source,
+            "log_sources": log_sources,
+            "log_analysis": log_analysis or {},
             "issues_found": [],
             "remediations": [],
             "notifications": {},
@@ -371,6 +403,176 @@ class IncidentOrchestrator:
                 "state": initial_state
             }
     
+    async def process_incidents(
+        self,
+        logs: str,
+        log_source: Optional[Any] = None,
+        log_sources: Optional[Any] = None,
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Split a long log range into incidents and process each separately
+        
+        The Log Reader runs once over the whole range. Its issues are then
+        split into incident windows at quiet periods and category shifts
+        (see segment_issues), and every window runs through the downstream
+        agents with its own RCA and cookbook. At most max_concurrency
+        incidents run at once. Each runs on a worker thread with its own
+        event loop, because the agents call their LLMs synchronously, and
+        on its own copies of the downstream agents, so their status and
+        execution logs do not interleave. Library API: the Streamlit app
+        analyzes an upload as a single incident.
+        
+        Args:
+            logs: Raw log text
+            log_source: Optional file path or binary file object to stream
+            log_sources: Optional files or streams merged by timestamp
+            max_concurrency: Incidents processed at once (default
+                Config.INCIDENT_MAX_CONCURRENCY)
+            
+        Returns:
+            Whole-range Log Reader analysis and one process_incident
+            result per incident, in time order, each with its 'segment'
+        """
+        logger.info("🧩 Segmenting log range into incidents...")
+        
+        analysis = await self.log_reader.execute({
+            "logs": logs,
+            "log_source": log_source,
+            "log_sources": log_sources
+        })
+        if not analysis.get("success"):
+            return {"success": False, "error": analysis.get("error"), "log_analysis": analysis, "incidents": []}
+        
+        segments = segment_issues(
+            analysis["issues_found"],
+            int(Config.INCIDENT_SEGMENT_GAP_SECONDS * 1000),
+            int(Config.INCIDENT_SHIFT_GAP_SECONDS * 1000)
+        )
+        logger.info(f"🧩 Found {len(segments)} incidents in {analysis['total_entries']} log entries")
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or Config.INCIDENT_MAX_CONCURRENCY))
+        loop = asyncio.get_running_loop()
+        callback = self.progress_callback
+        
+        async def forward_progress(*args):
+            # Progress updates run on the caller's loop, not the worker's
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(callback(*args), loop))
+        
+        async def run_segment(index: int, segment) -> Dict[str, Any]:
+            incident_analysis = segment_analysis(
+                analysis, segment, index, len(segments), Config.LOG_PRIORITY_TOP_K
+            )
+            orchestrator = self._for_incident(forward_progress if callback else None)
+            async with semaphore:
+                incident = await asyncio.to_thread(
+                    asyncio.run, orchestrator.process_incident("", log_analysis=incident_analysis)
+                )
+            incident["segment"] = incident_analysis["segment"]
+            return incident
+        
+        incidents = await asyncio.gather(*(
+            run_segment(index, segment) for index, segment in enumerate(segments)
+        ))
+        
+        return {
+            "success": all(incident["success"] for incident in incidents),
+            "log_analysis": analysis,
+            "incidents": incidents
+        }
+    
+    def _for_incident(self, progress_callback=None) -> "IncidentOrchestrator":
+        """
+        Orchestrator on fresh copies of the downstream agents, for one concurrent incident
+        
+        The copies share the LLM, embedding and API clients but not the
+        per-run status and execution log.
+        """
+        orchestrator = copy.copy(self)
+        orchestrator.progress_callback = progress_callback
+        for name in ("remediation", "notification", "jira", "cookbook", "rca"):
+            agent = copy.copy(getattr(self, name))
+            agent.reset()
+            setattr(orchestrator, name, agent)
+        orchestrator.graph = orchestrator._build_graph()
+        return orchestrator
+    
+    async def follow_cycle(self, follower: LogFollower) -> Dict[str, Any]:
+        """
+        Analyze the lines appended since the follower's last checkpoint
+        
+        Downstream agents only run when the new lines contain ERROR or
+        CRITICAL issues. The checkpoint is committed once the new lines were
+        analyzed, so a failed Log Reader run re-reads them next cycle.
+        
+        Args:
+            follower: LogFollower watching a log file or directory
+            
+        Returns:
+            Cycle result with the number of new bytes and issues, the Log
+            Reader analysis and, if downstream agents ran, the incident result
+        """
+        lines = follower.poll()
+        new_bytes = follower.pending_bytes
+        if not new_bytes:
+            lines.close()
+            follower.commit()
+            return {"success": True, "new_bytes": 0, "new_issues": 0, "log_analysis": None, "incident": None}
+        
+        analysis = await self.log_reader.execute({"lines": lines, "incremental": True})
+        lines.close()
+        if not analysis.get("success"):
+            return {"success": False, "error": analysis.get("error"), "new_bytes": new_bytes}
+        follower.commit()
+        
+        issues = analysis["issues_found"]
+        incident = None
+        if issues:
+            logger.info(f"🔔 {len(issues)} new issues in {new_bytes} new bytes, running downstream agents")
+            incident = await self.process_incident("", log_analysis=analysis)
+        
+        return {
+            "success": True,
+            "new_bytes": new_bytes,
+            "new_issues": len(issues),
+            "log_analysis": analysis,
+            "incident": incident
+        }
+    
+    async def follow(
+        self,
+        path: str,
+        interval: Optional[float] = None,
+        checkpoint_path: Optional[str] = None,
+        from_end: bool = False,
+        max_cycles: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Watch a log file or directory and analyze only new lines every cycle
+        
+        Read positions are checkpointed per file (see LogFollower), so a
+        restarted follower resumes where it stopped, across rotation and
+        truncation.
+        
+        Args:
+            path: Log file or directory of log files to follow
+            interval: Seconds between cycles (default Config.LOG_FOLLOW_INTERVAL)
+            checkpoint_path: Where to persist read positions (default next to the logs)
+            from_end: Skip existing content on the very first run
+            max_cycles: Stop after this many cycles (default: follow forever)
+            
+        Yields:
+            One follow_cycle result per cycle
+        """
+        interval = Config.LOG_FOLLOW_INTERVAL if interval is None else interval
+        follower = LogFollower(path, checkpoint_path, from_end, Config.LOG_READ_CHUNK_SIZE)
+        cycle = 0
+        while max_cycles is None or cycle < max_cycles:
+            if cycle:
+                await asyncio.sleep(interval)
+            cycle += 1
+            yield await self.follow_cycle(follower)
+    
     def get_agent_status(self) -> Dict[str, str]:
         """Get status of all agents"""
         return {
@@ -405,3 +607,48 @@ async def analyze_logs(logs: str, api_key: str = None) -> Dict[str, Any]:
     result = await orchestrator.process_incident(logs)
     return result
 
+
+
+async def follow_logs(
+    path: str,
+    api_key: str = None,
+    interval: Optional[float] = None,
+    checkpoint_path: Optional[str] = None,
+    from_end: bool = False,
+    max_cycles: Optional[int] = None
+) -> None:
+    """
+    Follow a log file or directory and print what every cycle found
+    
+    Args:
+        path: Log file or directory of log files to follow
+        api_key: OpenAI API key
+        interval: Seconds between cycles (default Config.LOG_FOLLOW_INTERVAL)
+        checkpoint_path: Where to persist read positions (default next to the logs)
+        from_end: Skip existing content on the very first run
+        max_cycles: Stop after this many cycles (default: follow forever)
+    """
+    orchestrator = IncidentOrchestrator(api_key)
+    async for cycle in orchestrator.follow(path, interval, checkpoint_path, from_end, max_cycles):
+        if not cycle["success"]:
+            print(f"Cycle failed: {cycle.get('error')}")
+            continue
+        print(f"{cycle['new_bytes']} new bytes, {cycle['new_issues']} new issues")
+        if cycle["incident"]:
+            print(cycle["incident"]["state"].get("summary", ""))
+
+
+def main(argv=None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="Follow logs and analyze new lines every cycle")
+    parser.add_argument("path", help="log file or directory of log files to follow")
+    parser.add_argument("--interval", type=float, help="seconds between cycles")
+    parser.add_argument("--checkpoint", help="where to persist read positions")
+    parser.add_argument("--from-end", action="store_true", help="skip existing content on the first run")
+    parser.add_argument("--cycles", type=int, help="stop after this many cycles")
+    args = parser.parse_args(argv)
+    asyncio.run(follow_logs(args.path, None, args.interval, args.checkpoint, args.from_end, args.cycles))
+
+
+if __name__ == "__main__":
+    main()
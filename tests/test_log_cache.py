@@ -0,0 +1,71 @@
+"""Tests for memoizing classification by normalized message"""
+import random
+import re
+
+import pytest
+
+from agents.log_cache import LRUCache
+from agents.log_classifier import LogClassifier
+from agents.log_templates import TemplateMiner
+
+# Keywords, hex-letter words, IDs and digits glued to keywords
+WORDS = [
+    "error", "err", "failed", "warning", "warn", "fatal", "info", "debug", "deprecated",
+    "timeout", "connection", "refused", "memory", "oom", "disk", "dns", "query", "heap",
+    "service:", "auth", "bad", "dead", "beef", "cafe", "add", "fee",
+]
+
+# Variable spans a repeated line may take: plain numbers or IDs ending in hex words
+VARIABLES = ["7", "42", "1234", "9bad", "3dead", "0cafe", "5beef", "2fadd"]
+_VARIABLE = re.compile(r"\d[0-9a-fA-F]*\b|\d+")
+
+
+def fuzzed_word(rng):
+    kind = rng.random()
+    if kind < 0.5:
+        return rng.choice(WORDS)
+    if kind < 0.6:
+        return str(rng.randrange(10 ** rng.randrange(1, 6)))
+    if kind < 0.7:
+        return f"{rng.randrange(1 << 32):x}"
+    if kind < 0.8:
+        return f"0x{rng.randrange(1 << 16):x}{rng.choice(WORDS)}"
+    if kind < 0.9:
+        return f"{rng.choice(WORDS)}{rng.randrange(1000)}"
+    return f"{rng.randrange(10)}{rng.choice(WORDS)}_{rng.randrange(500)}"
+
+
+def fuzzed_corpus(seed, size=3000):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(size):
+        if lines and rng.random() < 0.3:
+            # Repeats with new IDs share a normalized message (cache hits)
+            line = lines[rng.randrange(len(lines))]
+            head, body = line[:20], line[20:]
+            lines.append(head + _VARIABLE.sub(lambda _: rng.choice(VARIABLES), body))
+            continue
+        words = " ".join(fuzzed_word(rng) for _ in range(rng.randrange(1, 9)))
+        lines.append(f"2025-11-06 10:{i // 60 % 60:02d}:{i % 60:02d} {words}")
+    return lines
+
+
+def classify(lines, cache=None, keywords=None):
+    classifier = LogClassifier(cache=cache, templates=TemplateMiner(), max_record_lines=0)
+    if keywords:
+        classifier.add_keywords(keywords)
+    return [
+        (entry.severity, entry.category, entry.categories, entry.extracted_fields, entry.template_id)
+        for entry in classifier.iter_entries(lines)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("capacity", [16, 4096])
+@pytest.mark.parametrize("keywords", [None, {"corruption": ["bad", "dead beef"]}])
+def test_cached_classification_matches_uncached(seed, capacity, keywords):
+    lines = fuzzed_corpus(seed)
+    cache = LRUCache(capacity)
+
+    assert classify(lines, cache, keywords) == classify(lines, keywords=keywords)
+    assert cache.hits > 0
@@ -0,0 +1,31 @@
+"""Tests for collapsing repeated log lines"""
+from agents.log_classifier import LogAccumulator, LogClassifier
+from agents.log_dedup import DEFAULT_COLLAPSE_WINDOW_MS
+
+
+def collapse(shards):
+    """Collapse each shard of lines separately, then merge the shards in order"""
+    merged = None
+    for lines in shards:
+        accumulator = LogAccumulator(keep_entries=False, collapse_window_ms=DEFAULT_COLLAPSE_WINDOW_MS)
+        accumulator.update(LogClassifier().iter_entries(lines))
+        merged = accumulator if merged is None else merged.merge(accumulator)
+    return [(issue.message[20:], issue.count, issue.last_seen) for issue in merged.issues_found]
+
+
+def test_collapsing_shards_matches_collapsing_lines_with_out_of_order_timestamps():
+    # A second file appended to the first: the last line jumps back in time
+    lines = [
+        "2025-11-06 10:00:00 ERROR [AuthService] token expired for session 17",
+        "2025-11-06 10:00:00 ERROR [PaymentService] upstream returned 503 for order 4",
+        "2025-11-06 10:04:10 ERROR [PaymentService] upstream returned 503 for order 9",
+        "2025-11-06 10:08:20 ERROR [PaymentService] upstream returned 503 for order 12",
+        "2025-11-06 10:12:30 ERROR [PaymentService] upstream returned 503 for order 31",
+        "2025-11-06 10:01:40 ERROR [AuthService] token expired for session 52",
+    ]
+    sequential = collapse([lines])
+
+    assert [count for _, count, _ in sequential] == [2, 4]
+    for split in range(1, len(lines)):
+        assert collapse([lines[:split], lines[split:]]) == sequential
+    assert collapse([[line] for line in lines]) == sequential
@@ -0,0 +1,99 @@
+"""Tests for following growing, rotated and truncated log files"""
+import os
+
+from agents.log_follow import LogFollower
+
+
+def append(path, text):
+    with open(path, "a") as f:
+        f.write(text)
+
+
+def poll(follower):
+    lines = list(follower.poll())
+    follower.commit()
+    return lines
+
+
+def test_reads_only_appended_lines(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("one\ntwo\n")
+    follower = LogFollower(log)
+
+    assert poll(follower) == ["one", "two"]
+    assert poll(follower) == []
+    append(log, "three\n")
+    assert poll(follower) == ["three"]
+
+
+def test_partial_line_waits_for_its_newline(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("one\ntw")
+    follower = LogFollower(log)
+
+    assert poll(follower) == ["one"]
+    append(log, "o\nthr")
+    assert poll(follower) == ["two"]
+    append(log, "ee\n")
+    assert poll(follower) == ["three"]
+
+
+def test_uncommitted_poll_is_read_again(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("one\n")
+    follower = LogFollower(log)
+
+    assert list(follower.poll()) == ["one"]
+    assert poll(follower) == ["one"]
+
+
+def test_rename_rotation_reads_the_rest_of_the_old_file_first(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("one\n")
+    follower = LogFollower(log)
+    assert poll(follower) == ["one"]
+
+    append(log, "two\n")
+    os.rename(log, tmp_path / "app.log.1")
+    log.write_text("three\n")
+    rotated = os.stat(tmp_path / "app.log.1")
+    os.utime(log, ns=(rotated.st_atime_ns, rotated.st_mtime_ns + 1_000_000))
+
+    assert poll(follower) == ["two", "three"]
+    append(log, "four\n")
+    assert poll(follower) == ["four"]
+
+
+def test_copytruncate_rereads_from_the_start(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("one\ntwo\n")
+    follower = LogFollower(log)
+    assert poll(follower) == ["one", "two"]
+
+    # Copied away and truncated, then written again: shorter than the checkpoint
+    log.write_text("three\n")
+    assert poll(follower) == ["three"]
+
+    # Truncated and rewritten past the checkpoint: the first bytes changed
+    log.write_text("four\nfive\nsix\n")
+    assert poll(follower) == ["four", "five", "six"]
+
+
+def test_checkpoint_is_reloaded_by_a_new_follower(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("one\n")
+    assert poll(LogFollower(log)) == ["one"]
+    assert (tmp_path / ("app.log" + LogFollower.CHECKPOINT_SUFFIX)).exists()
+
+    append(log, "two\n")
+    assert poll(LogFollower(log)) == ["two"]
+
+
+def test_from_end_skips_existing_content_on_the_first_run(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("old\n")
+    follower = LogFollower(log, from_end=True)
+
+    assert poll(follower) == []
+    append(log, "new\n")
+    assert poll(follower) == ["new"]
@@ -0,0 +1,92 @@
+"""Tests for decoding structured log lines"""
+import pytest
+
+from agents.log_classifier import LogClassifier
+from agents.log_formats import make_decoder, severity_from_level, sniff_format
+
+
+def classify(lines):
+    return [
+        (entry.line_format, entry.message, entry.severity, entry.timestamp, entry.epoch_ms, entry.extracted_fields)
+        for entry in LogClassifier().iter_entries(lines)
+    ]
+
+
+def test_json_lines():
+    lines = [
+        '{"ts":"2025-11-06T10:00:00Z","level":"warn","msg":"slow query","service":"orders","status":503}',
+        '{"time":1762423201000,"level":50,"message":"db timeout"}',
+        '{"ts":"2025-11-06T10:00:02Z","level":"info","msg":"truncated',
+        '{"ts":"2025-11-06T10:00:03Z","msg":"payment failed"}',
+        "[1, 2]",
+    ]
+
+    assert classify(lines) == [
+        ("json", "slow query", "WARNING", "2025-11-06T10:00:00", 1762423200000,
+         {"services": ["orders"], "http_status": ["503"]}),
+        # Epoch milliseconds and pino's numeric levels
+        ("json", "db timeout", "ERROR", "2025-11-06 10:00:01", 1762423201000, {}),
+        # Malformed JSON falls back to plain text
+        (None, lines[2], "INFO", "2025-11-06T10:00:02", 1762423202000, {}),
+        # No level key: the severity keywords apply
+        ("json", "payment failed", "ERROR", "2025-11-06T10:00:03", 1762423203000, {}),
+        (None, "[1, 2]", "INFO", "2025-11-06T10:00:03", 1762423203000, {}),
+    ]
+
+
+def test_logfmt():
+    lines = [
+        'ts=2025-11-06T10:00:00Z level=error msg="connection refused by \\"db\\"" svc=api status=500',
+        "ts=2025-11-06T10:00:01Z level=info msg=ok app=api",
+        "retry=3",
+        "ts=2025-11-06T10:00:02Z lvl=debug msg=done",
+    ]
+
+    assert classify(lines) == [
+        ("logfmt", 'connection refused by "db"', "ERROR", "2025-11-06T10:00:00", 1762423200000,
+         {"services": ["api"], "http_status": ["500"]}),
+        ("logfmt", "ok", "INFO", "2025-11-06T10:00:01", 1762423201000, {"services": ["api"]}),
+        # A lone pair is not a record
+        (None, "retry=3", "INFO", "2025-11-06T10:00:01", 1762423201000, {}),
+        ("logfmt", "done", "DEBUG", "2025-11-06T10:00:02", 1762423202000, {}),
+    ]
+
+
+def test_rfc5424_syslog():
+    lines = [
+        '<11>1 2025-11-06T10:00:00.123Z host1 payments 812 ID47 [meta x="1"] ﻿card declined',
+        "<14>1 2025-11-06T10:00:01Z host1 - - - - started",
+        "<11> not syslog, error here",
+        "<12>1 - host1 payments 1 - - low disk",
+    ]
+
+    assert classify(lines) == [
+        # Severity is PRI & 7 (3 = error), the BOM before the message is dropped
+        ("syslog", "card declined", "ERROR", "2025-11-06T10:00:00", 1762423200123, {"services": ["payments"]}),
+        ("syslog", "started", "INFO", "2025-11-06T10:00:01", 1762423201000, {}),
+        (None, lines[2], "ERROR", "2025-11-06T10:00:01", 1762423201000, {}),
+        # A nil timestamp keeps the previous one
+        ("syslog", "low disk", "WARNING", "2025-11-06T10:00:01", 1762423201000, {"services": ["payments"]}),
+    ]
+
+
+def test_mostly_plain_text_is_not_decoded():
+    lines = [
+        "2025-11-06 10:00:00 ERROR [Billing] connection refused",
+        '{"level":"info","msg":"stray json"}',
+        "2025-11-06 10:00:01 INFO [Billing] retrying",
+    ]
+
+    assert sniff_format(lines) == "text"
+    assert make_decoder("text") is None
+    assert [line_format for line_format, *_ in classify(lines)] == [None, None, None]
+    with pytest.raises(ValueError):
+        make_decoder("xml")
+
+
+@pytest.mark.parametrize("level, severity", [
+    ("WARN", "WARNING"), ("Fatal", "CRITICAL"), (3, "ERROR"), ("6", "INFO"),
+    (60, "CRITICAL"), (40, "WARNING"), (10, "DEBUG"), (True, None), ("loud", None),
+])
+def test_severity_from_level(level, severity):
+    assert severity_from_level(level) == severity
@@ -0,0 +1,38 @@
+"""Tests for the time histogram of classified log lines"""
+from pathlib import Path
+
+from agents.log_classifier import LogAccumulator, LogClassifier
+from agents.log_histogram import DEFAULT_BUCKET_MS
+
+SAMPLE_LOGS = Path(__file__).resolve().parent.parent / "sample_logs.txt"
+
+
+def build_histogram(lines):
+    accumulator = LogAccumulator(histogram_bucket_ms=DEFAULT_BUCKET_MS)
+    accumulator.update(LogClassifier().iter_entries(lines))
+    return accumulator.result()["histogram"]
+
+
+def test_header_lines_are_undated():
+    lines = [
+        "# Nightly export",
+        "# generated by the gateway",
+        "2025-11-06 14:23:45 ERROR [DatabasePool] Connection timeout after 30s",
+        "2025-11-06 14:25:10 CRITICAL [ApplicationServer] OutOfMemoryError: Java heap space",
+    ]
+    histogram = build_histogram(lines)
+
+    assert histogram.undated == 2
+    assert len(histogram) == 3
+    assert histogram.start_ms == 1762439025000 // DEFAULT_BUCKET_MS * DEFAULT_BUCKET_MS
+    assert int(histogram.counts.sum()) == 2
+
+
+def test_sample_file_span_covers_only_dated_lines():
+    with open(SAMPLE_LOGS) as f:
+        lines = f.read().splitlines()
+    histogram = build_histogram(lines)
+
+    assert histogram.undated == sum(1 for line in lines if line.startswith("#"))
+    # The sample covers minutes, not the time up to today
+    assert 0 < len(histogram) < 60
@@ -0,0 +1,29 @@
+"""Tests for the time-ordered merge of several log sources"""
+import io
+
+from agents.log_classifier import LogClassifier
+from agents.log_merge import iter_merged_entries
+
+
+def test_header_lines_do_not_reorder_sources():
+    gateway = io.StringIO(
+        "# gateway access log\n"
+        "2025-11-06 14:23:45 ERROR [Gateway] upstream timeout\n"
+        "2025-11-06 14:23:50 ERROR [Gateway] upstream timeout\n"
+    )
+    database = io.StringIO(
+        "# database log\n"
+        "# exported by pg_dumplog\n"
+        "2025-11-06 14:23:40 WARNING [Postgres] slow query\n"
+        "2025-11-06 14:23:47 ERROR [Postgres] connection refused\n"
+    )
+    entries = list(iter_merged_entries(LogClassifier(), {"gateway": gateway, "database": database}))
+
+    headers = [entry for entry in entries if entry.epoch_ms is None]
+    dated = [entry for entry in entries if entry.epoch_ms is not None]
+    assert [entry.message for entry in headers] == [
+        "# gateway access log", "# database log", "# exported by pg_dumplog"
+    ]
+    assert entries[:len(headers)] == headers
+    assert [entry.epoch_ms for entry in dated] == sorted(entry.epoch_ms for entry in dated)
+    assert [entry.source for entry in dated] == ["database", "gateway", "database", "gateway"]
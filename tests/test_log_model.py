@@ -0,0 +1,64 @@
+"""Tests for the learned severity and category model"""
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from agents.log_classifier import LogClassifier
+from agents.log_model import LogModel
+
+TEMPLATES = [
+    ("upstream returned {n} for order {n}", "ERROR", "network"),
+    ("query on orders took {n}ms", "WARNING", "database"),
+    ("heap usage at {n} percent", "WARNING", "memory"),
+    ("volume /data has {n} blocks left", "ERROR", "disk"),
+    ("user {n} signed in", "INFO", "general"),
+]
+
+
+def examples(n, seed=0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        template, severity, category = rng.choice(TEMPLATES)
+        message = template.format(n=rng.randrange(10000))
+        yield {"message": message, "severity": severity, "category": category}
+
+
+@pytest.fixture(scope="module")
+def model():
+    return LogModel.train(examples(500), n_features=1 << 12, epochs=5)
+
+
+def test_train_save_load_round_trip(model, tmp_path):
+    messages = [example["message"] for example in examples(50, seed=1)]
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+    loaded = LogModel.load(path)
+
+    predicted = model.predict(messages)
+    assert loaded.predict(messages) == predicted
+    for name in ("severity", "category"):
+        expected = [example[name] for example in examples(50, seed=1)]
+        assert [label for label, _ in predicted[name]] == expected
+
+
+@pytest.mark.parametrize("issues_only", [False, True])
+def test_batched_refine_matches_per_entry_refine(model, issues_only):
+    rng = random.Random(2)
+    lines = [
+        f"2025-11-06 10:00:{i % 60:02d} {rng.choice(['INFO', 'ERROR', 'WARN'])} {example['message']}"
+        for i, example in enumerate(examples(300, seed=2))
+    ]
+
+    def refine(batch_size):
+        classifier = LogClassifier(model=model, model_batch_size=batch_size, issues_only=issues_only)
+        return [(entry.severity, entry.category, entry.categories) for entry in classifier.iter_entries(lines)]
+
+    batched = refine(128)
+    assert batched == refine(1)
+    # The model did relabel entries the rules classify differently
+    assert batched != [
+        (entry.severity, entry.category, entry.categories)
+        for entry in LogClassifier(issues_only=issues_only).iter_entries(lines)
+    ]
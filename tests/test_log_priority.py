@@ -0,0 +1,30 @@
+"""Tests for the top-K selection of issues"""
+from agents.log_classifier import LogAccumulator, LogClassifier
+from agents.log_priority import prioritize_issues
+from agents.log_templates import TemplateMiner
+
+USERS = ["alice", "bob", "carol", "dave", "erin", "frank", "grace", "heidi", "ivan", "judy"]
+
+
+def test_storm_of_one_template_does_not_crowd_out_other_issues():
+    lines = [
+        f"2025-11-06 14:{i // 60:02d}:{i % 60:02d} ERROR auth failed for user {USERS[i % len(USERS)]}{i}"
+        for i in range(200)
+    ]
+    lines += [
+        "2025-11-06 14:04:00 CRITICAL disk full on /var/lib/postgresql",
+        "2025-11-06 14:04:01 ERROR connection refused by payments-api",
+        "2025-11-06 14:04:02 ERROR certificate expired for api.example.com",
+    ]
+    classifier = LogClassifier(templates=TemplateMiner())
+    accumulator = LogAccumulator(keep_entries=False, templates=classifier.templates)
+    result = accumulator.update(classifier.iter_entries(lines)).result()
+
+    prioritized = prioritize_issues(result["issues_found"], 5, result["templates"])
+
+    messages = [issue["message"] for issue in prioritized]
+    assert len(prioritized) == 4
+    assert sum("auth failed" in message for message in messages) == 1
+    assert any("disk full" in message for message in messages)
+    assert any("connection refused" in message for message in messages)
+    assert any("certificate expired" in message for message in messages)
@@ -0,0 +1,167 @@
+"""Tests comparing sharded (multi-process) reads with single-process reads"""
+import asyncio
+import io
+import tarfile
+
+import numpy as np
+import pytest
+
+from agents.log_reader_agent import LogReaderAgent
+from agents.log_records import is_record_start
+from agents.log_sources import MappedLogFile
+from config import Config
+
+
+@pytest.fixture
+def analyze(monkeypatch):
+    """Run the Log Reader on a source with the given number of workers"""
+    monkeypatch.setattr(Config, "LOG_PARALLEL_MIN_BYTES", 0)
+
+    def run(source, workers, embeddings=None):
+        monkeypatch.setattr(Config, "LOG_READER_WORKERS", workers)
+        agent = LogReaderAgent(embeddings=embeddings)
+        result = asyncio.run(agent.execute({"log_source": source, "columnar": True}))
+        assert result["success"], result.get("error")
+        return result
+
+    return run
+
+
+def log_lines(count):
+    return [
+        f"2025-11-06 {10 + i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d} "
+        f"{('INFO', 'ERROR', 'WARNING')[i % 3]} [Worker-{i % 7}] processed batch {i}"
+        for i in range(count)
+    ]
+
+
+def test_tar_archive_is_not_sharded(tmp_path, analyze):
+    path = tmp_path / "logs.tar"
+    with tarfile.open(path, "w") as archive:
+        for name, lines in (("app.log", log_lines(3000)), ("worker.log", log_lines(2000))):
+            data = ("\n".join(lines) + "\n").encode()
+            member = tarfile.TarInfo(name)
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+
+    sequential = analyze(path, 1)
+    sharded = analyze(path, 4)
+
+    assert sequential["total_entries"] == 5000
+    assert sharded["total_entries"] == sequential["total_entries"]
+    assert sharded["severity_counts"] == sequential["severity_counts"]
+
+
+class KeywordEmbeddings:
+    """Embeds texts mentioning "network" (or "zork") on one axis, everything else on another"""
+
+    def embed_documents(self, texts):
+        return [
+            [1.0, 0.0] if "network" in text.lower() or "zork" in text.lower() else [0.0, 1.0]
+            for text in texts
+        ]
+
+
+def test_embedding_categories_match_between_sharded_and_sequential_reads(tmp_path, analyze):
+    lines = [
+        f"2025-11-06 10:{i // 60 % 60:02d}:{i % 60:02d} "
+        f"{('ERROR', 'WARNING', 'INFO')[i % 3]} zork relay {i % 5} stalled after {i} frames"
+        for i in range(3000)
+    ]
+    path = tmp_path / "app.log"
+    path.write_text("\n".join(lines) + "\n")
+
+    sequential = analyze(path, 1, KeywordEmbeddings())
+    sharded = analyze(path, 4, KeywordEmbeddings())
+
+    assert sequential["category_counts"]["network"] == 2000
+    assert sharded["category_counts"] == sequential["category_counts"]
+    assert sharded["log_table"].crosstab() == sequential["log_table"].crosstab()
+    assert sharded["histogram"].series == sequential["histogram"].series
+    assert np.array_equal(sharded["histogram"].counts, sequential["histogram"].counts)
+
+
+JAVA_TRACE = [
+    "java.lang.IllegalStateException: pool exhausted",
+    "\tat com.example.db.Pool.acquire(Pool.java:88)",
+    "\tat com.example.api.OrderController.create(OrderController.java:41)",
+    "Caused by: java.net.SocketTimeoutException: connect timed out",
+    "\t... 12 more",
+]
+PYTHON_TRACE = [
+    "Traceback (most recent call last):",
+    '  File "/srv/worker/tasks.py", line 57, in run',
+    "    result = handler(payload)",
+    "KeyError: 'tenant_id'",
+]
+
+
+def sharding_log(path):
+    """Time-ordered log with traces, repeats and long lines, whose shard cuts land inside records"""
+    lines = []
+    for i in range(4000):
+        stamp = f"2025-11-06 {10 + i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}"
+        kind = i % 10
+        if kind == 0:
+            lines.append(f"{stamp} ERROR [OrderService] request {i} failed")
+            lines.extend(JAVA_TRACE)
+        elif kind == 5:
+            lines.append(f"{stamp} CRITICAL [Worker] task {i} crashed")
+            lines.extend(PYTHON_TRACE)
+        elif kind in (1, 2, 3):
+            lines.append(f"{stamp} ERROR [DatabasePool] Connection timeout after {i % 30}s - host: db.prod.local")
+        elif kind == 7:
+            lines.append(f"{stamp} WARNING [Cache] payload {i} too large: " + "x" * 3000)
+        else:
+            lines.append(f"{stamp} INFO [Gateway] GET /api/orders/{i} 200 {i % 97}ms")
+    data = "\n".join(lines) + "\n"
+    path.write_text(data)
+    return data
+
+
+def summarize(result):
+    templates = {t["template_id"]: t["template"] for t in result["templates"]}
+    return {
+        "total_entries": result["total_entries"],
+        "severity_counts": result["severity_counts"],
+        "category_counts": result["category_counts"],
+        "issues": [
+            (issue.message, issue.count, issue.last_seen, templates.get(issue.template_id))
+            for issue in result["issues_found"]
+        ],
+        "templates": [(t["template"], t["count"], t["first_seen"], t["last_seen"]) for t in result["templates"]],
+        "prioritized": [issue.message for issue in result["prioritized_issues"]],
+        "table": result["log_table"].crosstab(),
+        "histogram": result["histogram"].counts.tolist(),
+    }
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_sharded_read_matches_sequential_read(tmp_path, analyze, workers):
+    path = tmp_path / "app.log"
+    data = sharding_log(path)
+    # Shard cuts land mid-line and are moved forward to the next line start
+    size = len(data.encode())
+    cuts = [size * i // workers for i in range(1, workers)]
+    assert all(data[cut - 1] != "\n" for cut in cuts)
+    # With four shards one cut lands inside a Java trace
+    starts = [data.index("\n", size * i // 4) + 1 for i in range(1, 4)]
+    assert not all(is_record_start(data[start:data.index("\n", start)]) for start in starts)
+
+    sequential = summarize(analyze(path, 1))
+    sharded = summarize(analyze(path, workers))
+
+    assert any(count > 1 for _, count, _, _ in sequential["issues"])
+    assert any("\n\tat " in message for message, _, _, _ in sequential["issues"])
+    assert sharded == sequential
+
+
+def test_sharded_read_of_a_mapped_file_matches_sequential_read(tmp_path, analyze):
+    path = tmp_path / "app.log"
+    sharding_log(path)
+
+    sequential = summarize(analyze(path, 1))
+    with MappedLogFile(path) as mapped:
+        sharded = summarize(analyze(mapped, 4))
+
+    assert sharded == sequential
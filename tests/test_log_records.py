@@ -0,0 +1,89 @@
+"""Tests for assembling multi-line log records"""
+from agents.log_classifier import LogClassifier
+from agents.log_records import assemble_records, has_exception_trace, is_record_start
+
+JAVA_RECORD = [
+    "2025-11-06 10:00:00 ERROR [OrderService] request failed",
+    "java.lang.IllegalStateException: pool exhausted",
+    "\tat com.shop.db.Pool.acquire(Pool.java:88)",
+    "\tat com.shop.OrderService.place(OrderService.java:41)",
+    "Caused by: java.net.SocketTimeoutException: connect timed out",
+    "\tat java.base/java.net.Socket.connect(Socket.java:633)",
+    "\t... 12 more",
+]
+
+PYTHON_TRACE = [
+    "Traceback (most recent call last):",
+    '  File "/srv/worker.py", line 3, in run',
+    "    process(batch)",
+    "KeyError: 'tenant_id'",
+]
+
+
+def classify(lines):
+    return [(entry.severity, entry.message) for entry in LogClassifier().iter_entries(lines)]
+
+
+def test_java_trace_and_cause_chain_fold_into_their_header():
+    lines = JAVA_RECORD + ["2025-11-06 10:00:01 INFO [OrderService] retrying"]
+
+    assert list(assemble_records(lines)) == ["\n".join(JAVA_RECORD), lines[-1]]
+
+
+def test_python_traceback_ends_at_its_exception_line():
+    header = "2025-11-06 10:00:00 ERROR [Worker] batch failed"
+    lines = [header] + PYTHON_TRACE + ["worker restarted", "2025-11-06 10:00:01 INFO [Worker] done"]
+
+    assert list(assemble_records(lines)) == [
+        "\n".join([header] + PYTHON_TRACE), "worker restarted", lines[-1]
+    ]
+
+
+def test_indented_continuations_and_blank_lines():
+    lines = [
+        "2025-11-06 10:00:00 WARNING [Config] deprecated keys:",
+        "    cache.size",
+        "",
+        "    cache.ttl",
+        "2025-11-06 10:00:01 INFO [Config] loaded",
+    ]
+
+    assert list(assemble_records(lines)) == [
+        "2025-11-06 10:00:00 WARNING [Config] deprecated keys:\n    cache.size\n    cache.ttl",
+        lines[-1],
+    ]
+
+
+def test_long_records_are_truncated_with_a_count():
+    lines = ["2025-11-06 10:00:00 ERROR [Job] failed"] + [f"\tat frame{i}()" for i in range(10)]
+
+    (record,) = assemble_records(lines, max_lines=4)
+    assert record.split("\n") == lines[:4] + ["... 7 more lines"]
+
+
+def test_bare_traceback_after_an_info_line_raises_its_severity():
+    header = "2025-11-06 10:00:00 INFO [Worker] starting batch"
+    lines = [header] + PYTHON_TRACE + ["2025-11-06 10:00:01 INFO [Worker] done"]
+
+    # The trace is folded into the INFO record, whose exception makes it an ERROR
+    assert classify(lines) == [
+        ("ERROR", "\n".join([header] + PYTHON_TRACE)),
+        ("INFO", lines[-1]),
+    ]
+
+
+def test_exception_traces_set_severity_only_below_error():
+    assert has_exception_trace("\n".join(JAVA_RECORD))
+    assert has_exception_trace("\n".join(["x"] + PYTHON_TRACE))
+    assert not has_exception_trace("2025-11-06 10:00:00 INFO [Config] keys:\n    cache.size")
+    assert not has_exception_trace("java.lang.IllegalStateException: on the header line only")
+
+    critical = ["2025-11-06 10:00:00 CRITICAL [Worker] crashed"] + PYTHON_TRACE
+    assert [severity for severity, _ in classify(critical)] == ["CRITICAL"]
+    indented = ["2025-11-06 10:00:00 INFO [Config] keys:", "    cache.size"]
+    assert [severity for severity, _ in classify(indented)] == ["INFO"]
+
+
+def test_record_starts():
+    assert is_record_start("2025-11-06 10:00:00 INFO [Worker] done")
+    assert not any(is_record_start(line) for line in JAVA_RECORD[1:] + PYTHON_TRACE)
@@ -0,0 +1,34 @@
+"""Tests for splitting issues into incident segments"""
+from agents.log_segments import segment_issues
+
+MINUTE = 60_000
+
+
+def issue(epoch_ms, category="database", message="connection refused"):
+    return {"epoch_ms": epoch_ms, "category": category, "severity": "ERROR", "message": message}
+
+
+def test_undated_issues_do_not_cut_segments():
+    start = 1762439025000
+    issues = [
+        issue(None, message="# ERROR summary header"),
+        issue(start),
+        issue(start + MINUTE),
+        issue(None, message="continuation without a timestamp"),
+        issue(start + 2 * MINUTE),
+    ]
+    segments = segment_issues(issues)
+
+    assert len(segments) == 1
+    assert segments[0].start_ms == start
+    assert segments[0].end_ms == start + 2 * MINUTE
+    assert segments[0].issues == issues
+
+
+def test_quiet_period_splits_incidents():
+    start = 1762439025000
+    issues = [issue(start), issue(None), issue(start + 60 * MINUTE, category="network")]
+    segments = segment_issues(issues)
+
+    assert [len(segment.issues) for segment in segments] == [2, 1]
+    assert segments[1].start_ms == segments[1].end_ms == start + 60 * MINUTE
@@ -0,0 +1,77 @@
+"""Tests for the heavy-hitter and distinct-count sketches"""
+from collections import Counter
+import random
+
+import pytest
+
+from agents.log_sketches import HyperLogLog, SpaceSaving
+
+
+def zipf_stream(n, items=5000, seed=0):
+    """``n`` draws of ``items`` values with Zipf(1) frequencies, in random order"""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, items + 1)]
+    return [f"10.0.{i // 256}.{i % 256}" for i in rng.choices(range(items), weights, k=n)]
+
+
+def assert_space_saving_bounds(sketch, truth, k):
+    # Counts never underestimate and count - error never overestimates
+    for item, count in sketch.counts.items():
+        error = sketch.errors.get(item, 0)
+        assert count - error <= truth[item] <= count
+    # Errors stay below the floor, and anything more frequent is tracked
+    assert all(error <= sketch.floor for error in sketch.errors.values())
+    assert all(item in sketch for item, count in truth.items() if count > sketch.floor)
+    # A reported top-k item can only displace a true one within the floor
+    kth = truth.most_common(k)[-1][1]
+    assert all(truth[item] >= kth - sketch.floor for item, _, _ in sketch.top(k))
+    # Items whose lower bound beats every upper bound outside the top k are certain
+    outside = max(sketch.top(k + 1)[-1][1], sketch.floor)
+    certain = [item for item, count, error in sketch.top(k) if count - error > outside]
+    assert certain and set(certain) <= {item for item, _ in truth.most_common(k)}
+
+
+def test_space_saving_top_k_on_a_zipf_stream():
+    stream = zipf_stream(50000)
+    sketch = SpaceSaving(capacity=50)
+    for item in stream:
+        sketch.add(item)
+
+    assert sketch.floor > 0                   # the sketch did drop items
+    assert len(sketch) <= 2 * sketch.capacity
+    assert_space_saving_bounds(sketch, Counter(stream), k=10)
+
+
+def test_merged_space_saving_keeps_its_bounds():
+    stream = zipf_stream(50000, seed=1)
+    merged = None
+    for start in range(0, len(stream), 12500):
+        shard = SpaceSaving(capacity=50)
+        for item in stream[start:start + 12500]:
+            shard.add(item)
+        merged = shard if merged is None else merged.merge(shard)
+
+    assert_space_saving_bounds(merged, Counter(stream), k=10)
+
+
+@pytest.mark.parametrize("distinct", [100, 3000, 50000])
+def test_hyperloglog_estimate_is_within_its_error_bound(distinct):
+    sketch = HyperLogLog()
+    for i in range(distinct):
+        sketch.add(f"user-{i}")
+        sketch.add(f"user-{i}")               # repeats do not count
+
+    # 1.04 / sqrt(4096) is ~1.6%; allow three standard errors
+    assert abs(sketch.estimate() - distinct) <= 0.05 * distinct
+
+
+def test_merged_hyperloglog_counts_the_union():
+    left, right = HyperLogLog(), HyperLogLog()
+    for i in range(20000):
+        left.add(f"session-{i}")
+    for i in range(10000, 30000):
+        right.add(f"session-{i}")
+
+    assert abs(left.merge(right).estimate() - 30000) <= 0.05 * 30000
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(precision=10))
@@ -0,0 +1,70 @@
+"""Tests for the memory-mapped, indexed log file"""
+import os
+
+import pytest
+
+from agents.log_sources import MappedLogFile, split_line_ranges
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return path
+
+
+def test_lines_and_index_persistence(tmp_path, monkeypatch):
+    log = write(tmp_path / "app.log", b"one\r\ntwo\n\nthree\n")
+    with MappedLogFile(log) as mapped:
+        assert list(mapped.iter_lines()) == ["one", "two", "", "three"]
+        assert bytes(mapped.line_bytes(1)) == b"two"
+        assert mapped.page(1, 2) == ["two", ""]
+    assert mapped.index_path.exists()
+
+    def rescan(self):
+        raise AssertionError("the persisted index should have been used")
+
+    monkeypatch.setattr(MappedLogFile, "_build_index", rescan)
+    with MappedLogFile(log) as reopened:
+        assert reopened.line(3) == "three"
+
+
+@pytest.mark.parametrize("change", ["size", "mtime"])
+def test_index_is_rebuilt_when_the_file_changed(tmp_path, change):
+    log = write(tmp_path / "app.log", b"one\ntwo\n")
+    MappedLogFile(log).close()
+    stat = os.stat(log)
+    if change == "size":
+        with open(log, "ab") as f:
+            f.write(b"three\n")
+    else:
+        # Same size, different content and mtime
+        write(log, b"uno\ndos\n")
+        os.utime(log, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    with MappedLogFile(log) as mapped:
+        expected = ["one", "two", "three"] if change == "size" else ["uno", "dos"]
+        assert list(mapped.iter_lines()) == expected
+
+
+def test_file_without_trailing_newline(tmp_path):
+    log = write(tmp_path / "app.log", b"one\ntwo")
+    with MappedLogFile(log, persist_index=False) as mapped:
+        assert len(mapped) == 2
+        assert list(mapped.iter_lines()) == ["one", "two"]
+    assert not mapped.index_path.exists()
+
+
+def test_empty_file(tmp_path):
+    log = write(tmp_path / "app.log", b"")
+    with MappedLogFile(log) as mapped:
+        assert len(mapped) == 0
+        assert list(mapped.iter_lines()) == []
+        assert mapped.page(0, 10) == []
+        assert mapped.split_ranges(4) == [(0, 0)]
+
+
+@pytest.mark.parametrize("shards", [1, 2, 3, 7, 50])
+def test_split_ranges_match_split_line_ranges(tmp_path, shards):
+    lines = [f"line {i} " + "x" * (i * 37 % 200) for i in range(300)]
+    log = write(tmp_path / "app.log", ("\n".join(lines)).encode())
+    with MappedLogFile(log) as mapped:
+        assert mapped.split_ranges(shards) == split_line_ranges(log, shards)
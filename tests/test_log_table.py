@@ -0,0 +1,49 @@
+"""Tests for the columnar log table"""
+import pytest
+
+pytest.importorskip("numpy")
+
+from agents import log_entry, log_table
+from agents.log_entry import LogEntry
+from agents.log_table import LogTable, LogTableBuilder
+
+
+@pytest.fixture
+def categories(monkeypatch):
+    """A fresh category code table, so interned names do not leak into other tests"""
+    table = log_entry.CodeTable(list(log_entry.CATEGORIES.names))
+    monkeypatch.setattr(log_entry, "CATEGORIES", table)
+    monkeypatch.setattr(log_table, "CATEGORIES", table)
+    return table
+
+
+def test_more_than_256_categories(categories):
+    names = [f"team-{i}" for i in range(300)]
+    entries = [LogEntry(f"line {i}", None, None, "ERROR", name) for i, name in enumerate(names)]
+
+    table = LogTable.from_entries(entries)
+    assert len(categories) > 256
+    assert [table.entry(i).category for i in range(len(table))] == names
+    assert table.count(category="team-299") == 1
+    assert table.counts(by="category")["team-299"] == 1
+
+
+def test_merged_shards_recode_wide_codes(categories):
+    known = list(categories.names)
+    shard = LogTableBuilder()
+    for i in range(300):
+        shard.append(LogEntry(f"line {i}", None, None, "ERROR", f"team-{i}"))
+    # Codes recorded against another process's table, in another order
+    shard.category_names = known + [f"team-{i}" for i in reversed(range(300))]
+
+    merged = LogTableBuilder().extend(shard).build()
+    assert [merged.entry(i).category for i in range(300)] == [f"team-{299 - i}" for i in range(300)]
+
+
+def test_code_space_is_bounded():
+    table = log_entry.CodeTable([])
+    for i in range(log_entry.MAX_CODES):
+        table.code(str(i))
+    with pytest.raises(ValueError):
+        table.code("one too many")
+
@@ -0,0 +1,46 @@
+"""Tests for running several incidents of one log range through the agents"""
+import asyncio
+
+from agents.rca_agent import RCAAgent
+from config import Config
+from orchestrator import IncidentOrchestrator
+
+
+def incident_logs():
+    """Three bursts of errors, an hour apart"""
+    lines = []
+    for hour, message in ((10, "Connection timeout after 30s - host: db.prod.local"),
+                          (11, "OutOfMemoryError: Java heap space"),
+                          (12, "Disk full on /var/lib/postgresql")):
+        for second in range(0, 50, 10):
+            lines.append(f"2025-11-06 {hour}:00:{second:02d} ERROR [Service] {message}")
+    return "\n".join(lines)
+
+
+def test_concurrent_incidents_run_on_separate_agents(tmp_path, monkeypatch):
+    (tmp_path / "cookbooks").mkdir()
+    monkeypatch.setattr(Config, "BASE_DIR", tmp_path)
+    seen = []
+    starts = []
+    execute = RCAAgent.execute
+
+    async def recording_execute(agent, input_data):
+        seen.append(agent)
+        # Overlap the incidents, so shared agents would see each other's runs
+        await asyncio.sleep(0.2)
+        result = await execute(agent, input_data)
+        starts.append([entry["action"] for entry in agent.execution_log].count("Starting Root Cause Analysis"))
+        return result
+
+    monkeypatch.setattr(RCAAgent, "execute", recording_execute)
+    orchestrator = IncidentOrchestrator()
+
+    result = asyncio.run(orchestrator.process_incidents(incident_logs(), max_concurrency=3))
+
+    assert result["success"]
+    assert [incident["segment"]["index"] for incident in result["incidents"]] == [0, 1, 2]
+    assert len({id(agent) for agent in seen}) == 3
+    assert orchestrator.rca not in seen
+    assert orchestrator.rca.execution_log == []
+    assert starts == [1, 1, 1]
+    assert all(agent.status == "completed" for agent in seen)